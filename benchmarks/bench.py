@@ -0,0 +1,180 @@
+"""Throughput benchmark of assembler phases on synthetic programs.
+
+Usage:
+    python benchmarks/bench.py --sizes 1000 100000 --output results.json
+    python benchmarks/bench.py --compare benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# Loaded up front, the assembler imports it (and NumPy) lazily on the first
+# columnar encoding, which would be timed as pass2_columnar otherwise.
+import columnar  # noqa: E402, F401
+from assembler import Assembler  # noqa: E402
+from generator import generate_units  # noqa: E402
+from lexer import tokenize  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+PHASES = [
+    "tokenize",
+    "pass1",
+    "pass2",
+    "pass2_columnar",
+    "one_pass",
+    "to_bytes",
+    "total",
+]
+
+
+def tokenize_lines(lines: list[str]) -> None:
+    for line_number, line in enumerate(lines, start=1):
+        tokenize(line, line_number)
+
+
+def time_unit(lines: list[str]) -> dict[str, float]:
+    """Seconds spent by every phase on a single program."""
+    timings = {}
+
+    started = time.perf_counter()
+    tokenize_lines(lines)
+    timings["tokenize"] = time.perf_counter() - started
+
+    assembler = Assembler()
+    started = time.perf_counter()
+    program = assembler.parse_program(lines)
+    timings["pass1"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    assembler.encode_program(program)
+    timings["pass2"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    assembler.to_bytes()
+    timings["to_bytes"] = time.perf_counter() - started
+
+    # Separate assembler, so the scalar phases stay comparable with the baseline.
+    vectorized = Assembler(columnar=True)
+    program = vectorized.parse_program(lines)
+    started = time.perf_counter()
+    vectorized.encode_program(program)
+    timings["pass2_columnar"] = time.perf_counter() - started
+
+    one_pass = Assembler(one_pass=True)
+    started = time.perf_counter()
+    one_pass.assemble_one_pass(lines)
+    timings["one_pass"] = time.perf_counter() - started
+
+    timings["total"] = timings["pass1"] + timings["pass2"] + timings["to_bytes"]
+    return timings
+
+
+def assemble_units(units: list[list[str]]) -> None:
+    for lines in units:
+        assembler = Assembler()
+        assembler.encode_program(assembler.parse_program(lines))
+        assembler.to_bytes()
+
+
+def peak_memory(run: Callable[[], None]) -> int:
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_size(size: int, repeat: int, seed: int) -> dict[str, float]:
+    units = [unit.splitlines() for unit in generate_units(size, seed)]
+    best = {phase: float("inf") for phase in PHASES}
+    for _ in range(repeat):
+        sums = dict.fromkeys(PHASES, 0.0)
+        for lines in units:
+            for phase, seconds in time_unit(lines).items():
+                sums[phase] += seconds
+        best = {phase: min(best[phase], sums[phase]) for phase in PHASES}
+
+    result = {f"{phase}_lines_per_sec": size / best[phase] for phase in PHASES}
+    result["peak_memory_bytes"] = peak_memory(lambda: assemble_units(units))
+    return result
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Lists metrics worse than baseline by more than the threshold fraction."""
+    regressions = []
+    for size, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(size, {}).get(metric)
+            if expected is None:
+                continue
+            # Throughput should not drop, memory should not grow.
+            if metric.endswith("_per_sec"):
+                change = (expected - value) / expected
+            else:
+                change = (value - expected) / expected
+            if change > threshold:
+                regressions.append(
+                    f"{size} lines {metric}: {value:,.0f} vs baseline "
+                    f"{expected:,.0f} ({change:+.1%} worse)"
+                )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15, help="tolerated fraction of change"
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = benchmark_size(size, args.repeat, args.seed)
+        metrics = results[str(size)]
+        print(
+            f"{size:>9} lines: "
+            + ", ".join(
+                f"{phase} {metrics[f'{phase}_lines_per_sec']:,.0f}/s"
+                for phase in PHASES
+            )
+            + f", peak {metrics['peak_memory_bytes'] / 2**20:.1f} MiB"
+        )
+
+    if args.output:
+        document = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(document, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Seeded generator of synthetic, assemblable LC-3 programs."""
+
+import random
+
+ORIGIN = "x3000"
+# A single program has to fit the address space, larger sizes are split into units.
+MAX_UNIT_LINES = 20_000
+REGISTERS = [f"R{register}" for register in range(8)]
+
+
+def alu_line(rng: random.Random) -> str:
+    operation = rng.choice(["ADD", "AND", "NOT"])
+    destination, source = rng.choice(REGISTERS), rng.choice(REGISTERS)
+    if operation == "NOT":
+        return f"NOT {destination}, {source}"
+    if rng.random() < 0.5:
+        return f"{operation} {destination}, {source}, {rng.choice(REGISTERS)}"
+    return f"{operation} {destination}, {source}, #{rng.randrange(16)}"
+
+
+def memory_line(rng: random.Random) -> str:
+    operation = rng.choice(["LDR", "STR"])
+    registers = f"{rng.choice(REGISTERS)}, {rng.choice(REGISTERS)}"
+    return f"{operation} {registers}, #{rng.randrange(32)}"
+
+
+def branch_line(rng: random.Random) -> str:
+    operation = rng.choice(["JMP", "JSRR", "RET"])
+    return operation if operation == "RET" else f"{operation} {rng.choice(REGISTERS)}"
+
+
+def directive_line(rng: random.Random, label: str) -> str:
+    directive = rng.choice([".FILL", ".BLKW", ".STRINGZ"])
+    if directive == ".FILL":
+        return f"{label}: .FILL x{rng.randrange(1 << 16):04X}"
+    if directive == ".BLKW":
+        return f"{label}: .BLKW #{rng.randrange(1, 8)}"
+    text = "".join(rng.choices("abcdefghij ,;", k=rng.randrange(1, 16)))
+    return f'{label}: .STRINGZ "{text}"'
+
+
+def comment_line(rng: random.Random) -> str:
+    return rng.choice(["", "; synthetic comment", "    ; indented comment"])
+
+
+def generate_unit(lines: int, rng: random.Random) -> str:
+    """Returns a complete program of given lines count, .ORIG and .END included."""
+    body = []
+    for index in range(max(lines - 2, 0)):
+        kind = rng.random()
+        if kind < 0.45:
+            body.append(alu_line(rng))
+        elif kind < 0.70:
+            body.append(memory_line(rng))
+        elif kind < 0.80:
+            body.append(branch_line(rng))
+        elif kind < 0.95:
+            body.append(directive_line(rng, f"DATA_{index}"))
+        else:
+            body.append(comment_line(rng))
+    return "\n".join([f".ORIG {ORIGIN}", *body, ".END"]) + "\n"
+
+
+def generate_units(lines: int, seed: int = 0) -> list[str]:
+    """Returns programs that together have given lines count."""
+    rng = random.Random(seed)
+    units = []
+    while lines > 0:
+        unit_lines = min(lines, MAX_UNIT_LINES)
+        units.append(generate_unit(unit_lines, rng))
+        lines -= unit_lines
+    return units
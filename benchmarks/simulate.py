@@ -0,0 +1,76 @@
+"""Instructions per second of the simulator, predecoded against decode-on-fetch.
+
+Usage:
+    python benchmarks/simulate.py --iterations 100000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from assembler import Assembler  # noqa: E402
+from simulator import DecodeOnFetch, Simulator, condition_table, decode_table  # noqa
+
+# Copies words between two buffers and sums them, then halts.
+PROGRAM = """.ORIG x3000
+LD R5, COUNT
+OUTER: LEA R1, SOURCE
+LEA R2, TARGET
+AND R3, R3, #0
+ADD R4, R3, #8
+COPY: LDR R0, R1, #0
+STR R0, R2, #0
+ADD R3, R3, R0
+NOT R0, R0
+ADD R1, R1, #1
+ADD R2, R2, #1
+ADD R4, R4, #-1
+BRp COPY
+ADD R5, R5, #-1
+BRp OUTER
+.FILL xF025
+COUNT: .FILL #{iterations}
+SOURCE: .FILL #1
+.FILL #2
+.FILL #3
+.FILL #4
+.FILL #5
+.FILL #6
+.FILL #7
+.FILL #8
+TARGET: .BLKW #8
+.END
+"""
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args(argv)
+
+    assembler = Assembler()
+    lines = PROGRAM.format(iterations=args.iterations).splitlines()
+    assembler.encode_program(assembler.parse_program(lines))
+    data = assembler.to_bytes()
+    decode_table(), condition_table()  # built once per process, not measured
+
+    rates = {}
+    for name, table in (("predecoded", None), ("decode_on_fetch", DecodeOnFetch())):
+        best = 0.0
+        for _ in range(args.repeat):
+            simulator = Simulator(table=table)
+            simulator.load(data)
+            simulator.run()
+            best = max(best, simulator.instructions_per_second)
+        rates[name] = best
+        print(f"{name:>16}: {best:,.0f} instructions/s")
+    print(f"{'speedup':>16}: {rates['predecoded'] / rates['decode_on_fetch']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,38 @@
 from array import array
-from copy import deepcopy
-from typing import Generator
-
-from encoding import (
-    PseudoOpCode,
-    Encoding,
-    LABEL_IDENTIFIER,
-    eligible_for_data_labels,
-    eligible_for_code_labels,
-)
-from instruction_set import InstructionSet
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+from diagnostics import Diagnostic, diagnostic_from, with_column
+from encoding import PseudoOpCode, LABEL_IDENTIFIER
+from instruction_set import Encoder, Fixup, InstructionSet
+from lexer import Token, TokenKind, tokenize
+from listing import SourceIndex
 from logger import Logger
+from memory import Memory
+from preprocessor import (
+    PARSED_FILES,
+    PREPROCESSOR_DIRECTIVES,
+    Entry,
+    LineError,
+    ParsedFileCache,
+    Preprocessor,
+)
+from program import Program, Statement
+from source import SourceFile
+from stats import AssemblerStats, instrument
+from symbols import SymbolKind, SymbolTable
 from syntax import (
-    parse_instruction,
     validate_directive_syntax,
-    is_numeral_base_prefixed,
     cast_to_numeral,
-    is_valid_goto_label,
     DirectiveArgCount,
 )
+from writers import OUTPUT_FORMATS, write_chunks
+
+__version__ = "0.1.0"
+
+# Labels of these directives stand for data, labels of operations for code.
+DATA_DIRECTIVES = frozenset(
+    (PseudoOpCode.FILL, PseudoOpCode.BLKW, PseudoOpCode.STRINGZ)
+)
 
 
 class Assembler(InstructionSet, Logger):
@@ -33,115 +47,470 @@ class Assembler(InstructionSet, Logger):
         line_counter: counts current assembly file line.
         end_flag: set to true if encounters .END instruction in an assembly file to
             raise an exception if any instruction remains afterward.
-        memory: actual encoding of assembly file that contains machine code for LC-3.
-        # ToDo[3]: update in accordance to data & code labels addresses
-        labels_addresses: labels for instruction are followed by ':' on the beginning
-            of an assembly line. It assigns a symbolic name to an address corresponding
-            to the line, therefore there's a mapping between them.
+        memory: actual encoding of assembly file that contains machine code for LC-3,
+            only written ranges are allocated.
+        symbols: labels for instruction are followed by ':' on the beginning of an
+            assembly line. It assigns a symbolic name to an address corresponding to
+            the line, therefore there's a mapping between them. labels_addresses,
+            data_labels_addresses and code_labels_addresses are its views.
+        stats: phases and operations timings if enabled on construction.
+        collect_errors: if set, errors of a line are recorded to diagnostics and
+            assembling continues with the next line instead of raising.
+        diagnostics: errors recorded while assembling with collect_errors set.
+        columnar: if set and NumPy is installed, the second pass computes operation
+            words with vectorized arithmetic over columns of operands.
+        source: the last assembly file loaded, gives text of any line for reports.
+        one_pass: if set, assemble encodes every line right after reading it, so the
+            source is read once. References to labels defined later are patched in
+            when the label is defined.
+        fixups: references to labels not defined yet, keyed by the label.
+        files: included files parsed once and shared, by every assembler of the
+            process unless given.
+        included: modification times of files included by the last source read,
+            keyed by path.
+        relocatable: if set, references to labels the source doesn't define are
+            imports to be resolved by the linker instead of errors.
+        imports: references left to the linker when relocatable.
+        relocations: addresses of words holding an address of a label, they have
+            to be adjusted once the program is placed elsewhere.
+        index: source location of every statement located, by address and by line.
 
     """
 
-    def __init__(self, verbose: bool = False):
+    def __init__(
+        self,
+        verbose: bool = False,
+        stats: bool = False,
+        collect_errors: bool = False,
+        columnar: bool = False,
+        one_pass: bool = False,
+        files: Optional[ParsedFileCache] = None,
+        relocatable: bool = False,
+    ):
         super().__init__(verbose)
         self.origin = self.program_counter = 0x3000
         self.line_counter = -1
         self.end_flag = False
 
-        # ToDo[3]: May be connected with line_counter
-        self.memory = array("H", [0] * (1 << 16))
-        # ToDo[3]: make keys type specific
-        self.data_labels_addresses: dict[str, int] = {}
-        self.code_labels_addresses: dict[str, int] = {}
+        self.memory = Memory()
+        self.symbols = SymbolTable()
+        self.stats: Optional[AssemblerStats] = instrument(self) if stats else None
+        self.collect_errors = collect_errors
+        self.diagnostics: list[Diagnostic] = []
+        self.columnar = columnar
+        self.source: Optional[SourceFile] = None
+        self.one_pass = one_pass
+        self.fixups: dict[str, list[Fixup]] = {}
+        self.files = PARSED_FILES if files is None else files
+        self.included: dict[str, int] = {}
+        self.relocatable = relocatable
+        self.imports: list[Fixup] = []
+        self.relocations: list[int] = []
+        self.index = SourceIndex()
+
+    def reset(self) -> None:
+        """Forgets the last assembled source, so the assembler can take another.
+
+        Only written memory segments are dropped. Configuration, the logger and
+        statistics wrappers are kept, so a reset costs less than a new assembler.
+        """
+        self.origin = self.program_counter = 0x3000
+        self.line_counter = -1
+        self.end_flag = False
+        self.memory.clear()
+        self.symbols.clear()
+        if self.stats is not None:
+            self.stats.clear()
+        self.diagnostics = []
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+        self.fixups = {}
+        self.included = {}
+        self.imports = []
+        self.relocations = []
+        self.index.clear()
+
+    @property
+    def labels_addresses(self) -> dict[str, int]:
+        return self.symbols.addresses()
+
+    @property
+    def data_labels_addresses(self) -> dict[str, int]:
+        return self.symbols.addresses(SymbolKind.DATA)
+
+    @property
+    def code_labels_addresses(self) -> dict[str, int]:
+        return self.symbols.addresses(SymbolKind.CODE)
+
+    def source_line(self, diagnostic: Diagnostic) -> Optional[str]:
+        """Text of the line the diagnostic is about, None if it's not known."""
+        return self.line_text(diagnostic.line, diagnostic.filename)
+
+    def line_text(self, line: int, filename: Optional[str] = None) -> Optional[str]:
+        """Text of a line of the last source, or of an included file if given."""
+        if filename is not None:
+            return self.files.line(filename, line)
+        if self.source is None:
+            return None
+        return self.source.line(line)
+
+    def load_assembly(self, filepath: str) -> SourceFile:
+        """Maps the file to memory, its lines are decoded as they're iterated."""
+        self.source = SourceFile(filepath)
+        return self.source
+
+    def assemble(self, filepath: str) -> Program:
+        """Assembles an assembly file and returns its program model."""
+        if self.one_pass:
+            program = self.assemble_one_pass(self.load_assembly(filepath))
+        else:
+            program = self.map_symbolic_names(filepath)
+            self.encode_program(program)
+        return program
+
+    def sort_diagnostics(self) -> None:
+        """Orders diagnostics of the assembled source first, then included files."""
+        self.diagnostics.sort(
+            key=lambda diagnostic: (
+                diagnostic.filename is not None,
+                diagnostic.filename or "",
+                diagnostic.line,
+                diagnostic.column,
+            )
+        )
 
-    @staticmethod
-    def load_assembly(filepath: str) -> Generator[str, None, None]:
-        with open(filepath, "r") as file:
-            for line in file:
-                yield line
+    def map_symbolic_names(self, filepath: str) -> Program:
+        return self.parse_program(self.load_assembly(filepath))
 
-    def map_symbolic_names(self, filepath: str) -> None:
-        for line in self.load_assembly(filepath):
-            instruction = parse_instruction(line)
+    def read_statements(
+        self, lines: Iterable[str], path: Optional[str] = None
+    ) -> Iterator[Entry]:
+        """Tokenizes lines as they're iterated, expanding includes and macros.
 
-            if instruction[0].endswith(":"):
-                self.process_label(instruction)
+        path: of the source the lines are from, includes are looked up next to it;
+            taken from a SourceFile if not given.
+        """
+        preprocessor = Preprocessor(self.parse_statement, self.files)
+        self.included = preprocessor.included
+        if path is None and isinstance(lines, SourceFile):
+            path = lines.path
+        return preprocessor.expand(lines, path)
+
+    def parse_program(
+        self, lines: Iterable[str], path: Optional[str] = None
+    ) -> Program:
+        """First pass: tokenizes lines once and assigns addresses to labels."""
+        program = Program()
+        for statement in self.read_statements(lines, path):
+            if isinstance(statement, LineError):
+                if not self.collect_errors:
+                    raise statement.error
+                self.diagnostics.append(
+                    diagnostic_from(
+                        statement.error, statement.line, 1, statement.source
+                    )
+                )
+                continue
+            try:
+                self.locate_statement(statement)
+            except Exception as e:
+                if not self.collect_errors:
+                    raise
+                self.diagnostics.append(
+                    diagnostic_from(e, statement.line, 1, statement.source)
+                )
+                continue
+            program.append(statement)
         self.program_counter = self.origin
+        return program
+
+    def encode_program(self, program: Program) -> None:
+        """Second pass: encodes statements located by the first pass."""
+        if not self.columnar or not self.encode_program_columnar(program):
+            for index, statement in enumerate(program):
+                try:
+                    self.count_line()
+                    self.encode_statement(statement)
+                except Exception as e:
+                    if not self.collect_errors:
+                        raise
+                    column = statement.tokens[0].column
+                    self.diagnostics.append(
+                        diagnostic_from(e, statement.line, column, statement.source)
+                    )
+                    # Recover at the address the next statement was located at.
+                    if index + 1 < len(program):
+                        self.program_counter = program[index + 1].address
+        self.report_undefined_labels()
+        self.sort_diagnostics()
+
+    def encode_program_columnar(self, program: Program) -> bool:
+        """Encodes operations with NumPy, False if it isn't installed."""
+        # Imported on demand, NumPy is slow to load and most runs go without it.
+        from columnar import encode_program_columnar
+
+        return encode_program_columnar(self, program)
+
+    def assemble_one_pass(self, lines: Iterable[str]) -> Program:
+        """Locates and encodes every statement as soon as its line is read.
+
+        References to labels not defined yet are kept as fixups and patched into
+        memory when the label is defined, those left are reported at the end.
+        """
+        program = Program()
+        for statement in self.read_statements(lines):
+            if isinstance(statement, LineError):
+                if not self.collect_errors:
+                    raise statement.error
+                self.diagnostics.append(
+                    diagnostic_from(
+                        statement.error, statement.line, 1, statement.source
+                    )
+                )
+                continue
+            located = False
+            try:
+                self.locate_statement(statement)
+                program.append(statement)
+                located, following = True, self.program_counter
+                self.program_counter = statement.address
+                self.count_line()
+                self.encode_statement(statement)
+            except Exception as e:
+                if not self.collect_errors:
+                    raise
+                column = statement.tokens[0].column if located else 1
+                self.diagnostics.append(
+                    diagnostic_from(e, statement.line, column, statement.source)
+                )
+                if located:
+                    # Recover at the address the next statement is located at.
+                    self.program_counter = following
+        self.report_undefined_labels()
+        self.sort_diagnostics()
+        return program
 
-    def read_assembly(self, line: str) -> None:
+    @staticmethod
+    def parse_instruction(line: str, line_number: int) -> list[Token]:
+        """Tokenizes a line, separators are not kept as they carry no encoding."""
+        return [
+            token
+            for token in tokenize(line, line_number)
+            if token.kind != TokenKind.COMMA
+        ]
+
+    def parse_statement(self, line: str, line_number: int) -> Optional[Statement]:
+        instruction = self.parse_instruction(line, line_number)
+        if not instruction:
+            return None
+
+        label = None
+        if instruction[0].text.endswith(LABEL_IDENTIFIER):
+            label = instruction[0].text[: -len(LABEL_IDENTIFIER)]
+            instruction = instruction[1:]
+
+        # Mnemonic is either the first token or follows a label without a colon.
+        mnemonic = next(
+            (
+                token.text
+                for token in instruction[:2]
+                if token.kind == TokenKind.MNEMONIC
+            ),
+            None,
+        )
+        return Statement(
+            mnemonic, instruction, line_number, self.program_counter, label
+        )
+
+    def locate_statement(self, statement: Statement) -> None:
+        """Places the statement at the program counter and maps its label.
+
+        Words are allocated before the label is defined, so statements following
+        one with a bad label keep their addresses when errors are collected.
+        """
+        statement.address = self.program_counter
+        size = self.allocate(statement)
+        try:
+            if statement.label is not None:
+                self.process_label(statement.label, statement)
+        finally:
+            self.index.add(statement, size)
+
+    def allocate(self, statement: Statement) -> int:
+        """Moves program counter past the words the statement will be encoded to.
+
+        Malformed directives are skipped here, they're reported while encoding.
+        Words past the end of memory are refused before the program counter moves.
+        Returns count of words allocated.
+        """
+        operand = statement.tokens[-1]
+        size = 0
+        match statement.mnemonic:
+            case PseudoOpCode.ORIG:
+                if operand.kind == TokenKind.NUMERAL:
+                    origin = cast_to_numeral(operand.text)
+                    if not 0 <= origin < Memory.SIZE:
+                        raise with_column(
+                            IndexError(
+                                f"Memory address out of range: {origin} at "
+                                f"{operand.location}."
+                            ),
+                            operand.column,
+                        )
+                    self.program_counter = origin
+            case PseudoOpCode.BLKW:
+                if operand.kind == TokenKind.NUMERAL:
+                    size = cast_to_numeral(operand.text)
+                    if size < 0:
+                        raise with_column(
+                            ValueError(
+                                f"Invalid '.BLKW' size {size} at {operand.location}."
+                            ),
+                            operand.column,
+                        )
+            case PseudoOpCode.STRINGZ:
+                if operand.kind == TokenKind.STRING:
+                    size = len(operand.text) - 1
+            case PseudoOpCode.END | None:
+                pass
+            case mnemonic if mnemonic in PREPROCESSOR_DIRECTIVES:
+                pass
+            case _:
+                size = 1
+        if self.program_counter + size > Memory.SIZE:
+            first = statement.tokens[0]
+            raise with_column(
+                IndexError(
+                    f"Memory address out of range: {Memory.SIZE} at "
+                    f"{first.location}."
+                ),
+                first.column,
+            )
+        self.program_counter += size
+        return size
+
+    def count_line(self) -> None:
         if self.end_flag:
             raise IndexError("Main program is finished after '.END' directive.")
         self.line_counter += 1
 
-        instruction = parse_instruction(line)
+    def read_assembly(self, line: str) -> None:
+        self.count_line()
+        statement = self.parse_statement(line, self.line_counter + 1)
 
-        if not instruction:
-            self._logger.debug(f"Line[{self.line_counter}]: empty.")
+        if statement is None:
+            self._logger.debug("Line[%d]: empty.", self.line_counter)
             return
 
-        instruction = (
-            instruction[1:]
-            if instruction[0].endswith(LABEL_IDENTIFIER)
-            else instruction
-        )
+        self.encode_statement(statement)
 
-        for directive_code in Encoding.DIRECTIVE_CODES:
-            if directive_code in instruction:
-                self.process_directive(instruction, directive_code)
-                return
-
-        for operation_key in Encoding.OPERATION.keys():
-            if operation_key in instruction:
-                self.process_instruction(instruction, operation_key)
-                return
-
-    def process_label(self, instruction: list[str]) -> None:
-        label_without_colon = instruction[0][:-1]
-        if label_without_colon in (
-            self.data_labels_addresses.keys(),
-            self.code_labels_addresses.keys(),
-        ):
-            raise ValueError(f"Label duplication: {label_without_colon}")
-
-        instruction_without_label = instruction[1:]
-        # ToDo[2]: distinguish data from code labels (for LEA that could work for both)
-        #  based on Explicit addressing.
-        for eligible_for_data_label in eligible_for_data_labels():
-            if eligible_for_data_label in instruction_without_label:
-                # ToDo[2]: .STRINGZ allocates more than 2 bytes.
-                self.data_labels_addresses[label_without_colon] = self.program_counter
-                return
-
-        for eligible_for_code_label in eligible_for_code_labels():
-            if eligible_for_code_label in instruction_without_label:
-                self.code_labels_addresses[label_without_colon] = self.program_counter
-                return
-
-        raise SyntaxError(f"Unknown instruction for {label_without_colon} label.")
-
-    def process_directive(self, instruction: list[str], code: str) -> None:
-        match code:
-            case PseudoOpCode.ORIG:
-                self.process_origin(instruction)
-            case PseudoOpCode.FILL:
-                self.process_fill(instruction)
-            case PseudoOpCode.BLKW:
-                self.process_block_of_words(instruction)
-            case PseudoOpCode.STRINGZ:
-                self.process_string_with_zero(instruction)
-            case PseudoOpCode.END:
-                if len(instruction) != 1:
-                    raise SyntaxError("Directive '.END' does not accept operands.")
-                self.end_flag = True
+    def encode_statement(self, statement: Statement) -> None:
+        """Second pass: encodes a statement to memory at the program counter."""
+        if statement.mnemonic is None:
+            first = statement.tokens[0]
+            raise with_column(
+                SyntaxError(f"Unknown instruction '{first.text}' at {first.location}."),
+                first.column,
+            )
 
-    def process_instruction(self, instruction: list[str], operation_code: str) -> None:
-        binary_representation = 0x0000
-        binary_representation |= Encoding.OPERATION[operation_code]
+        encoder = self.ENCODERS.get(statement.mnemonic)
+        if encoder is not None:
+            self.process_instruction(statement.tokens, encoder)
+        else:
+            self.DIRECTIVE_HANDLERS[statement.mnemonic](self, statement.tokens)
+
+    def process_label(self, label_without_colon: str, statement: Statement) -> None:
+        """Defines the label, as data label for directives placing data at it."""
+        if statement.mnemonic is None:
+            raise SyntaxError(f"Unknown instruction for {label_without_colon} label.")
+        kind = (
+            SymbolKind.DATA
+            if statement.mnemonic in DATA_DIRECTIVES
+            else SymbolKind.CODE
+        )
+        symbol = self.symbols.define(
+            label_without_colon, statement.address, kind, statement.line
+        )
+        if self.fixups:
+            self.resolve_fixups(symbol.name, symbol.address)
 
-        operands_with_separator = instruction[1:]
-        operands = [operand.strip(",") for operand in operands_with_separator]
-        binary_representation |= self.process_operands(operation_code, operands)
+    def reference_label(self, operand: Token, width: int = 0) -> None:
+        """Sets the label bits of the word at the program counter.
+
+        width: bits of the PC offset to the label; 0 to set the label address.
+        """
+        fixup = Fixup(self.program_counter, operand, width)
+        symbol = self.symbols.get(operand.text)
+        if symbol is None:
+            self.fixups.setdefault(operand.text, []).append(fixup)
+        else:
+            self.patch(fixup, symbol.address)
+
+    def patch(self, fixup: Fixup, address: int) -> None:
+        self.memory[fixup.address] |= fixup.bits(address)
+        if not fixup.width:
+            self.relocations.append(fixup.address)
+
+    def resolve_fixups(self, label: str, address: int) -> None:
+        """Patches references made before the label has been defined."""
+        for fixup in self.fixups.pop(label, ()):
+            try:
+                self.patch(fixup, address)
+            except Exception as e:
+                if not self.collect_errors:
+                    raise
+                operand = fixup.operand
+                self.diagnostics.append(
+                    diagnostic_from(e, operand.line, operand.column, operand.source)
+                )
+
+    def report_undefined_labels(self) -> None:
+        """Raises for references left unresolved, records all if collecting.
+
+        Relocatable programs import them instead.
+        """
+        fixups, self.fixups = self.fixups, {}
+        if self.relocatable:
+            for references in fixups.values():
+                self.imports.extend(references)
+            return
+        for label, references in fixups.items():
+            for fixup in references:
+                operand = fixup.operand
+                error = with_column(
+                    NameError(f"Undefined label {label} at {operand.location}."),
+                    operand.column,
+                )
+                if not self.collect_errors:
+                    raise error
+                self.diagnostics.append(
+                    diagnostic_from(error, operand.line, operand.column, operand.source)
+                )
+
+    def process_preprocessor_directive(self, instruction: list[Token]) -> None:
+        directive = instruction[0]
+        raise with_column(
+            SyntaxError(
+                f"'{directive.text}' is expanded when a file is read, it can't be "
+                f"encoded at {directive.location}."
+            ),
+            directive.column,
+        )
 
-        self.write_to_memory(binary_representation)
+    def process_end(self, instruction: list[Token]) -> None:
+        if len(instruction) != 1:
+            raise SyntaxError("Directive '.END' does not accept operands.")
+        self.end_flag = True
+
+    def process_instruction(self, instruction: list[Token], encoder: Encoder) -> None:
+        self.write_to_memory(encoder(instruction[1:]))
+        label_slot = self.LABEL_SLOTS.get(instruction[0].text)
+        if label_slot is not None:
+            index, width = label_slot
+            operand = instruction[index + 1]
+            if operand.kind == TokenKind.LABEL:
+                self.reference_label(operand, width)
         self.program_counter += 1
 
     def write_to_memory(self, value: int) -> None:
@@ -149,7 +518,7 @@ class Assembler(InstructionSet, Logger):
             value = (1 << 16) + value
         self.memory[self.program_counter] = value
 
-    def process_origin(self, instruction: list[str]) -> None:
+    def process_origin(self, instruction: list[Token]) -> None:
         """Define starting address of program. If not setup default 0x3000
 
         syntax: .ORIG address
@@ -159,18 +528,18 @@ class Assembler(InstructionSet, Logger):
         if self.line_counter != 0:
             raise SyntaxError(".ORIG has to be placed before a main program.")
 
-        if instruction[0] != ".ORIG":
+        if instruction[0].text != ".ORIG":
             raise SyntaxError("'.ORIG' has to be first argument in the instruction.")
 
         if len(instruction) != DirectiveArgCount.WITHOUT_GOTO_LABEL.value:
             raise ValueError("Instruction with '.ORIG' cannot work with label.")
 
         value = cast_to_numeral(
-            operand=instruction[1], allow_decimal=False, allow_binary=False
+            operand=instruction[1].text, allow_decimal=False, allow_binary=False
         )
         self.origin = self.program_counter = value
 
-    def process_fill(self, instruction: list[str]) -> None:
+    def process_fill(self, instruction: list[Token]) -> None:
         """Allocate one word, initialize with word.
 
         syntax: label .FILL value
@@ -184,20 +553,29 @@ class Assembler(InstructionSet, Logger):
 
         # ToDo[2]: remove duplication if pattern
         operand = instruction[arg_count.value - 1]
-        if is_numeral_base_prefixed(operand):
-            value = cast_to_numeral(operand)
+        if operand.kind == TokenKind.NUMERAL:
+            value = cast_to_numeral(operand.text)
+            # A word holds either a signed or an unsigned 16-bit value.
+            if not -(1 << 15) <= value < 1 << 16:
+                raise with_column(
+                    ValueError(
+                        f"'.FILL' value {value} out of range [{-(1 << 15)}, "
+                        f"{(1 << 16) - 1}] at {operand.location}."
+                    ),
+                    operand.column,
+                )
             self.write_to_memory(value)
-        elif is_valid_goto_label(operand):
-            # ToDo[1]: verify if still valid & implement data labels
-            raise NotImplementedError()
+        elif operand.kind == TokenKind.LABEL:
+            self.write_to_memory(0)
+            self.reference_label(operand)
         else:
-            msg = "Invalid '.FILL' operand."
+            msg = f"Invalid '.FILL' operand at {operand.location}."
             self._logger.error(msg)
-            raise SyntaxError(msg)
+            raise with_column(SyntaxError(msg), operand.column)
 
         self.program_counter += 1
 
-    def process_block_of_words(self, instruction: list[str]) -> None:
+    def process_block_of_words(self, instruction: list[Token]) -> None:
         """Allocate multiple words of storage, value unspecified.
 
         syntax: label .BLKW n
@@ -209,20 +587,21 @@ class Assembler(InstructionSet, Logger):
         arg_count = validate_directive_syntax(instruction, ".BLKW")
 
         operand = instruction[arg_count.value - 1]
-        if is_numeral_base_prefixed(operand):
+        if operand.kind == TokenKind.NUMERAL:
             words_to_allocate = cast_to_numeral(
-                operand, allow_hexadecimal=False, allow_binary=False
+                operand.text, allow_hexadecimal=False, allow_binary=False
             )
+            self.memory.reserve(self.program_counter, words_to_allocate)
             self.program_counter += words_to_allocate
-        elif is_valid_goto_label(operand):
+        elif operand.kind == TokenKind.LABEL:
             # ToDo[1]: verify if still valid & implement data labels
             raise NotImplementedError()
         else:
-            msg = "Invalid '.BLKW' operand."
+            msg = f"Invalid '.BLKW' operand at {operand.location}."
             self._logger.error(msg)
-            raise SyntaxError(msg)
+            raise with_column(SyntaxError(msg), operand.column)
 
-    def process_string_with_zero(self, instruction: list[str]) -> None:
+    def process_string_with_zero(self, instruction: list[Token]) -> None:
         """Allocate n+1 locations, initialize with characters and null terminator.
 
         syntax: label .STRINGZ "string"
@@ -234,32 +613,55 @@ class Assembler(InstructionSet, Logger):
         arg_count = validate_directive_syntax(instruction, ".STRINGZ")
 
         arg = instruction[arg_count.value - 1]
-        if arg.startswith('"') and arg.endswith('"'):
-            string = arg[1:-1]
-
-            for char in string:
-                self.write_to_memory(ord(char))
-                self.program_counter += 1
+        if arg.kind == TokenKind.STRING:
+            string = arg.text[1:-1]
 
-            self.write_to_memory(0)
-            self.program_counter += 1
+            words = array("H", map(ord, string))
+            words.append(0)
+            self.memory.write_words(self.program_counter, words)
+            self.program_counter += len(words)
         else:
-            msg = "Invalid '.STRINGZ' operand. It has to be between double quotes."
+            msg = (
+                f"Invalid '.STRINGZ' operand at {arg.location}. "
+                "It has to be between double quotes."
+            )
             self._logger.error(msg)
-            raise SyntaxError(msg)
+            raise with_column(SyntaxError(msg), arg.column)
 
-    def to_bytes(self, big_endian: bool = True) -> bytes:
+    def to_bytes(self, big_endian: bool = True, output_format: str = "obj") -> bytes:
         """Encode result to .bin file.
 
         big_endian: defines if encoding for parsing to bytes has to be big or little
             endian, e.g.: b"\x50\x43" in Big-Endian: 0x5043, Little-endian: 0x4350
+        output_format: one of OUTPUT_FORMATS.
         """
-        memory_deepcopy = deepcopy(self.memory)
-        memory_deepcopy[self.program_counter] = self.origin
-        if big_endian:
-            memory_deepcopy.byteswap()
-        output = memory_deepcopy[
-            self.program_counter : self.program_counter + 1
-        ].tobytes()
-        output += memory_deepcopy[self.origin : self.program_counter].tobytes()
-        return output
+        return b"".join(self.iter_bytes(big_endian, output_format))
+
+    def iter_bytes(
+        self, big_endian: bool = True, output_format: str = "obj"
+    ) -> Iterator[bytes | memoryview]:
+        """Yields the program in given output format as consecutive chunks.
+
+        Chunks are views of the memory whenever possible, hence they're valid only
+        until the memory is written again.
+        """
+        return OUTPUT_FORMATS[output_format].chunks(
+            self.memory, self.origin, self.program_counter, big_endian
+        )
+
+    def write(
+        self, stream: BinaryIO, big_endian: bool = True, output_format: str = "obj"
+    ) -> int:
+        """Streams the program to a binary stream, returns count of bytes written."""
+        return write_chunks(stream, self.iter_bytes(big_endian, output_format))
+
+    DIRECTIVE_HANDLERS: dict[str, Callable[["Assembler", list[Token]], None]] = {
+        PseudoOpCode.ORIG: process_origin,
+        PseudoOpCode.FILL: process_fill,
+        PseudoOpCode.BLKW: process_block_of_words,
+        PseudoOpCode.STRINGZ: process_string_with_zero,
+        PseudoOpCode.END: process_end,
+        PseudoOpCode.INCLUDE: process_preprocessor_directive,
+        PseudoOpCode.MACRO: process_preprocessor_directive,
+        PseudoOpCode.END_MACRO: process_preprocessor_directive,
+    }
@@ -0,0 +1,326 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+from cache import AssemblyCache, assemble_cached
+from fileio import open_atomically
+from pool import ASSEMBLERS
+from relocatable import MODULE_SUFFIX, ObjectModule
+from stats import AssemblerStats
+from writers import OUTPUT_FORMATS, read_object, write_chunks
+
+
+class BatchResult:
+    """Outcome of assembling a single file within a batch.
+
+    Attributes:
+        source: path of the assembly file.
+        output: path of the written object file, None if assembling failed.
+        statements: count of encoded statements.
+        words: count of emitted 16-bit words, origin included.
+        error: '<error class>: <message>' if assembling failed, None otherwise.
+        elapsed: wall time spent on the file in seconds.
+        cached: True if the object was taken from the assembly cache.
+        stats: AssemblerStats.as_dict() of the file if statistics were collected.
+        diagnostics: every error formatted as 'file:line:column: ...' when collected.
+    """
+
+    __slots__ = (
+        "source",
+        "output",
+        "statements",
+        "words",
+        "error",
+        "elapsed",
+        "cached",
+        "stats",
+        "diagnostics",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        output: Optional[str] = None,
+        statements: int = 0,
+        words: int = 0,
+        error: Optional[str] = None,
+        elapsed: float = 0.0,
+        cached: bool = False,
+        stats: Optional[dict[str, Any]] = None,
+        diagnostics: Optional[list[str]] = None,
+    ):
+        self.source = source
+        self.output = output
+        self.statements = statements
+        self.words = words
+        self.error = error
+        self.elapsed = elapsed
+        self.cached = cached
+        self.stats = stats
+        self.diagnostics = diagnostics or []
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchReport:
+    """Aggregates results of a batch to report its throughput."""
+
+    def __init__(self, collect_stats: bool = False) -> None:
+        self.files = 0
+        self.failures = 0
+        self.statements = 0
+        self.words = 0
+        self.cache_hits = 0
+        self.stats = AssemblerStats() if collect_stats else None
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, result: BatchResult) -> None:
+        self.files += 1
+        self.failures += not result.ok
+        self.statements += result.statements
+        self.words += result.words
+        self.cache_hits += result.cached
+        if self.stats is not None and result.stats is not None:
+            self.stats.update(result.stats)
+        self.elapsed = time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        return (
+            f"{self.files} files ({self.failures} failed, "
+            f"{self.cache_hits} cached), "
+            f"{self.statements} statements, {self.words} words in "
+            f"{self.elapsed:.3f}s: {self.files / elapsed:.1f} files/s, "
+            f"{self.statements / elapsed:.0f} statements/s"
+        )
+
+
+class BatchOptions(NamedTuple):
+    """Settings shared by every file of a batch.
+
+    Attributes:
+        output_dir: directory for object files, next to sources if None.
+        big_endian: byte order of emitted words.
+        cache_dir: directory of the assembly cache shared by workers, no caching if
+            None.
+        collect_stats: attach AssemblerStats of every assembled file to its result.
+        collect_errors: report every error of a file instead of the first one.
+        columnar: encode operations with vectorized NumPy arithmetic if installed.
+        output_format: one of OUTPUT_FORMATS, also sets the output file suffix.
+        one_pass: encode every line right after reading it, patching references to
+            labels defined later.
+        relocatable: write relocatable object modules to be linked, references to
+            labels of other modules are left as imports.
+    """
+
+    output_dir: Optional[str] = None
+    big_endian: bool = True
+    cache_dir: Optional[str] = None
+    collect_stats: bool = False
+    collect_errors: bool = False
+    columnar: bool = False
+    output_format: str = "obj"
+    one_pass: bool = False
+    relocatable: bool = False
+
+
+def output_path(
+    source: str,
+    output_dir: Optional[str],
+    output_format: str = "obj",
+    relocatable: bool = False,
+) -> Path:
+    suffix = MODULE_SUFFIX if relocatable else OUTPUT_FORMATS[output_format].suffix
+    path = Path(source).with_suffix(suffix)
+    return Path(output_dir) / path.name if output_dir is not None else path
+
+
+@lru_cache(maxsize=None)
+def open_cache(directory: str) -> AssemblyCache:
+    """Cache of the directory shared by the files a worker process assembles."""
+    return AssemblyCache(directory)
+
+
+def assemble_file(source: str, options: BatchOptions = BatchOptions()) -> BatchResult:
+    """Assembles a file to an object file, any failure is returned as the result."""
+    started = time.perf_counter()
+    statements = 0
+    cached = False
+    stats = None
+    try:
+        # A borrowed assembler is reset and given back once its output is written.
+        with ExitStack() as stack:
+            chunks: Iterator[bytes | memoryview]
+            if options.cache_dir is not None and not options.relocatable:
+                cache = open_cache(options.cache_dir)
+                hits = cache.hits
+                data = assemble_cached(source, cache, options.big_endian).object_bytes
+                cached = cache.hits > hits
+                memory, start, stop = read_object(data, options.big_endian)
+                chunks = OUTPUT_FORMATS[options.output_format].chunks(
+                    memory, start, stop, options.big_endian
+                )
+                assembler = None
+            else:
+                assembler = stack.enter_context(
+                    ASSEMBLERS.borrow(
+                        stats=options.collect_stats,
+                        collect_errors=options.collect_errors,
+                        columnar=options.columnar,
+                        one_pass=options.one_pass,
+                        relocatable=options.relocatable,
+                    )
+                )
+                statements = len(assembler.assemble(source))
+                if assembler.diagnostics:
+                    return BatchResult(
+                        source,
+                        error=f"{len(assembler.diagnostics)} errors",
+                        elapsed=time.perf_counter() - started,
+                        diagnostics=[
+                            diagnostic.format(source, assembler.source_line(diagnostic))
+                            for diagnostic in assembler.diagnostics
+                        ],
+                    )
+                start, stop = assembler.origin, assembler.program_counter
+                if options.relocatable:
+                    chunks = iter(
+                        (ObjectModule.from_assembler(assembler, source).to_bytes(),)
+                    )
+                else:
+                    chunks = assembler.iter_bytes(
+                        options.big_endian, options.output_format
+                    )
+            path = output_path(
+                source, options.output_dir, options.output_format, options.relocatable
+            )
+            with open_atomically(path) as stream:
+                write_chunks(stream, chunks)
+            if assembler is not None and assembler.stats is not None:
+                stats = assembler.stats.as_dict()
+    except Exception as e:
+        return BatchResult(
+            source,
+            error=f"{e.__class__.__name__}: {e}",
+            elapsed=time.perf_counter() - started,
+        )
+    return BatchResult(
+        source,
+        output=str(path),
+        statements=statements,
+        words=stop - start + 1,
+        elapsed=time.perf_counter() - started,
+        cached=cached,
+        stats=stats,
+    )
+
+
+def assemble_batch(
+    sources: Iterable[str],
+    options: BatchOptions = BatchOptions(),
+    workers: Optional[int] = None,
+) -> Iterator[BatchResult]:
+    """Assembles files across a process pool, yielding results as they finish.
+
+    workers: size of the pool, CPU count if None; 1 assembles in this process.
+    """
+    if options.output_dir is not None:
+        os.makedirs(options.output_dir, exist_ok=True)
+
+    if workers == 1:
+        for source in sources:
+            yield assemble_file(source, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(assemble_file, source, options): source
+            for source in sources
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:  # worker process died, e.g. BrokenProcessPool
+                yield BatchResult(futures[future], error=f"{e.__class__.__name__}: {e}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="batch", description="Assemble many LC-3 assembly files in parallel."
+    )
+    parser.add_argument("sources", nargs="+", help="assembly files")
+    parser.add_argument("-o", "--output-dir", help="directory for object files")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes count")
+    parser.add_argument(
+        "--little-endian", action="store_true", help="emit little-endian words"
+    )
+    parser.add_argument("--cache-dir", help="reuse objects of unchanged sources")
+    parser.add_argument(
+        "--stats", action="store_true", help="report time per phase and operation"
+    )
+    parser.add_argument(
+        "--all-errors",
+        action="store_true",
+        help="report every error of a file instead of stopping at the first one",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="encode operations with NumPy, if installed",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default="obj",
+        help="output format, object by default",
+    )
+    parser.add_argument(
+        "--one-pass",
+        action="store_true",
+        help="read every source once, patching forward label references",
+    )
+    parser.add_argument(
+        "--relocatable",
+        action="store_true",
+        help="write relocatable modules to be linked, labels may be imported",
+    )
+    args = parser.parse_args(argv)
+    if args.relocatable and (args.cache_dir is not None or args.format != "obj"):
+        parser.error("--relocatable can't be combined with --cache-dir nor --format")
+
+    options = BatchOptions(
+        args.output_dir,
+        not args.little_endian,
+        args.cache_dir,
+        args.stats,
+        args.all_errors,
+        args.columnar,
+        args.format,
+        args.one_pass,
+        args.relocatable,
+    )
+    report = BatchReport(args.stats)
+    for result in assemble_batch(args.sources, options, args.jobs):
+        report.add(result)
+        for diagnostic in result.diagnostics:
+            print(diagnostic, file=sys.stderr)
+        if not result.ok and not result.diagnostics:
+            print(f"{result.source}: {result.error}", file=sys.stderr)
+    if report.stats is not None:
+        print(report.stats.report(), file=sys.stderr)
+    print(report.summary(), file=sys.stderr)
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from assembler import Assembler, __version__
+from fileio import write_atomically
+from source import SourceFile
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, eviction is not serialized there
+    fcntl = None  # type: ignore[assignment]
+
+ENTRY_SUFFIX = ".entry"
+ENTRY_FORMAT = 2
+LOCK_FILENAME = ".lock"
+# Entry file: length of the JSON header, JSON header with symbols and included
+# files, object bytes.
+HEADER_LENGTH = struct.Struct(">I")
+
+
+class CachedAssembly(NamedTuple):
+    """Assembled object with its symbols.
+
+    Attributes:
+        included: modification times of files included by the source, keyed by
+            path; the entry is stale once any of them changes.
+    """
+
+    object_bytes: bytes
+    symbols: dict[str, int]
+    included: dict[str, int] = {}
+
+
+def is_modified(path: str, mtime: int) -> bool:
+    try:
+        return os.stat(path).st_mtime_ns != mtime
+    except FileNotFoundError:
+        return True
+
+
+class AssemblyCache:
+    """Content-addressed on-disk cache of assembled objects.
+
+    Entries are keyed by a hash of the source bytes, the directory includes are
+    resolved against, the assembler version and the output options. An entry is
+    not used if any file included by the source has been modified since. Every
+    entry is a single file written atomically, so any count of processes can share
+    the directory. Least recently used entries are evicted once the total size
+    exceeds max_bytes; a hit refreshes the entry modification time which serves as
+    its last use. The directory is scanned on the first put, later puts add their
+    size to the total and scan again only once it's over max_bytes. Entries put
+    by other processes meanwhile are counted by the next scan.
+
+    Attributes:
+        hits: count of lookups served from the cache.
+        misses: count of lookups that required assembling.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 << 20):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Bytes of entries as of the last scan plus those put since, None before.
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def key(
+        source: bytes | mmap.mmap, big_endian: bool = True, directory: str = ""
+    ) -> str:
+        """Hash of the source and its options.
+
+        directory: real path of the directory the source is in, the same source
+            includes other files from elsewhere.
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            f"lc3-asmblr {__version__} format={ENTRY_FORMAT} "
+            f"big_endian={big_endian} directory={directory}\0".encode()
+        )
+        digest.update(source)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[CachedAssembly]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:  # also when evicted by another process meanwhile
+            self.misses += 1
+            return None
+
+        (header_length,) = HEADER_LENGTH.unpack_from(data)
+        header_end = HEADER_LENGTH.size + header_length
+        header = json.loads(data[HEADER_LENGTH.size : header_end])
+        included = header["included"]
+        if any(is_modified(path, mtime) for path, mtime in included.items()):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted meanwhile, the entry read is still valid
+        self.hits += 1
+        return CachedAssembly(data[header_end:], header["symbols"], included)
+
+    def put(self, key: str, entry: CachedAssembly) -> None:
+        header = json.dumps(
+            {"symbols": entry.symbols, "included": entry.included},
+            separators=(",", ":"),
+        ).encode()
+        data = HEADER_LENGTH.pack(len(header)) + header + entry.object_bytes
+        write_atomically(self._path(key), data)
+        if self._size is not None:
+            self._size += len(data)
+        if self._size is None or self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the size cap is met."""
+        with self._lock():
+            entries = []
+            total_size = 0
+            for path in self.directory.glob(f"*{ENTRY_SUFFIX}"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total_size <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total_size -= size
+            self._size = total_size
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.directory / LOCK_FILENAME, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def assemble_cached(
+    filepath: str, cache: AssemblyCache, big_endian: bool = True
+) -> CachedAssembly:
+    """Returns object bytes and symbols of the file, assembling it only on a miss."""
+    with SourceFile(filepath) as source:
+        directory = os.path.dirname(os.path.realpath(filepath))
+        key = cache.key(source.data, big_endian, directory)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        assembler = Assembler()
+        # Assembled from the mapping hashed, the key must match what's been encoded.
+        assembler.encode_program(assembler.parse_program(source))
+    entry = CachedAssembly(
+        assembler.to_bytes(big_endian),
+        assembler.labels_addresses,
+        assembler.included,
+    )
+    cache.put(key, entry)
+    return entry
@@ -0,0 +1,275 @@
+from array import array
+from collections import Counter
+from itertools import chain, repeat
+from operator import attrgetter, itemgetter
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from diagnostics import diagnostic_from
+from encoding import Encoding, OperandType, LABEL_OPERAND_TYPES
+from instruction_set import IMMEDIATE_VALUE_FLAG
+from lexer import TokenKind
+from program import Program
+from stats import MNEMONIC_NAMES, AssemblerStats
+
+try:
+    import numpy as np
+except ImportError:  # optional, programs are encoded by the scalar path then
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from assembler import Assembler
+
+# Codes of token kinds in columns, other kinds don't occur in encodable operations.
+OTHER, MNEMONIC, REGISTER, NUMERAL = 0, 1, 2, 3
+# Mnemonic followed by at most 3 operands.
+MAX_TOKENS = 1 + len(Encoding.REGISTER_OPERANDS_POSITION)
+# States of statements after the vectorized encoding.
+SCALAR, ENCODED, OUT_OF_RANGE = 0, 1, 2
+
+# Operations referring to labels are left to the scalar path, which patches them.
+VECTORIZED_SHAPES = {
+    operation_code: shape
+    for operation_code, shape in Encoding.OPERAND_SHAPES.items()
+    if not any(slot.type in LABEL_OPERAND_TYPES for slot in shape)
+}
+
+statement_tokens = attrgetter("tokens")
+statement_address = attrgetter("address")
+token_kind = attrgetter("kind")
+token_text = attrgetter("text")
+token_value = attrgetter("value")
+first = itemgetter(0)
+
+
+class Layout(NamedTuple):
+    """Operand kinds of an operation and where the operands go in the word.
+
+    Attributes:
+        operation_code: mnemonic of the operation.
+        base: operation word without operands, immediate value flag included.
+        kinds: code of every operand kind.
+        positions: first bit position of every operand.
+        width: bits of the numeral operand, always the last one; 0 if there's none.
+    """
+
+    operation_code: str
+    base: int
+    kinds: tuple[int, ...]
+    positions: tuple[int, ...]
+    width: int
+
+
+def compile_layouts() -> list[Layout]:
+    """Layouts of every operation in VECTORIZED_SHAPES.
+
+    Operation with a register xor numeral operand gets a layout for both kinds.
+    """
+    layouts = []
+    for operation_code, shape in VECTORIZED_SHAPES.items():
+        variants = [
+            Layout(operation_code, Encoding.OPERATION[operation_code], (), (), 0)
+        ]
+        for slot in shape:
+            extended = []
+            for layout in variants:
+                positions = layout.positions + (slot.position,)
+                if slot.type != OperandType.NUMERAL:
+                    extended.append(
+                        layout._replace(
+                            kinds=layout.kinds + (REGISTER,), positions=positions
+                        )
+                    )
+                if slot.type != OperandType.REGISTER:
+                    base = layout.base
+                    if slot.type == OperandType.REGISTER_XOR_NUMERAL:
+                        base |= IMMEDIATE_VALUE_FLAG
+                    extended.append(
+                        layout._replace(
+                            base=base,
+                            kinds=layout.kinds + (NUMERAL,),
+                            positions=positions,
+                            width=slot.width,
+                        )
+                    )
+            variants = extended
+        layouts.extend(variants)
+    return layouts
+
+
+LAYOUTS = compile_layouts()
+OPERATION_IDS = {
+    operation_code: index for index, operation_code in enumerate(VECTORIZED_SHAPES)
+}
+
+
+def gather(program: Program) -> tuple[Any, Any, Any, Any]:
+    """Collects the program into columns, statement per row, token per column.
+
+    Tokens are read with map over attribute getters, so no Python code runs per
+    token. Rows of statements with more than MAX_TOKENS tokens are truncated, they
+    never match any layout.
+
+    Returns operation ids (-1 for other mnemonics), tokens count, kind codes and
+    values, the last two with MAX_TOKENS columns.
+    """
+    token_lists = list(map(statement_tokens, program))
+    tokens = list(chain.from_iterable(token_lists))
+    lengths = np.fromiter(map(len, token_lists), dtype=np.intp, count=len(token_lists))
+    operations = np.fromiter(
+        map(OPERATION_IDS.get, map(token_text, map(first, token_lists)), repeat(-1)),
+        dtype=np.intp,
+        count=len(token_lists),
+    )
+
+    count = len(tokens)
+    kinds = np.fromiter(map(token_kind, tokens), dtype=object, count=count)
+    codes = np.zeros(count + 1, dtype=np.uint8)  # the last one pads short rows
+    codes[:-1][kinds == TokenKind.MNEMONIC] = MNEMONIC
+    codes[:-1][kinds == TokenKind.REGISTER] = REGISTER
+    codes[:-1][kinds == TokenKind.NUMERAL] = NUMERAL
+
+    values = np.zeros(count + 1, dtype=np.int64)
+    objects = np.fromiter(map(token_value, tokens), dtype=object, count=count)
+    present = objects != None  # noqa: E711, compared element-wise
+    values[:-1][present] = objects[present]
+    codes[:-1][~present & (codes[:-1] == NUMERAL)] = OTHER  # malformed numeral
+
+    offsets = np.cumsum(lengths) - lengths
+    columns = np.arange(MAX_TOKENS)
+    indices = offsets[:, None] + columns
+    indices[columns >= lengths[:, None]] = count
+    return operations, lengths, codes[indices], values[indices]
+
+
+def encode_columns(
+    operations: Any, lengths: Any, codes: Any, values: Any
+) -> tuple[Any, Any]:
+    """Computes words of rows matching a layout with vectorized shifts and masks.
+
+    Returns words and states of all rows.
+    """
+    words = np.zeros(len(operations), dtype=np.uint16)
+    states = np.full(len(operations), SCALAR, dtype=np.uint8)
+    is_operation = codes[:, 0] == MNEMONIC
+    for layout in LAYOUTS:
+        matched = (
+            is_operation
+            & (operations == OPERATION_IDS[layout.operation_code])
+            & (lengths == 1 + len(layout.kinds))
+        )
+        for column, kind in enumerate(layout.kinds, start=1):
+            matched &= codes[:, column] == kind
+        rows = np.flatnonzero(matched)
+        if not len(rows):
+            continue
+
+        operands = values[rows, 1:]
+        encoded = np.full(len(rows), layout.base, dtype=np.int64)
+        registers = layout.positions[:-1] if layout.width else layout.positions
+        for column, position in enumerate(registers):
+            encoded |= operands[:, column] << position
+        state = np.full(len(rows), ENCODED, dtype=np.uint8)
+        if layout.width:
+            numerals = operands[:, len(layout.positions) - 1]
+            mask = (1 << layout.width) - 1
+            encoded |= (numerals & mask) << layout.positions[-1]
+            half = 1 << (layout.width - 1)
+            state[(numerals < -half) | (numerals >= half)] = OUT_OF_RANGE
+        words[rows] = encoded
+        states[rows] = state
+    return words, states
+
+
+def encode_program_columnar(assembler: "Assembler", program: Program) -> bool:
+    """Second pass computing operation words with vectorized NumPy arithmetic.
+
+    Directives, operations not in VECTORIZED_SHAPES and malformed operations (out of
+    range numerals included) are encoded by the scalar path in source order, so
+    errors and diagnostics are the same as with the scalar second pass.
+
+    Returns False without encoding anything if NumPy is not installed or the
+    program is empty.
+    """
+    if np is None or not len(program):
+        return False
+    started = perf_counter()
+    words, states = encode_columns(*gather(program))
+    emitted = states == ENCODED
+    addresses = np.fromiter(
+        map(statement_address, program), dtype=np.int64, count=len(program)
+    )
+    # Written first, so the scalar path fills the gaps of a single memory block.
+    # Operations after '.END' are written too, their errors fail the assembling.
+    write_span(assembler, addresses[emitted], words[emitted])
+    if assembler.stats is not None:
+        record_vectorized(assembler.stats, program, emitted, perf_counter() - started)
+
+    # Vectorized statements between scalar ones only advance the counters, unless
+    # they follow '.END' and have to be reported one by one.
+    previous = 0
+    for index in np.flatnonzero(~emitted).tolist() + [len(program)]:
+        if assembler.end_flag:
+            for skipped in range(previous, index):
+                encode_statement(assembler, program, skipped)
+        else:
+            assembler.line_counter += index - previous
+            assembler.program_counter += index - previous
+        if index < len(program):
+            encode_statement(assembler, program, index)
+        previous = index + 1
+    return True
+
+
+def record_vectorized(
+    stats: AssemblerStats, program: Program, emitted: Any, seconds: float
+) -> None:
+    """Counts vectorized statements by operation, sharing the time evenly.
+
+    Statements left to the scalar path are timed by the instrumented assembler.
+    """
+    rows = np.flatnonzero(emitted).tolist()
+    if not rows:
+        return
+    stats.phases["encode"] += seconds
+    share = seconds / len(rows)
+    counts = Counter(MNEMONIC_NAMES[program[row].mnemonic] for row in rows)
+    for name, count in counts.items():
+        stats.add_operation(name, share * count, count)
+
+
+def encode_statement(assembler: "Assembler", program: Program, index: int) -> None:
+    statement = program[index]
+    try:
+        assembler.count_line()
+        assembler.encode_statement(statement)
+    except Exception as e:
+        if not assembler.collect_errors:
+            raise
+        column = statement.tokens[0].column
+        assembler.diagnostics.append(
+            diagnostic_from(e, statement.line, column, statement.source)
+        )
+        # Recover at the address the next statement was located at.
+        if index + 1 < len(program):
+            assembler.program_counter = program[index + 1].address
+
+
+def write_span(assembler: "Assembler", addresses: Any, words: Any) -> None:
+    """Writes words at their addresses merged with words already in memory.
+
+    Statements are allocated contiguously, so the span between the lowest and
+    the highest address is written with a single call, gaps with zeros.
+    """
+    if not len(addresses):
+        return
+    start, stop = int(addresses.min()), int(addresses.max()) + 1
+    span = np.zeros(stop - start, dtype=np.uint16)
+    for address, view in assembler.memory.segments(start, stop):
+        with view:  # released, so memory blocks can be resized when written
+            offset = address - start
+            span[offset : offset + len(view)] = np.frombuffer(view, dtype=np.uint16)
+    span[addresses - start] = words
+    merged = array("H")
+    merged.frombytes(span.tobytes())
+    assembler.memory.write_words(start, merged)
@@ -0,0 +1,72 @@
+from enum import Enum
+from typing import NamedTuple, Optional, TypeVar
+
+ErrorT = TypeVar("ErrorT", bound=BaseException)
+
+
+class Severity(Enum):
+    ERROR = "error"
+    WARNING = "warning"
+
+
+class Diagnostic(NamedTuple):
+    """Problem found in an assembly source.
+
+    Attributes:
+        severity: whether assembling the source has failed.
+        line: number of the source line, counted from 1.
+        column: position in the line, counted from 1.
+        message: description of the problem.
+        error: class name of the exception raised in fail-fast mode.
+        filename: path of the included file the problem is in, None if it's in
+            the assembled source.
+    """
+
+    severity: Severity
+    line: int
+    column: int
+    message: str
+    error: str
+    filename: Optional[str] = None
+
+    def format(
+        self, filename: Optional[str] = None, source_line: Optional[str] = None
+    ) -> str:
+        """Single line report, followed by the source line marked at the column.
+
+        filename: of the assembled source, an included file is named instead.
+        """
+        location = f"{self.line}:{self.column}"
+        if self.filename is not None:
+            filename = self.filename
+        if filename is not None:
+            location = f"{filename}:{location}"
+        report = f"{location}: {self.severity.value}: {self.error}: {self.message}"
+        if source_line is None:
+            return report
+        # Tabs are kept, so the marker is aligned however they're displayed.
+        indent = "".join(
+            "\t" if character == "\t" else " "
+            for character in source_line[: self.column - 1]
+        )
+        return f"{report}\n    {source_line}\n    {indent}^"
+
+
+def with_column(error: ErrorT, column: int) -> ErrorT:
+    """Attaches the column of the offending token to an exception being raised."""
+    setattr(error, "column", column)
+    return error
+
+
+def diagnostic_from(
+    error: BaseException, line: int, column: int, filename: Optional[str] = None
+) -> Diagnostic:
+    """Builds an error diagnostic, column carried by the exception takes precedence."""
+    return Diagnostic(
+        Severity.ERROR,
+        line,
+        getattr(error, "column", column),
+        str(error),
+        error.__class__.__name__,
+        filename,
+    )
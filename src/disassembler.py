@@ -0,0 +1,302 @@
+from functools import lru_cache
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+from assembler import Assembler
+from encoding import (
+    LABEL_OPERAND_TYPES,
+    Encoding,
+    OpCode,
+    OperandSlot,
+    OperandType,
+    PseudoOpCode,
+)
+from instruction_set import IMMEDIATE_VALUE_FLAG
+from lexer import TokenKind
+from memory import Memory
+from program import Statement
+from symbols import SymbolTable
+from writers import read_object
+
+REGISTER_NAMES = {number: name for name, number in Encoding.REGISTERS.items()}
+REGISTER_WIDTH = 3
+
+
+def slot_width(slot: OperandSlot) -> int:
+    """Count of word bits taken by the operand, the immediate flag included."""
+    if slot.type == OperandType.REGISTER:
+        return REGISTER_WIDTH
+    if slot.type == OperandType.REGISTER_XOR_NUMERAL:
+        return slot.width + 1
+    return slot.width
+
+
+def slot_mask(slot: OperandSlot) -> int:
+    return ((1 << slot_width(slot)) - 1) << slot.position
+
+
+def signed(value: int, width: int) -> int:
+    return value - (1 << width) if value >> (width - 1) else value
+
+
+class Instruction(NamedTuple):
+    """Word decoded as an operation.
+
+    Attributes:
+        mnemonic: operation code, a branch one names the flags it tests.
+        base: bits of the word set by the mnemonic alone, and the immediate value
+            flag if it's set.
+        shape: operand slots of the operation.
+        operands: value of every slot - register number, signed numeral or
+            PC offset, in order of the shape.
+    """
+
+    mnemonic: str
+    base: int
+    shape: tuple[OperandSlot, ...]
+    operands: tuple[int, ...]
+
+
+def operations() -> list[tuple[str, int, tuple[OperandSlot, ...]]]:
+    """Mnemonics with their base bits and operand shapes, inverse of Encoding."""
+    shapes = dict(Encoding.OPERAND_SHAPES)
+    branch_shape = shapes.pop(OpCode.BRANCH)
+    bases = {
+        Encoding.OPERATION[OpCode.BRANCH] | condition: mnemonic
+        for mnemonic, condition in Encoding.BRANCH_CONDITIONS.items()
+    }  # BR and BRnzp encode the same, the explicit BRnzp is kept
+    return [
+        (operation_code, Encoding.OPERATION[operation_code], shape)
+        for operation_code, shape in shapes.items()
+    ] + [(mnemonic, base, branch_shape) for base, mnemonic in bases.items()]
+
+
+def shape_mask(shape: tuple[OperandSlot, ...]) -> int:
+    """Bits of a word taken by operands."""
+    mask = 0
+    for slot in shape:
+        mask |= slot_mask(slot)
+    return mask
+
+
+def decode_operands(word: int, shape: tuple[OperandSlot, ...]) -> Optional[tuple]:
+    """Operand values of the word, None if they can't be written in assembly."""
+    operands = []
+    for slot in shape:
+        field = (word & slot_mask(slot)) >> slot.position
+        if slot.type == OperandType.REGISTER:
+            operands.append(field)
+        elif slot.type == OperandType.REGISTER_XOR_NUMERAL:
+            if field & IMMEDIATE_VALUE_FLAG:
+                operands.append(signed(field ^ IMMEDIATE_VALUE_FLAG, slot.width))
+            elif field >> REGISTER_WIDTH:  # bits between register and flag
+                return None
+            else:
+                operands.append(field)
+        else:
+            operands.append(signed(field, slot.width))
+    return tuple(operands)
+
+
+@lru_cache(maxsize=None)
+def decode_table() -> tuple[Optional[Instruction], ...]:
+    """Instruction of every possible word, None for words that aren't any.
+
+    Built on first use by enumerating the operand bits of every operation. Those
+    fixing more bits are enumerated last, so RET wins over JMP R7.
+    """
+    table: list[Optional[Instruction]] = [None] * Memory.SIZE
+    candidates = operations()
+    candidates.sort(
+        key=lambda candidate: sum(map(slot_width, candidate[2])), reverse=True
+    )
+    for mnemonic, base, shape in candidates:
+        free = bits = shape_mask(shape)
+        while True:
+            table[base | bits] = decode_as(base | bits, mnemonic, base, shape)
+            if not bits:
+                break
+            bits = (bits - 1) & free
+    return tuple(table)
+
+
+def decode_as(
+    word: int, mnemonic: str, base: int, shape: tuple[OperandSlot, ...]
+) -> Optional[Instruction]:
+    """Word decoded as the given operation, None if it isn't one."""
+    free = shape_mask(shape)
+    if word & ~free != base:
+        return None
+    operands = decode_operands(word, shape)
+    if operands is None:
+        return None
+    if any(slot.type == OperandType.REGISTER_XOR_NUMERAL for slot in shape):
+        base |= word & IMMEDIATE_VALUE_FLAG
+    return Instruction(mnemonic, base, shape, operands)
+
+
+class Disassembler:
+    """Turns words back into assembly, with label names of a symbol table.
+
+    Operands referring to a labeled address are written as that label, other PC
+    offsets as numerals, so the output assembles to the same words.
+    """
+
+    def __init__(self, symbols: Optional[SymbolTable] = None):
+        self.symbols = SymbolTable() if symbols is None else symbols
+        self.table = decode_table()
+
+    def instruction(self, word: int, address: int) -> str:
+        """Assembly of a single word at an address, without its label."""
+        instruction = self.table[word]
+        if instruction is None:
+            return f"{PseudoOpCode.FILL} x{word:04X}"
+        operands = []
+        for slot, value in zip(instruction.shape, instruction.operands):
+            if slot.type in LABEL_OPERAND_TYPES:
+                symbol = self.symbols.at((address + 1 + value) & 0xFFFF)
+                operands.append(f"#{value}" if symbol is None else symbol.name)
+            elif slot.type == OperandType.REGISTER or (
+                slot.type == OperandType.REGISTER_XOR_NUMERAL
+                and not instruction.base & IMMEDIATE_VALUE_FLAG
+            ):
+                operands.append(REGISTER_NAMES[value])
+            else:
+                operands.append(f"#{value}")
+        if not operands:
+            return instruction.mnemonic
+        return f"{instruction.mnemonic} {', '.join(operands)}"
+
+    def lines(self, memory: Memory, start: int, stop: int) -> Iterator[str]:
+        """Source of words in range, from .ORIG to .END, labels included."""
+        yield f"{PseudoOpCode.ORIG} x{start:04X}"
+        for address in range(start, stop):
+            line = self.instruction(memory[address], address)
+            symbol = self.symbols.at(address)
+            yield line if symbol is None else f"{symbol.name}: {line}"
+        yield PseudoOpCode.END
+
+    def disassemble(self, data: bytes, big_endian: bool = True) -> Iterator[str]:
+        """Source of an LC-3 object, e.g. of Assembler.to_bytes."""
+        memory, start, stop = read_object(data, big_endian)
+        return self.lines(memory, start, stop)
+
+
+class Mismatch(NamedTuple):
+    """Statement whose words in an image differ from what it assembles to.
+
+    Attributes:
+        address: of the first differing word.
+        line: number of the statement line.
+        source: the statement, e.g. 'ADD R1, R1, #1'.
+        disassembled: the word found in the image.
+    """
+
+    address: int
+    line: int
+    source: str
+    disassembled: str
+
+
+def verify_roundtrip(
+    source: str, image: bytes, big_endian: bool = True
+) -> list[Mismatch]:
+    """Checks every statement of a source file against the words of an image.
+
+    The source is only located by the first pass, then each operation is compared
+    with the decode table entry of its word and every data directive with its
+    words, in a single sweep over the statements. Returns the differing ones.
+    """
+    assembler = Assembler()
+    program = assembler.map_symbolic_names(source)
+    memory, _, _ = read_object(image, big_endian)
+    disassembler = Disassembler(assembler.symbols)
+    table = disassembler.table
+    # Mnemonic and shape of every operation by base, to decode words as aliases of
+    # what the table holds, e.g. RET written as JMP R7.
+    shapes = {base: (mnemonic, shape) for mnemonic, base, shape in operations()}
+    mismatches = []
+    for statement in program:
+        address = statement.address
+        for offset, expected in enumerate(expected_words(statement, assembler)):
+            word = memory[address + offset]
+            if expected is None:  # operation, compared in its decoded form
+                base, operands = source_operands(statement, assembler.symbols)
+                instruction = table[word]
+                alias = shapes.get(base & ~IMMEDIATE_VALUE_FLAG)
+                if instruction is not None and instruction.base != base and alias:
+                    mnemonic, shape = alias
+                    instruction = decode_as(
+                        word, mnemonic, base & ~IMMEDIATE_VALUE_FLAG, shape
+                    )
+                if (
+                    instruction is not None
+                    and instruction.base == base
+                    and instruction.operands == operands
+                ):
+                    continue
+            elif word == expected:
+                continue
+            mismatches.append(
+                Mismatch(
+                    address + offset,
+                    statement.line,
+                    statement_text(statement),
+                    disassembler.instruction(word, address + offset),
+                )
+            )
+            break
+    return mismatches
+
+
+def statement_text(statement: Statement) -> str:
+    mnemonic, *operands = statement.tokens
+    if not operands:
+        return mnemonic.text
+    return f"{mnemonic.text} {', '.join(operand.text for operand in operands)}"
+
+
+def expected_words(
+    statement: Statement, assembler: Assembler
+) -> Sequence[Optional[int]]:
+    """Words of a data directive, a single None for an operation."""
+    mnemonic = statement.mnemonic
+    operands = statement.tokens[1:]
+    if mnemonic == PseudoOpCode.FILL:
+        operand = operands[0]
+        if operand.kind == TokenKind.LABEL:
+            return [assembler.symbols.resolve(operand.text)]
+        return [(operand.value or 0) & 0xFFFF]
+    if mnemonic == PseudoOpCode.STRINGZ:
+        return [ord(character) for character in operands[0].text[1:-1]] + [0]
+    if mnemonic in Encoding.DIRECTIVE_CODES:  # .BLKW and those allocating nothing
+        return []
+    return [None]
+
+
+def source_operands(
+    statement: Statement, symbols: SymbolTable
+) -> tuple[int, tuple[Optional[int], ...]]:
+    """Base bits and operand values of an operation, as a decoded Instruction has.
+
+    Labels are given as PC offsets to their address.
+    """
+    mnemonic = statement.mnemonic or ""
+    if mnemonic in Encoding.BRANCH_CONDITIONS:
+        base = Encoding.OPERATION[OpCode.BRANCH] | Encoding.BRANCH_CONDITIONS[mnemonic]
+        shape = Encoding.OPERAND_SHAPES[OpCode.BRANCH]
+    else:
+        base = Encoding.OPERATION.get(mnemonic, 0)
+        shape = Encoding.OPERAND_SHAPES.get(mnemonic, ())
+    values: list[Optional[int]] = []
+    for slot, operand in zip(shape, statement.tokens[1:]):
+        if slot.type in LABEL_OPERAND_TYPES and operand.kind == TokenKind.LABEL:
+            target = symbols.resolve(operand.text)
+            values.append(signed((target - statement.address - 1) & 0xFFFF, 16))
+            continue
+        if (
+            slot.type == OperandType.REGISTER_XOR_NUMERAL
+            and operand.kind == TokenKind.NUMERAL
+        ):
+            base |= IMMEDIATE_VALUE_FLAG
+        values.append(operand.value)
+    return base, tuple(values)
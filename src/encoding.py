@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import NamedTuple
 
 LABEL_IDENTIFIER = ":"
 
@@ -9,6 +10,9 @@ class PseudoOpCode:
     BLKW = ".BLKW"
     STRINGZ = ".STRINGZ"
     END = ".END"
+    INCLUDE = ".INCLUDE"
+    MACRO = ".MACRO"
+    END_MACRO = ".ENDM"
 
 
 class OpCode:
@@ -58,7 +62,22 @@ class OperandType(Enum):
     NUMERAL = 2
     REGISTER_XOR_NUMERAL = 3
     DATA_LABEL = 4
-    CODE_LABEL = 4
+    CODE_LABEL = 5
+
+
+# Operands given as labels, encoded as offsets from the incremented program counter.
+LABEL_OPERAND_TYPES = frozenset((OperandType.DATA_LABEL, OperandType.CODE_LABEL))
+
+
+class OperandSlot(NamedTuple):
+    """Declares a single operand: its accepted type and first bit position in word.
+
+    Numeral operands are stored as two's complement on width bits.
+    """
+
+    type: OperandType
+    position: int
+    width: int = 0
 
 
 class Encoding:
@@ -70,20 +89,41 @@ class Encoding:
             following the declaration pattern - first on 11,10,9 bit, second on
             8,7,6 bit, third 2,1,0.
         CONDITION_FLAGS: To indicate the sign of the previous calculation.
+        BRANCH_CONDITIONS: Flags tested by every branch mnemonic, BR alone branches
+            unconditionally like BRnzp.
         DIRECTIVE_CODES: Set of assembler 'pseudo operations' which generate a piece of
             code or data (like macros).
         OPERATION: Encoding for tasks representation that the CPU knows how to process.
+        OPERAND_SHAPES: Operands layout for every supported operation. Label operands
+            are PC offsets, patched into the word once the label address is known.
     """
 
     REGISTER_OPERANDS_POSITION = [9, 6, 0]
     BASE_REGISTER_POSITION = 6
+    IMMEDIATE_VALUE_WIDTH = 5
+    BASE_OFFSET_WIDTH = 6
+    PC_OFFSET_WIDTH = 9
+    LONG_PC_OFFSET_WIDTH = 11
     CONDITION_FLAGS = {"n": 1 << 11, "z": 1 << 10, "p": 1 << 9}
+    BRANCH_CONDITIONS = {
+        "BR": 0b111 << 9,
+        "BRn": 0b100 << 9,
+        "BRz": 0b010 << 9,
+        "BRp": 0b001 << 9,
+        "BRnz": 0b110 << 9,
+        "BRnp": 0b101 << 9,
+        "BRzp": 0b011 << 9,
+        "BRnzp": 0b111 << 9,
+    }
     DIRECTIVE_CODES = (
         PseudoOpCode.ORIG,
         PseudoOpCode.FILL,
         PseudoOpCode.BLKW,
         PseudoOpCode.STRINGZ,
         PseudoOpCode.END,
+        PseudoOpCode.INCLUDE,
+        PseudoOpCode.MACRO,
+        PseudoOpCode.END_MACRO,
     )
     REGISTERS = {
         f"R{r}": r for r in range(8)
@@ -94,7 +134,7 @@ class Encoding:
         OpCode.BRANCH: 0b0,
         OpCode.JUMP: 0b1100 << 12,
         OpCode.JUMP_TO_REGISTER_BY_LABEL: 0b01001 << 11,
-        OpCode.JUMP_TO_REGISTER_BY_BASE_REGISTER: 0b010000 << 9,
+        OpCode.JUMP_TO_REGISTER_BY_BASE_REGISTER: 0b0100 << 12,
         OpCode.LOAD: 0b0010 << 12,
         OpCode.LOAD_INDIRECT: 0b1010 << 12,
         OpCode.LOAD_REGISTER: 0b0110 << 12,
@@ -106,3 +146,70 @@ class Encoding:
         OpCode.STORE_INDIRECT: 0b1011 << 12,
         OpCode.STORE_REGISTER: 0b0111 << 12,
     }
+    OPERAND_SHAPES = {
+        OpCode.ADD: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[1]),
+            OperandSlot(
+                OperandType.REGISTER_XOR_NUMERAL,
+                REGISTER_OPERANDS_POSITION[2],
+                IMMEDIATE_VALUE_WIDTH,
+            ),
+        ),
+        OpCode.BITWISE_AND: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[1]),
+            OperandSlot(
+                OperandType.REGISTER_XOR_NUMERAL,
+                REGISTER_OPERANDS_POSITION[2],
+                IMMEDIATE_VALUE_WIDTH,
+            ),
+        ),
+        OpCode.JUMP: (OperandSlot(OperandType.REGISTER, BASE_REGISTER_POSITION),),
+        OpCode.JUMP_TO_REGISTER_BY_BASE_REGISTER: (
+            OperandSlot(OperandType.REGISTER, BASE_REGISTER_POSITION),
+        ),
+        OpCode.LOAD_REGISTER: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[1]),
+            OperandSlot(
+                OperandType.NUMERAL, REGISTER_OPERANDS_POSITION[2], BASE_OFFSET_WIDTH
+            ),
+        ),
+        OpCode.STORE_REGISTER: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[1]),
+            OperandSlot(
+                OperandType.NUMERAL, REGISTER_OPERANDS_POSITION[2], BASE_OFFSET_WIDTH
+            ),
+        ),
+        OpCode.BITWISE_NOT: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[1]),
+        ),
+        OpCode.RETURN_JUMP: (),
+        OpCode.BRANCH: (OperandSlot(OperandType.CODE_LABEL, 0, PC_OFFSET_WIDTH),),
+        OpCode.JUMP_TO_REGISTER_BY_LABEL: (
+            OperandSlot(OperandType.CODE_LABEL, 0, LONG_PC_OFFSET_WIDTH),
+        ),
+        OpCode.LOAD: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.DATA_LABEL, 0, PC_OFFSET_WIDTH),
+        ),
+        OpCode.LOAD_INDIRECT: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.DATA_LABEL, 0, PC_OFFSET_WIDTH),
+        ),
+        OpCode.LOAD_EFFECTIVE_ADDRESS: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.DATA_LABEL, 0, PC_OFFSET_WIDTH),
+        ),
+        OpCode.STORE: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.DATA_LABEL, 0, PC_OFFSET_WIDTH),
+        ),
+        OpCode.STORE_INDIRECT: (
+            OperandSlot(OperandType.REGISTER, REGISTER_OPERANDS_POSITION[0]),
+            OperandSlot(OperandType.DATA_LABEL, 0, PC_OFFSET_WIDTH),
+        ),
+    }
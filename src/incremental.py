@@ -0,0 +1,174 @@
+from array import array
+from difflib import SequenceMatcher
+from typing import Optional
+
+from assembler import Assembler
+from encoding import PseudoOpCode
+from lexer import TokenKind
+from program import Statement
+
+# Encoding of these depends on the state of the whole program, not only on the line.
+CONTEXT_DEPENDENT_MNEMONICS = frozenset((PseudoOpCode.ORIG, PseudoOpCode.END))
+
+
+class LineRecord:
+    """Source line with its statement and encoding kept from the previous run.
+
+    Attributes:
+        text: the source line.
+        statement: tokenized line, None for lines without tokens.
+        words: encoding of the statement, None if not encoded yet.
+        encoded_address: address the words were encoded for.
+        references: labels used as the statement operands.
+    """
+
+    __slots__ = ("text", "statement", "words", "encoded_address", "references")
+
+    def __init__(self, text: str, statement: Optional[Statement]):
+        self.text = text
+        self.statement = statement
+        self.words: Optional["array[int]"] = None
+        self.encoded_address = -1
+        self.references: tuple[str, ...] = ()
+        if statement is not None:
+            self.references = referenced_labels(statement)
+
+
+def referenced_labels(statement: Statement) -> tuple[str, ...]:
+    operands = iter(statement.tokens)
+    for token in operands:
+        if token.kind == TokenKind.MNEMONIC:
+            break
+    return tuple(token.text for token in operands if token.kind == TokenKind.LABEL)
+
+
+class IncrementalAssembler:
+    """Reassembles successive versions of a source re-encoding only what changed.
+
+    Lines equal to the previous version keep their tokens and encoded words. Those
+    are copied to their (possibly shifted) addresses, unless the line refers to
+    labels and the encoded value changed: a PC offset of an operation, when the
+    line and the label didn't move alike, or an address held by '.FILL'.
+
+    Attributes:
+        reencoded: count of statements encoded during the last run.
+        reused: count of statements whose words were copied during the last run.
+    """
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.reencoded = 0
+        self.reused = 0
+        self._records: list[LineRecord] = []
+        self._labels: dict[str, int] = {}
+
+    def assemble(self, source: str) -> Assembler:
+        """Assembles the source, returns an assembler holding the complete image."""
+        try:
+            return self._assemble(source.splitlines())
+        except Exception:
+            # A failed run leaves the records partially encoded.
+            self._records, self._labels = [], {}
+            raise
+
+    def _assemble(self, lines: list[str]) -> Assembler:
+        assembler = Assembler(self.verbose)
+        records = self._diff(assembler, lines)
+
+        for record in records:
+            if record.statement is not None:
+                assembler.locate_statement(record.statement)
+        assembler.program_counter = assembler.origin
+        labels = assembler.labels_addresses
+
+        self.reencoded = self.reused = 0
+        for record in records:
+            statement = record.statement
+            if statement is None:
+                continue
+            assembler.count_line()
+            if record.words is not None and self._is_reusable(record, labels):
+                assembler.memory.write_words(statement.address, record.words)
+                # The words hold the same values at the new address.
+                record.encoded_address = statement.address
+                assembler.program_counter += len(record.words)
+                self.reused += 1
+            else:
+                self._encode(assembler, record)
+                self.reencoded += 1
+        assembler.report_undefined_labels()
+
+        self._records, self._labels = records, labels
+        return assembler
+
+    def _diff(self, assembler: Assembler, lines: list[str]) -> list[LineRecord]:
+        """Keeps records of lines that didn't change, tokenizes the others."""
+        previous = self._records
+        head = 0
+        limit = min(len(previous), len(lines))
+        while head < limit and previous[head].text == lines[head]:
+            head += 1
+        tail = 0
+        while (
+            tail < limit - head
+            and previous[len(previous) - 1 - tail].text == lines[len(lines) - 1 - tail]
+        ):
+            tail += 1
+
+        records = previous[:head]
+        old_middle = previous[head : len(previous) - tail]
+        new_middle = lines[head : len(lines) - tail]
+        matcher = SequenceMatcher(
+            None, [record.text for record in old_middle], new_middle, autojunk=False
+        )
+        for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+            if tag == "equal":
+                records.extend(old_middle[old_start:old_end])
+            else:
+                for index in range(head + new_start, head + new_end):
+                    statement = assembler.parse_statement(lines[index], index + 1)
+                    records.append(LineRecord(lines[index], statement))
+        records.extend(previous[len(previous) - tail :])
+
+        for line_number, record in enumerate(records, start=1):
+            statement = record.statement
+            if statement is not None and statement.line != line_number:
+                statement.line = line_number
+                for token in statement.tokens:
+                    token.line = line_number
+        return records
+
+    def _is_reusable(self, record: LineRecord, labels: dict[str, int]) -> bool:
+        statement = record.statement
+        assert statement is not None
+        if statement.mnemonic in CONTEXT_DEPENDENT_MNEMONICS:
+            return False
+        if not record.references:
+            return True
+        if statement.mnemonic not in Assembler.LABEL_SLOTS:
+            # '.FILL label' holds the label address wherever it's placed.
+            return all(
+                label in labels and labels[label] == self._labels.get(label)
+                for label in record.references
+            )
+        # Operations hold PC offsets, kept if labels moved as much as the line.
+        shift = statement.address - record.encoded_address
+        previous = self._labels
+        return all(
+            label in labels
+            and label in previous
+            and labels[label] - previous[label] == shift
+            for label in record.references
+        )
+
+    @staticmethod
+    def _encode(assembler: Assembler, record: LineRecord) -> None:
+        statement = record.statement
+        assert statement is not None
+        start = assembler.program_counter
+        assembler.encode_statement(statement)
+        words = array("H")
+        for _, segment in assembler.memory.segments(start, assembler.program_counter):
+            words.extend(segment)
+        record.words = words
+        record.encoded_address = start
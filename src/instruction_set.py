@@ -1,176 +1,237 @@
-from encoding import OpCode, Encoding, OperandType
-from syntax import is_numeral_base_prefixed, cast_to_numeral
+from typing import Callable, NamedTuple, Optional
+
+from diagnostics import with_column
+from encoding import (
+    OpCode,
+    Encoding,
+    OperandSlot,
+    OperandType,
+    LABEL_OPERAND_TYPES,
+)
+from lexer import Token, TokenKind
+from syntax import cast_to_numeral
+
+Encoder = Callable[[list[Token]], int]
+SlotEncoder = Callable[[Token, int], int]
+
+IMMEDIATE_VALUE_FLAG = 1 << 5
+
+
+def compile_register_slot(position: int, width: int) -> SlotEncoder:
+    def encode_slot(operand: Token, index: int) -> int:
+        if operand.kind != TokenKind.REGISTER:
+            raise with_column(
+                TypeError(
+                    f"Operand ({index+1}) isn't a register at {operand.location}."
+                ),
+                operand.column,
+            )
+        return operand.value << position  # type: ignore[operator]
 
+    return encode_slot
 
-class InstructionSet:
 
-    def process_operands(self, operation_code: str, operands: list[str]) -> int:
-        match operation_code:
-            case OpCode.ADD | OpCode.BITWISE_AND:
-                return self.get_5_bit_flag_option_register_xor_numeral_encoding(
-                    operands
-                )
-            case OpCode.BRANCH:
-                ...
-            case OpCode.JUMP | OpCode.JUMP_TO_REGISTER_BY_BASE_REGISTER:
-                return self.get_base_register_only_operand_encoding(operands)
-            case OpCode.JUMP_TO_REGISTER_BY_LABEL:
-                ...
-            case (
-                OpCode.LOAD
-                | OpCode.LOAD_INDIRECT
-                | OpCode.LOAD_EFFECTIVE_ADDRESS
-                | OpCode.STORE
-                | OpCode.STORE_INDIRECT
-            ):
-                # ToDo[1]: Implement after "distinguish data from code labels[...]"
-                raise NotImplementedError()
-            case OpCode.LOAD_REGISTER | OpCode.STORE_REGISTER:
-                return self.get_6_bit_signed_offset_encoding(operands)
-            case OpCode.BITWISE_NOT:
-                return self.get_not_operand_encoding(operands)
-            case OpCode.RETURN_JUMP:
-                if len(operands) != 0:
-                    raise IndexError("Return instruction doesn't accept operands.")
-                return 0
-            case OpCode.UNUSED:
-                ...
-        raise RuntimeError("Processing operands for unknown instruction.")
-
-    def validate_operands(
-        self, operands: list[str], types_criteria: list[OperandType]
-    ) -> None:
-        """Validates syntax of operands for defined types criteria."""
-        operands_count = len(operands)
-        expected_operands_count = len(types_criteria)
-
-        if operands_count != expected_operands_count:
-            raise IndexError(
-                f"Invalid operands number - expected: {expected_operands_count}, "
-                f"actual {operands_count}"
-            )
+def numeral_value(operand: Token) -> int:
+    if operand.value is None:
+        return cast_to_numeral(operand.text)  # raises describing the invalid value
+    return operand.value
 
-        for index, (operand, type_criteria) in enumerate(zip(operands, types_criteria)):
-            if self.must_be_register_and_is_not(operand, type_criteria):
-                raise TypeError(f"Operand ({index+1}) isn't a register.")
-            elif self.must_be_numeral_and_is_not(operand, type_criteria):
-                raise TypeError(f"Operand ({index+1}) isn't a numeral.")
-            elif self.must_be_either_register_or_numeral_and_is_not(
-                operand, type_criteria
-            ):
-                raise TypeError(f"Operand ({index+1}) isn't a register nor a numeral.")
-
-    def get_5_bit_flag_option_register_xor_numeral_encoding(
-        self, operands: list[str]
-    ) -> int:
-        """For common instructions that allow either register or numeral third operand.
-
-        ADD, AND: 3-bit Destination Register, 3-Bit Source Register,
-            (register option): 1-bit False flag, 2-bits fixed, 3-bit Source Register
-            (numeral option): 1-bit True flag, 5-bit Immediate Value
-        """
-        self.validate_operands(
-            operands,
-            [
-                OperandType.REGISTER,
-                OperandType.REGISTER,
-                OperandType.REGISTER_XOR_NUMERAL,
-            ],
-        )
 
-        first_register_operand_encoding = (
-            Encoding.REGISTERS[operands[0]] << Encoding.REGISTER_OPERANDS_POSITION[0]
-        )
-        second_register_operand_encoding = (
-            Encoding.REGISTERS[operands[1]] << Encoding.REGISTER_OPERANDS_POSITION[1]
-        )
-        if operands[2] in Encoding.REGISTERS.keys():
-            third_operand_encoding = (
-                Encoding.REGISTERS[operands[2]]
-                << Encoding.REGISTER_OPERANDS_POSITION[2]
-            )
-        elif is_numeral_base_prefixed(operands[2]):
-            immediate_value_flag_position = 5
-            third_operand_encoding = cast_to_numeral(operands[2]) | (
-                1 << immediate_value_flag_position
-            )
-        else:
-            raise TypeError(
-                f"Unknown third operand type: {operands[2]}. "
-                f"Register or immediate value are accepted only."
+def signed_range(width: int) -> tuple[int, int]:
+    """Lowest and highest value of a two's complement field."""
+    return -(1 << (width - 1)), (1 << (width - 1)) - 1
+
+
+def compile_field(width: int) -> SlotEncoder:
+    """Returns function giving a numeral operand bits, checked to fit the width."""
+    lowest, highest = signed_range(width)
+    mask = (1 << width) - 1
+
+    def field(operand: Token, index: int) -> int:
+        value = numeral_value(operand)
+        if not lowest <= value <= highest:
+            raise with_column(
+                ValueError(
+                    f"Operand ({index+1}) value {value} out of range "
+                    f"[{lowest}, {highest}] at {operand.location}."
+                ),
+                operand.column,
             )
+        return value & mask
 
-        return (
-            first_register_operand_encoding
-            | second_register_operand_encoding
-            | third_operand_encoding
-        )
+    return field
 
-    def get_base_register_only_operand_encoding(self, operands: list[str]) -> int:
-        """For common instructions that contain Base Register on 8-to-6 position.
 
-        JMP, JSRR: 3-bits fixed, 3-bit Base Register, 6-bits fixed
-        """
-        self.validate_operands(operands, [OperandType.REGISTER])
+def compile_numeral_slot(position: int, width: int) -> SlotEncoder:
+    field = compile_field(width)
 
-        base_operand_encoding = (
-            Encoding.REGISTERS[operands[0]] << Encoding.BASE_REGISTER_POSITION
+    def encode_slot(operand: Token, index: int) -> int:
+        if operand.kind != TokenKind.NUMERAL:
+            raise with_column(
+                TypeError(
+                    f"Operand ({index+1}) isn't a numeral at {operand.location}."
+                ),
+                operand.column,
+            )
+        return field(operand, index) << position
+
+    return encode_slot
+
+
+def compile_register_xor_numeral_slot(position: int, width: int) -> SlotEncoder:
+    """Register on given position or an immediate value with a set flag."""
+    field = compile_field(width)
+
+    def encode_slot(operand: Token, index: int) -> int:
+        if operand.kind == TokenKind.REGISTER:
+            return operand.value << position  # type: ignore[operator]
+        if operand.kind == TokenKind.NUMERAL:
+            return field(operand, index) << position | IMMEDIATE_VALUE_FLAG
+        raise with_column(
+            TypeError(
+                f"Operand ({index+1}) isn't a register nor a numeral "
+                f"at {operand.location}."
+            ),
+            operand.column,
         )
-        return base_operand_encoding
 
-    def get_not_operand_encoding(self, operands: list[str]) -> int:
-        """For specific 'NOT' instruction.
+    return encode_slot
 
-        NOT: 3-bit Destination Register, 3-bit Source Register, 6-bit fixed.
-        """
-        self.validate_operands(operands, [OperandType.REGISTER, OperandType.REGISTER])
 
-        first_operand_encoding = (
-            Encoding.REGISTERS[operands[0]] << Encoding.REGISTER_OPERANDS_POSITION[0]
-        )
-        second_operand_encoding = (
-            Encoding.REGISTERS[operands[1]] << Encoding.REGISTER_OPERANDS_POSITION[1]
+def compile_label_slot(position: int, width: int) -> SlotEncoder:
+    """Label to be patched in as a PC offset, or a numeral giving the offset itself."""
+    field = compile_field(width)
+
+    def encode_slot(operand: Token, index: int) -> int:
+        if operand.kind == TokenKind.LABEL:
+            return 0  # patched once the label address is known
+        if operand.kind == TokenKind.NUMERAL:
+            return field(operand, index) << position
+        raise with_column(
+            TypeError(
+                f"Operand ({index+1}) isn't a label nor a numeral "
+                f"at {operand.location}."
+            ),
+            operand.column,
         )
-        return first_operand_encoding | second_operand_encoding
 
-    def get_6_bit_signed_offset_encoding(self, operands: list[str]) -> int:
-        """For common instructions that contain 6-bit singed offset.
+    return encode_slot
 
-        LDR: 3-bit Destination Register, 3-bit Base Register, 6-bit offset
-        STR: 3-bit Source Register, 3-bit Base Register, 6-bit offset
-        """
-        self.validate_operands(
-            operands, [OperandType.REGISTER, OperandType.REGISTER, OperandType.NUMERAL]
-        )
-        first_register_operand_encoding = (
-            Encoding.REGISTERS[operands[0]] << Encoding.REGISTER_OPERANDS_POSITION[0]
-        )
-        second_register_operand_encoding = (
-            Encoding.REGISTERS[operands[1]] << Encoding.REGISTER_OPERANDS_POSITION[1]
-        )
-        _6_bit_signed_offset_encoding = cast_to_numeral(operands[2])
-        return (
-            first_register_operand_encoding
-            | second_register_operand_encoding
-            | _6_bit_signed_offset_encoding
-        )
 
-    @staticmethod
-    def must_be_register_and_is_not(operand: str, type_criteria: OperandType) -> bool:
-        return (
-            type_criteria == OperandType.REGISTER and operand not in Encoding.REGISTERS
-        )
+SLOT_COMPILERS: dict[OperandType, Callable[[int, int], SlotEncoder]] = {
+    OperandType.REGISTER: compile_register_slot,
+    OperandType.NUMERAL: compile_numeral_slot,
+    OperandType.REGISTER_XOR_NUMERAL: compile_register_xor_numeral_slot,
+    OperandType.DATA_LABEL: compile_label_slot,
+    OperandType.CODE_LABEL: compile_label_slot,
+}
 
-    @staticmethod
-    def must_be_numeral_and_is_not(operand: str, type_criteria: OperandType) -> bool:
-        return type_criteria == OperandType.NUMERAL and not is_numeral_base_prefixed(
-            operand
-        )
 
-    @staticmethod
-    def must_be_either_register_or_numeral_and_is_not(
-        operand: str, type_criteria: OperandType
-    ) -> bool:
-        return type_criteria == OperandType.REGISTER_XOR_NUMERAL and (
-            not is_numeral_base_prefixed(operand) and operand not in Encoding.REGISTERS
+def compile_encoder(
+    operation_code: str, shape: tuple[OperandSlot, ...], base: Optional[int] = None
+) -> Encoder:
+    """Builds a function encoding the whole word from operands of a given shape.
+
+    base: word without operands, the operation code bits by default.
+    """
+    if base is None:
+        base = Encoding.OPERATION[operation_code]
+    slot_encoders = tuple(
+        SLOT_COMPILERS[slot.type](slot.position, slot.width) for slot in shape
+    )
+    expected_operands_count = len(slot_encoders)
+
+    def encode(operands: list[Token]) -> int:
+        if len(operands) != expected_operands_count:
+            raise IndexError(
+                f"Invalid operands number - expected: {expected_operands_count}, "
+                f"actual {len(operands)}"
+            )
+
+        word = base
+        for index, (operand, encode_slot) in enumerate(zip(operands, slot_encoders)):
+            word |= encode_slot(operand, index)
+        return word
+
+    return encode
+
+
+def encode_unknown(operands: list[Token]) -> int:
+    raise RuntimeError("Processing operands for unknown instruction.")
+
+
+def compile_encoders() -> dict[str, Encoder]:
+    encoders: dict[str, Encoder] = {
+        operation_code: compile_encoder(operation_code, shape)
+        for operation_code, shape in Encoding.OPERAND_SHAPES.items()
+    }
+    branch_shape = Encoding.OPERAND_SHAPES[OpCode.BRANCH]
+    for mnemonic, condition in Encoding.BRANCH_CONDITIONS.items():
+        encoders[mnemonic] = compile_encoder(
+            OpCode.BRANCH,
+            branch_shape,
+            Encoding.OPERATION[OpCode.BRANCH] | condition,
         )
+    for operation_code in Encoding.OPERATION:
+        encoders.setdefault(operation_code, encode_unknown)
+    return encoders
+
+
+def compile_label_slots() -> dict[str, tuple[int, int]]:
+    """Index and width of the label operand, keyed by mnemonics having one."""
+    label_slots = {
+        operation_code: (index, slot.width)
+        for operation_code, shape in Encoding.OPERAND_SHAPES.items()
+        for index, slot in enumerate(shape)
+        if slot.type in LABEL_OPERAND_TYPES
+    }
+    for mnemonic in Encoding.BRANCH_CONDITIONS:
+        label_slots[mnemonic] = label_slots[OpCode.BRANCH]
+    return label_slots
+
+
+class Fixup(NamedTuple):
+    """Reference to a label from an encoded word, patched once the label is defined.
+
+    Attributes:
+        address: of the word referring to the label.
+        operand: the label token, errors are reported at its location.
+        width: bits of the PC offset in the word; 0 if the whole word is the label
+            address.
+    """
+
+    address: int
+    operand: Token
+    width: int = 0
+
+    def bits(self, target: int) -> int:
+        """Bits to be set in the word for a label at the target address."""
+        if not self.width:
+            return target
+        # Offsets are added to the program counter already incremented.
+        offset = target - self.address - 1
+        lowest, highest = signed_range(self.width)
+        if not lowest <= offset <= highest:
+            raise with_column(
+                ValueError(
+                    f"PCoffset{self.width} to {self.operand.text} is {offset}, "
+                    f"out of range [{lowest}, {highest}] at {self.operand.location}."
+                ),
+                self.operand.column,
+            )
+        return offset & ((1 << self.width) - 1)
+
+
+class InstructionSet:
+    """Operations encoders keyed by operation code, compiled once at import time.
+
+    Every encoder validates operands against Encoding.OPERAND_SHAPES and returns the
+    complete 16-bit word, operation code bits included. Label operands are left
+    zero, LABEL_SLOTS tells which operand is to be patched in and on how many bits.
+    """
+
+    ENCODERS = compile_encoders()
+    LABEL_SLOTS = compile_label_slots()
+
+    def encode_operation(self, operation_code: str, operands: list[Token]) -> int:
+        return self.ENCODERS[operation_code](operands)
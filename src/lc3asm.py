@@ -0,0 +1,116 @@
+import sys
+from typing import Optional
+
+SYM_SUFFIX = ".sym"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Assembles files given on the command line, returns the exit status.
+
+    Modules are imported here, once they're needed: NumPy is loaded with
+    --columnar alone, so startup stays within the budget of test_lc3asm.py.
+    """
+    import argparse
+
+    from writers import OUTPUT_FORMATS
+
+    parser = argparse.ArgumentParser(
+        prog="lc3asm", description="Assemble LC-3 assembly files."
+    )
+    parser.add_argument("sources", nargs="+", help="assembly files")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="output file of a single source, next to it with the format suffix "
+        "by default; directory for output files of many sources",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default="obj",
+        help="output format, object by default",
+    )
+    parser.add_argument(
+        "--little-endian", action="store_true", help="emit little-endian words"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    parser.add_argument(
+        "--sym", action="store_true", help="write symbols to a .sym file next to output"
+    )
+    parser.add_argument(
+        "--listing",
+        action="store_true",
+        help="write a listing of addresses, words and source lines to a .lst file "
+        "next to output",
+    )
+    parser.add_argument(
+        "--all-errors",
+        action="store_true",
+        help="report every error of a file instead of stopping at the first one",
+    )
+    parser.add_argument(
+        "--one-pass",
+        action="store_true",
+        help="read every source once, patching forward label references",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="encode operations with NumPy, if installed",
+    )
+    args = parser.parse_args(argv)
+
+    from pathlib import Path
+
+    from assembler import Assembler
+    from fileio import open_atomically
+    from listing import LISTING_SUFFIX, write_listing
+
+    output_dir = None
+    if args.output is not None and len(args.sources) > 1:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    failures = 0
+    for source in args.sources:
+        if output_dir is not None:
+            output = output_dir / Path(source).name
+            output = output.with_suffix(OUTPUT_FORMATS[args.format].suffix)
+        elif args.output is not None:
+            output = Path(args.output)
+        else:
+            output = Path(source).with_suffix(OUTPUT_FORMATS[args.format].suffix)
+
+        assembler = Assembler(
+            args.verbose,
+            collect_errors=args.all_errors,
+            columnar=args.columnar,
+            one_pass=args.one_pass,
+        )
+        try:
+            assembler.assemble(source)
+            if not assembler.diagnostics:
+                with open_atomically(output) as stream:
+                    assembler.write(stream, not args.little_endian, args.format)
+                if args.sym:
+                    with open(output.with_suffix(SYM_SUFFIX), "w") as sym_file:
+                        assembler.symbols.write_sym(sym_file)
+                if args.listing:
+                    with open(output.with_suffix(LISTING_SUFFIX), "w") as listing:
+                        write_listing(assembler, listing)
+        except Exception as e:
+            print(f"{source}: {e.__class__.__name__}: {e}", file=sys.stderr)
+            failures += 1
+            continue
+        for diagnostic in assembler.diagnostics:
+            print(
+                diagnostic.format(source, assembler.source_line(diagnostic)),
+                file=sys.stderr,
+            )
+        failures += bool(assembler.diagnostics)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
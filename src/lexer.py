@@ -0,0 +1,171 @@
+import re
+import sys
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Optional
+
+from diagnostics import with_column
+from encoding import Encoding
+
+HEXADECIMAL_DIGITS = frozenset("0123456789abcdefABCDEF")
+BINARY_DIGITS = frozenset("01")
+NUMERAL_BASES = {"x": 16, "#": 10, "b": 2}
+CLASSIFICATION_CACHE_SIZE = 1 << 14
+
+# Whitespace is never matched, so it's skipped by the search between tokens. None of
+# the alternatives looks ahead past its own lexeme, hence every line is scanned once.
+TOKEN_PATTERN = re.compile(r';|(,)|("[^"]*")|("[^"]*)|([^\s,;"]+)')
+COMMA_GROUP, STRING_GROUP, UNTERMINATED_STRING_GROUP, WORD_GROUP = 1, 2, 3, 4
+
+
+class TokenKind(Enum):
+    MNEMONIC = 1
+    REGISTER = 2
+    NUMERAL = 3
+    LABEL = 4
+    STRING = 5
+    COMMA = 6
+
+
+class Token:
+    """Single lexeme of an assembly line.
+
+    Attributes:
+        kind: lexical category assigned while scanning.
+        text: exact lexeme, double quotes included for strings.
+        line: number of the source line, counted from 1.
+        column: position of the first character in the line, counted from 1.
+        value: register number or numeral value, None for other kinds and
+            numerals that don't fit their base.
+        source: path of the included file the token was read from, None for the
+            assembled source.
+    """
+
+    __slots__ = ("kind", "text", "line", "column", "value", "source")
+
+    def __init__(
+        self,
+        kind: TokenKind,
+        text: str,
+        line: int,
+        column: int,
+        value: Optional[int] = None,
+        source: Optional[str] = None,
+    ):
+        self.kind = kind
+        self.text = text
+        self.line = line
+        self.column = column
+        self.value = value
+        self.source = source
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind.name}, {self.text!r}, {self.line}, {self.column})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return (self.kind, self.text, self.line, self.column) == (
+            other.kind,
+            other.text,
+            other.line,
+            other.column,
+        )
+
+    @property
+    def location(self) -> str:
+        location = f"line {self.line}, column {self.column}"
+        if self.source is not None:
+            location += f" of {self.source}"
+        return location
+
+
+def is_numeral(word: str) -> bool:
+    """Decimal values are recognized by prefix only, so '#' can't start a label."""
+    prefix, digits = word[:1], word[1:].removeprefix("-")
+    if prefix == "#":
+        return True
+    if prefix == "x":
+        return bool(digits) and all(c in HEXADECIMAL_DIGITS for c in digits)
+    if prefix == "b":
+        return bool(digits) and all(c in BINARY_DIGITS for c in digits)
+    return False
+
+
+KEYWORD_KINDS = {
+    **{mnemonic: TokenKind.MNEMONIC for mnemonic in Encoding.OPERATION},
+    **{mnemonic: TokenKind.MNEMONIC for mnemonic in Encoding.BRANCH_CONDITIONS},
+    **{directive: TokenKind.MNEMONIC for directive in Encoding.DIRECTIVE_CODES},
+    **{register: TokenKind.REGISTER for register in Encoding.REGISTERS},
+}
+
+
+def classify_word(word: str) -> TokenKind:
+    kind = KEYWORD_KINDS.get(word)
+    if kind is not None:
+        return kind
+    if is_numeral(word):
+        return TokenKind.NUMERAL
+    return TokenKind.LABEL
+
+
+@lru_cache(maxsize=CLASSIFICATION_CACHE_SIZE)
+def classify(word: str) -> tuple[str, TokenKind, Optional[int]]:
+    """Interned word with its kind and value, memoized as words repeat a lot."""
+    kind = classify_word(word)
+    value = None
+    if kind == TokenKind.REGISTER:
+        value = Encoding.REGISTERS[word]
+    elif kind == TokenKind.NUMERAL:
+        try:
+            value = int(word[1:], NUMERAL_BASES[word[0]])
+        except ValueError:  # e.g. '#x1', reported when the value is needed
+            pass
+    return sys.intern(word), kind, value
+
+
+def classification_cache_info() -> dict[str, Any]:
+    info = classify.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+    }
+
+
+def tokenize(line: str, line_number: int = 1) -> list[Token]:
+    """Splits an assembly line into typed tokens in a single left-to-right scan.
+
+    Whitespace and comments are dropped. Commas are kept as separate tokens.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(line):
+        group = match.lastindex
+        if group == WORD_GROUP:
+            word, kind, value = classify(match[WORD_GROUP])
+            tokens.append(Token(kind, word, line_number, match.start() + 1, value))
+        elif group == COMMA_GROUP:
+            tokens.append(Token(TokenKind.COMMA, ",", line_number, match.start() + 1))
+        elif group == STRING_GROUP:
+            tokens.append(
+                Token(
+                    TokenKind.STRING,
+                    match[STRING_GROUP],
+                    line_number,
+                    match.start() + 1,
+                )
+            )
+        elif group == UNTERMINATED_STRING_GROUP:
+            raise with_column(
+                SyntaxError(
+                    f"Unterminated string at line {line_number}, "
+                    f"column {match.start() + 1}."
+                ),
+                match.start() + 1,
+            )
+        else:
+            break  # comment till the end of line
+    return tokens
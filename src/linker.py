@@ -0,0 +1,140 @@
+import argparse
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Sequence
+
+from fileio import open_atomically
+from memory import Memory
+from relocatable import ObjectModule, load_module
+from symbols import SymbolKind, SymbolTable
+from syntax import cast_to_numeral
+from writers import OUTPUT_FORMATS, write_chunks
+
+DEFAULT_ORIGIN = 0x3000
+
+
+class LinkedProgram(NamedTuple):
+    """Absolute image of linked modules.
+
+    Attributes:
+        origin: address of the first word.
+        words: modules placed one after another.
+        symbols: exported labels with their linked addresses.
+    """
+
+    origin: int
+    words: "array[int]"
+    symbols: dict[str, int]
+
+    def iter_bytes(
+        self, big_endian: bool = True, output_format: str = "obj"
+    ) -> Iterator[bytes | memoryview]:
+        memory = Memory()
+        memory.write_words(self.origin, self.words)
+        return OUTPUT_FORMATS[output_format].chunks(
+            memory, self.origin, self.origin + len(self.words), big_endian
+        )
+
+    def to_bytes(self, big_endian: bool = True, output_format: str = "obj") -> bytes:
+        return b"".join(self.iter_bytes(big_endian, output_format))
+
+    def write(
+        self, stream: BinaryIO, big_endian: bool = True, output_format: str = "obj"
+    ) -> int:
+        return write_chunks(stream, self.iter_bytes(big_endian, output_format))
+
+
+def link(
+    modules: Sequence[ObjectModule], origin: int = DEFAULT_ORIGIN
+) -> LinkedProgram:
+    """Places modules in order from the origin into a single buffer.
+
+    Every module is copied once, then its relocations and imports are patched in
+    place. Imports are resolved with a single lookup in the table of all exports,
+    so linking takes time linear in the size of the modules.
+
+    A label exported by more than one module can't be imported, it's fine as long
+    as every module refers to its own one.
+    """
+    size = sum(len(module.words) for module in modules)
+    if origin + size > Memory.SIZE:
+        raise ValueError(
+            f"Linked program of {size} words doesn't fit memory from {origin:#06x}."
+        )
+    words = array("H", bytes(2 * size))
+    symbols: dict[str, int] = {}
+    exporters: dict[str, list[str]] = {}
+    offsets = []
+    address = origin
+    for module in modules:
+        offset = address - module.origin
+        start = address - origin
+        words[start : start + len(module.words)] = module.words
+        for label, exported in module.exports.items():
+            symbols.setdefault(label, exported + offset)
+            exporters.setdefault(label, []).append(module.name)
+        offsets.append(offset)
+        address += len(module.words)
+
+    for module, offset in zip(modules, offsets):
+        for relocation in module.relocations:
+            index = relocation + offset - origin
+            words[index] = (words[index] + offset) & 0xFFFF
+        for fixup in module.imports:
+            label = fixup.operand.text
+            target = symbols.get(label)
+            if target is None:
+                raise NameError(f"Undefined label {label} at {fixup.operand.location}.")
+            if len(exporters[label]) > 1:
+                raise NameError(
+                    f"Label {label} at {fixup.operand.location} is ambiguous, "
+                    f"it's defined by {', '.join(exporters[label])}."
+                )
+            placed = fixup._replace(address=fixup.address + offset)
+            words[placed.address - origin] |= placed.bits(target)
+    return LinkedProgram(origin, words, symbols)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="linker", description="Link relocatable LC-3 object modules."
+    )
+    parser.add_argument("modules", nargs="+", help="relocatable object modules")
+    parser.add_argument("-o", "--output", required=True, help="linked output file")
+    parser.add_argument(
+        "--origin", default="x3000", help="address of the first module, x3000 default"
+    )
+    parser.add_argument(
+        "--little-endian", action="store_true", help="emit little-endian words"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default="obj",
+        help="output format, object by default",
+    )
+    parser.add_argument("--sym", help="write linked symbols to a .sym file")
+    args = parser.parse_args(argv)
+
+    try:
+        program = link(
+            [load_module(path) for path in args.modules], cast_to_numeral(args.origin)
+        )
+        with open_atomically(Path(args.output)) as stream:
+            program.write(stream, not args.little_endian, args.format)
+        if args.sym is not None:
+            table = SymbolTable()
+            for label, address in program.symbols.items():
+                table.define(label, address, SymbolKind.IMPORTED)
+            with open(args.sym, "w") as sym_file:
+                table.write_sym(sym_file)
+    except Exception as e:
+        print(f"{e.__class__.__name__}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
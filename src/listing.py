@@ -0,0 +1,225 @@
+from array import array
+from typing import TYPE_CHECKING, Iterator, NamedTuple, Optional, TextIO
+
+from program import Statement
+
+if TYPE_CHECKING:
+    from assembler import Assembler
+
+LISTING_SUFFIX = ".lst"
+LISTING_HEADER = "  Addr  Word   Line  Source\n  ----  ----  -----  ------\n"
+NO_ROW = -1
+
+
+class SourceLocation(NamedTuple):
+    """Where a statement of the program comes from.
+
+    Attributes:
+        address: memory address of the first word of the statement.
+        size: count of words the statement allocates, 0 for '.ORIG' and '.END'.
+        line: number of the source line, counted from 1.
+        column: column of the statement's mnemonic, counted from 1.
+        label: defined for the address, None if there's none.
+        source: path of the included file, None for the assembled source.
+    """
+
+    address: int
+    size: int
+    line: int
+    column: int
+    label: Optional[str]
+    source: Optional[str]
+
+
+class SourceIndex:
+    """Source location of every located statement, kept in columns of arrays.
+
+    A row is appended per statement, in the order statements are located. Labels
+    and included file paths are stored once and referred to by their index.
+    Both lookups are array indexing: rows by address and rows by line of every
+    source are built on the first lookup after the index changed.
+
+    Attributes:
+        addresses, sizes, lines, columns: of every row, see SourceLocation.
+        labels: index of the row's label in defined labels, NO_ROW if it has none.
+        sources: index of the row's source in paths.
+        paths: of included files, after None for the assembled source.
+    """
+
+    __slots__ = (
+        "addresses",
+        "sizes",
+        "lines",
+        "columns",
+        "labels",
+        "sources",
+        "paths",
+        "_names",
+        "_path_ids",
+        "_first_address",
+        "_by_address",
+        "_by_line",
+    )
+
+    def __init__(self) -> None:
+        # An '.END' following the last word of memory is located past it.
+        self.addresses = array("I")
+        self.sizes = array("H")
+        self.lines = array("I")
+        self.columns = array("H")
+        self.labels = array("i")
+        self.sources = array("H")
+        self.paths: list[Optional[str]] = [None]
+        self._names: list[str] = []
+        self._path_ids: dict[Optional[str], int] = {None: 0}
+        self._first_address = 0
+        self._by_address: Optional["array[int]"] = None
+        self._by_line: Optional[list["array[int]"]] = None
+
+    def add(self, statement: Statement, size: int) -> None:
+        """Records the located statement allocating given count of words."""
+        self.addresses.append(statement.address)
+        self.sizes.append(size)
+        self.lines.append(statement.line)
+        self.columns.append(statement.tokens[0].column)
+        if statement.label is None:
+            self.labels.append(NO_ROW)
+        else:
+            self.labels.append(len(self._names))
+            self._names.append(statement.label)
+        source = self._path_ids.get(statement.source)
+        if source is None:
+            source = self._path_ids[statement.source] = len(self.paths)
+            self.paths.append(statement.source)
+        self.sources.append(source)
+        self._by_address = self._by_line = None
+
+    def clear(self) -> None:
+        for column in (
+            self.addresses,
+            self.sizes,
+            self.lines,
+            self.columns,
+            self.labels,
+            self.sources,
+        ):
+            del column[:]
+        self._names.clear()
+        del self.paths[1:]
+        self._path_ids = {None: 0}
+        self._by_address = self._by_line = None
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def __getitem__(self, row: int) -> SourceLocation:
+        label = self.labels[row]
+        return SourceLocation(
+            self.addresses[row],
+            self.sizes[row],
+            self.lines[row],
+            self.columns[row],
+            None if label == NO_ROW else self._names[label],
+            self.paths[self.sources[row]],
+        )
+
+    def __iter__(self) -> Iterator[SourceLocation]:
+        return map(self.__getitem__, range(len(self)))
+
+    def row_at(self, address: int) -> int:
+        """Row of the statement allocating the word at the address, or NO_ROW.
+
+        A word allocated by more statements belongs to the last one located.
+        """
+        if self._by_address is None:
+            self._index_addresses()
+            assert self._by_address is not None
+        offset = address - self._first_address
+        if 0 <= offset < len(self._by_address):
+            return self._by_address[offset]
+        return NO_ROW
+
+    def at(self, address: int) -> Optional[SourceLocation]:
+        """Location of the statement the word at the address comes from."""
+        row = self.row_at(address)
+        return None if row == NO_ROW else self[row]
+
+    def row_on(self, line: int, source: Optional[str] = None) -> int:
+        """Row of the first statement of the source line, or NO_ROW."""
+        if self._by_line is None:
+            self._index_lines()
+            assert self._by_line is not None
+        source_id = self._path_ids.get(source)
+        if source_id is None:
+            return NO_ROW
+        rows = self._by_line[source_id]
+        return rows[line] if 0 <= line < len(rows) else NO_ROW
+
+    def on(self, line: int, source: Optional[str] = None) -> Optional[SourceLocation]:
+        """Location of the first statement of the line, e.g. to set a breakpoint.
+
+        source: path of an included file, None for the assembled source.
+        """
+        row = self.row_on(line, source)
+        return None if row == NO_ROW else self[row]
+
+    def _index_addresses(self) -> None:
+        spans = [
+            (address, address + size)
+            for address, size in zip(self.addresses, self.sizes)
+            if size
+        ]
+        if not spans:
+            self._first_address, self._by_address = 0, array("i")
+            return
+        first = min(start for start, _ in spans)
+        by_address = array("i", [NO_ROW]) * (max(stop for _, stop in spans) - first)
+        for row, (address, size) in enumerate(zip(self.addresses, self.sizes)):
+            if size:
+                start = address - first
+                by_address[start : start + size] = array("i", [row]) * size
+        self._first_address, self._by_address = first, by_address
+
+    def _index_lines(self) -> None:
+        last_lines = [0] * len(self.paths)
+        for source, line in zip(self.sources, self.lines):
+            last_lines[source] = max(last_lines[source], line)
+        by_line = [array("i", [NO_ROW]) * (last + 1) for last in last_lines]
+        for row in reversed(range(len(self))):
+            by_line[self.sources[row]][self.lines[row]] = row
+        self._by_line = by_line
+
+
+def iter_listing(assembler: "Assembler") -> Iterator[str]:
+    """Yields lines of the listing of an assembled program.
+
+    Every statement is listed with its address, first word and source line, the
+    other words it allocates follow on lines of their own. Lines of the assembled
+    source that generate nothing, e.g. comments, are listed with the source only.
+    """
+    index, memory = assembler.index, assembler.memory
+    yield LISTING_HEADER
+    listed = 0  # last line of the assembled source listed
+    for row in range(len(index)):
+        source, line = index.sources[row], index.lines[row]
+        if source == 0:
+            for gap in range(listed + 1, line):
+                yield f"{'':12}  {gap:5}  {assembler.line_text(gap) or ''}\n"
+            listed = max(listed, line)
+        # Statements expanded from a macro keep lines of its definition.
+        text = assembler.line_text(line, index.paths[source]) or ""
+        address, size = index.addresses[row], index.sizes[row]
+        if not size:
+            yield f"{'':12}  {line:5}  {text}\n"
+            continue
+        yield f"  {address:04X}  {memory[address]:04X}  {line:5}  {text}\n"
+        for following in range(address + 1, address + size):
+            yield f"  {following:04X}  {memory[following]:04X}\n"
+    if assembler.source is not None:
+        for gap in range(listed + 1, len(assembler.source) + 1):
+            yield f"{'':12}  {gap:5}  {assembler.line_text(gap)}\n"
+
+
+def write_listing(assembler: "Assembler", stream: TextIO) -> None:
+    """Streams the listing of an assembled program to a text stream."""
+    stream.writelines(iter_listing(assembler))
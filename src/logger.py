@@ -1,18 +1,58 @@
+import json
 import logging
+from typing import Optional, TextIO
+
+DIAGNOSTICS_LOGGER = "lc3"
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats every record as a single line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+_handler: Optional[logging.Handler] = None
+
+
+def configure(structured: bool = False, stream: Optional[TextIO] = None) -> None:
+    """Routes diagnostics of all assemblers to a single handler.
+
+    structured: emit JSON lines instead of human-readable lines.
+    stream: destination of diagnostics, sys.stderr if None.
+    """
+    global _handler
+    logger = logging.getLogger(DIAGNOSTICS_LOGGER)
+    if _handler is not None:
+        logger.removeHandler(_handler)
+    _handler = logging.StreamHandler(stream)
+    _handler.setFormatter(
+        JsonLinesFormatter() if structured else logging.Formatter(FORMAT)
+    )
+    logger.addHandler(_handler)
 
 
 class Logger:
+    """Gives access to diagnostics logger configured once per process.
 
-    def __init__(self, verbose: bool):
-        logger = logging.getLogger(self.__class__.__name__)
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
+    Messages have to be passed with %-style arguments, so they are formatted only
+    if the record is emitted.
+    """
 
+    def __init__(self, verbose: bool):
+        if _handler is None:
+            configure()
+        logger = logging.getLogger(f"{DIAGNOSTICS_LOGGER}.{self.__class__.__name__}")
         level = logging.DEBUG if verbose else logging.INFO
-        logger.setLevel(level)
-        handler.setLevel(level)
-        logger.addHandler(handler)
+        if logger.level != level:
+            logger.setLevel(level)
         self._logger = logger
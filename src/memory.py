@@ -0,0 +1,128 @@
+from array import array
+from bisect import bisect_right
+from typing import Iterator
+
+
+class Memory:
+    """Sparse LC-3 address space storing only written ranges of 16-bit words.
+
+    Written words are kept in segments - contiguous arrays ordered by their start
+    address. Neighbouring segments are merged, so a program assembled from a single
+    origin takes one segment. Unwritten addresses read as 0.
+
+    Attributes:
+        SIZE: count of addressable words.
+    """
+
+    SIZE = 1 << 16
+
+    __slots__ = ("_starts", "_blocks", "_cursor")
+
+    def __init__(self) -> None:
+        self._starts: list[int] = []
+        self._blocks: list["array[int]"] = []
+        # Index of the most recently written segment, sequential writes hit it.
+        self._cursor = 0
+
+    def __getitem__(self, address: int) -> int:
+        index = bisect_right(self._starts, address) - 1
+        if index >= 0:
+            offset = address - self._starts[index]
+            block = self._blocks[index]
+            if offset < len(block):
+                return block[offset]
+        if not 0 <= address < self.SIZE:
+            raise IndexError(f"Memory address out of range: {address}")
+        return 0
+
+    def __setitem__(self, address: int, value: int) -> None:
+        if self._blocks:
+            cursor = self._cursor
+            block = self._blocks[cursor]
+            offset = address - self._starts[cursor]
+            if 0 <= offset < len(block):
+                block[offset] = value
+                return
+            if offset == len(block) and self._extends(cursor, address + 1):
+                block.append(value)
+                self._merge_next(cursor)
+                return
+        self.write_words(address, array("H", (value,)))
+
+    def write_words(self, address: int, words: "array[int]") -> None:
+        """Writes consecutive words starting at the address."""
+        end = address + len(words)
+        if address < 0 or end > self.SIZE:
+            raise IndexError(f"Memory address out of range: {address}")
+        if not words:
+            return
+
+        index = bisect_right(self._starts, address) - 1
+        if index >= 0:
+            start = self._starts[index]
+            block = self._blocks[index]
+            offset = address - start
+            if offset + len(words) <= len(block):
+                block[offset : offset + len(words)] = words
+                self._cursor = index
+                return
+            if offset <= len(block):
+                del block[offset:]
+                block.extend(words)
+                self._absorb_overlapped(index)
+                return
+
+        index += 1
+        self._starts.insert(index, address)
+        self._blocks.insert(index, array("H", words))
+        self._absorb_overlapped(index)
+
+    def reserve(self, address: int, count: int) -> None:
+        """Allocates zeroed words, so they are serialized with the program."""
+        self.write_words(address, array("H", bytes(2 * count)))
+
+    def segments(
+        self, start: int = 0, stop: int = SIZE
+    ) -> Iterator[tuple[int, memoryview]]:
+        """Yields start address and a view of words for written ranges in bounds."""
+        first = max(bisect_right(self._starts, start) - 1, 0)
+        for segment_start, block in zip(self._starts[first:], self._blocks[first:]):
+            if segment_start >= stop:
+                break
+            low = max(start - segment_start, 0)
+            high = min(stop - segment_start, len(block))
+            if low < high:
+                yield segment_start + low, memoryview(block)[low:high]
+
+    def clear(self) -> None:
+        self._starts.clear()
+        self._blocks.clear()
+        self._cursor = 0
+
+    def _extends(self, index: int, end: int) -> bool:
+        return index + 1 == len(self._starts) or end <= self._starts[index + 1]
+
+    def _merge_next(self, index: int) -> None:
+        following = index + 1
+        if (
+            following < len(self._starts)
+            and self._starts[index] + len(self._blocks[index])
+            == self._starts[following]
+        ):
+            self._blocks[index].extend(self._blocks[following])
+            del self._starts[following], self._blocks[following]
+
+    def _absorb_overlapped(self, index: int) -> None:
+        """Merges segments overwritten or touched by the segment at the index."""
+        start = self._starts[index]
+        block = self._blocks[index]
+        following = index + 1
+        while following < len(self._starts):
+            covered = start + len(block) - self._starts[following]
+            if covered < 0:
+                break
+            next_block = self._blocks[following]
+            if covered < len(next_block):
+                block.extend(next_block[covered:])
+            del self._starts[following], self._blocks[following]
+        self._cursor = index
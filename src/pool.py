@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Iterator
+
+from assembler import Assembler
+
+
+class AssemblerPool:
+    """Idle assemblers kept for reuse, by the options they were created with.
+
+    A borrowed assembler is reset when it's given back, so a worker assembling
+    many files creates one for every configuration it's asked for.
+
+    Attributes:
+        max_idle: assemblers kept for each configuration, others are dropped.
+        created: count of assemblers created because none was idle.
+        reused: count of borrowed assemblers that were idle.
+    """
+
+    def __init__(self, max_idle: int = 2):
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        # Guards idle lists and counters, threads of a server share the pool.
+        self._lock = Lock()
+        self._idle: dict[tuple[tuple[str, Any], ...], list[Assembler]] = {}
+
+    @contextmanager
+    def borrow(self, **options: Any) -> Iterator[Assembler]:
+        """Gives an assembler configured with Assembler options until the block ends."""
+        with self._lock:
+            idle = self._idle.setdefault(tuple(sorted(options.items())), [])
+            assembler = idle.pop() if idle else None
+            if assembler is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        if assembler is None:
+            assembler = Assembler(**options)
+        try:
+            yield assembler
+        finally:
+            assembler.reset()
+            with self._lock:
+                if len(idle) < self.max_idle:
+                    idle.append(assembler)
+
+
+# Shared by assemblies run in this process, e.g. by batch and server workers.
+ASSEMBLERS = AssemblerPool()
@@ -0,0 +1,321 @@
+import os
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from encoding import PseudoOpCode
+from lexer import Token, TokenKind
+from program import Statement
+from source import SourceFile
+
+Parse = Callable[[str, int], Optional[Statement]]
+
+# Handled while reading sources, they never reach the assembler passes.
+PREPROCESSOR_DIRECTIVES = frozenset(
+    (PseudoOpCode.INCLUDE, PseudoOpCode.MACRO, PseudoOpCode.END_MACRO)
+)
+
+
+class LineError(NamedTuple):
+    """Error of a line that couldn't be read, in place of its statement.
+
+    Attributes:
+        error: the exception raised in fail-fast mode.
+        line: number of the line, counted from 1.
+        source: path of the included file, None for the assembled source.
+    """
+
+    error: Exception
+    line: int
+    source: Optional[str] = None
+
+
+Entry = Statement | LineError
+
+
+class ParsedFile(NamedTuple):
+    """Included file tokenized once, its statements are templates to be copied.
+
+    Attributes:
+        mtime: modification time the file was parsed at, in nanoseconds.
+        lines: text of the file, for reports.
+        entries: statements and errors of the file in order.
+    """
+
+    mtime: int
+    lines: list[str]
+    entries: list[Entry]
+
+
+def parse_lines(
+    lines: Iterable[str], parse: Parse, source: Optional[str]
+) -> Iterator[Entry]:
+    """Statements of non-empty lines, errors of lines that couldn't be parsed."""
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            statement = parse(line, line_number)
+        except Exception as e:
+            yield LineError(e, line_number, source)
+            continue
+        if statement is None:
+            continue
+        if source is not None:
+            statement.source = source
+            for token in statement.tokens:
+                token.source = source
+        yield statement
+
+
+class ParsedFileCache:
+    """Included files parsed once per process, keyed by their real path.
+
+    An entry is parsed again once the file modification time changes. Every
+    assembler uses the process-wide PARSED_FILES unless given its own cache.
+
+    Attributes:
+        hits: count of includes served without parsing.
+        misses: count of includes that required parsing.
+    """
+
+    def __init__(self) -> None:
+        self._files: dict[str, ParsedFile] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, parse: Parse) -> ParsedFile:
+        mtime = os.stat(path).st_mtime_ns
+        parsed = self._files.get(path)
+        if parsed is not None and parsed.mtime == mtime:
+            self.hits += 1
+            return parsed
+        self.misses += 1
+        with SourceFile(path) as source:
+            lines = list(source)
+        parsed = ParsedFile(mtime, lines, list(parse_lines(lines, parse, path)))
+        self._files[path] = parsed
+        return parsed
+
+    def line(self, path: str, number: int) -> Optional[str]:
+        """Text of a line of a parsed file, None if the file isn't cached."""
+        parsed = self._files.get(path)
+        if parsed is None or not 1 <= number <= len(parsed.lines):
+            return None
+        return parsed.lines[number - 1]
+
+    def clear(self) -> None:
+        self._files.clear()
+
+
+PARSED_FILES = ParsedFileCache()
+
+
+class Macro(NamedTuple):
+    """Statements expanded in place of the macro name used as a mnemonic.
+
+    Attributes:
+        parameters: words replaced by operands of the invocation in order.
+        body: statements between '.MACRO' and '.ENDM', copied on expansion.
+        line: number of the line with '.MACRO'.
+        source: path of the included file it's defined in, None if it's in the
+            assembled source.
+    """
+
+    name: str
+    parameters: tuple[str, ...]
+    body: list[Statement]
+    line: int
+    source: Optional[str]
+
+
+def bind(token: Token, arguments: dict[str, Token]) -> Token:
+    """Argument in place of a parameter, located where the parameter is."""
+    if token.kind != TokenKind.LABEL:
+        return token
+    argument = arguments.get(token.text)
+    if argument is None:
+        return token
+    return Token(
+        argument.kind,
+        argument.text,
+        token.line,
+        token.column,
+        argument.value,
+        token.source,
+    )
+
+
+class Preprocessor:
+    """Expands .INCLUDE directives and macros of a source into plain statements.
+
+    syntax: .INCLUDE "path"
+        path: file to be read in place of the directive, relative to the
+            directory of the including file.
+
+    syntax: .MACRO name parameter, ...
+                body
+            .ENDM
+        name: used as a mnemonic, its statements are expanded with every
+            parameter word replaced by the operand given at that position.
+
+    Statements keep lines of the file they were read from, so errors point to the
+    original file and line.
+
+    Attributes:
+        files: cache of parsed included files.
+        macros: definitions by name, including those from included files.
+        included: modification times of every file included, keyed by path.
+    """
+
+    def __init__(self, parse: Parse, files: ParsedFileCache = PARSED_FILES):
+        self.parse = parse
+        self.files = files
+        self.macros: dict[str, Macro] = {}
+        self.included: dict[str, int] = {}
+        self._directory = ""
+        # Files and macros being expanded, innermost last.
+        self._includes: list[str] = []
+        self._expanding: list[str] = []
+
+    def expand(
+        self, lines: Iterable[str], path: Optional[str] = None
+    ) -> Iterator[Entry]:
+        """Statements of the source as its lines are read, errors of failed ones.
+
+        path: of the source, includes are looked up next to it; working directory
+            is used if None.
+        """
+        if path is not None:
+            self._directory = os.path.dirname(path)
+            self._includes.append(os.path.realpath(path))
+        yield from self._expand(parse_lines(lines, self.parse, None))
+
+    def _expand(self, entries: Iterable[Entry]) -> Iterator[Entry]:
+        definition: Optional[Macro] = None
+        for entry in entries:
+            if isinstance(entry, LineError):
+                yield entry
+                continue
+            mnemonic = entry.mnemonic
+            try:
+                if definition is not None:
+                    if mnemonic == PseudoOpCode.END_MACRO:
+                        self._end_definition(entry, definition)
+                        definition = None
+                    elif mnemonic == PseudoOpCode.MACRO:
+                        raise SyntaxError(
+                            f"Macro {definition.name} isn't finished with '.ENDM' "
+                            "before another '.MACRO'."
+                        )
+                    else:
+                        definition.body.append(entry)
+                elif mnemonic == PseudoOpCode.INCLUDE:
+                    yield from self._include(entry)
+                elif mnemonic == PseudoOpCode.MACRO:
+                    definition = self._begin_definition(entry)
+                elif mnemonic == PseudoOpCode.END_MACRO:
+                    raise SyntaxError("'.ENDM' without '.MACRO'.")
+                elif (
+                    mnemonic is None
+                    and entry.tokens
+                    and entry.tokens[0].text in self.macros
+                ):
+                    yield from self._invoke(entry)
+                else:
+                    yield entry
+            except Exception as e:
+                yield LineError(e, entry.line, entry.source)
+        if definition is not None:
+            yield LineError(
+                SyntaxError(f"Macro {definition.name} isn't finished with '.ENDM'."),
+                definition.line,
+                definition.source,
+            )
+
+    def _include(self, statement: Statement) -> Iterator[Entry]:
+        directive, *operands = statement.tokens
+        if statement.label is not None:
+            raise SyntaxError("'.INCLUDE' cannot work with label.")
+        if len(operands) != 1 or operands[0].kind != TokenKind.STRING:
+            raise SyntaxError(
+                f"'.INCLUDE' requires a path between double quotes at "
+                f"{directive.location}."
+            )
+        directory = (
+            self._directory
+            if statement.source is None
+            else os.path.dirname(statement.source)
+        )
+        path = os.path.realpath(os.path.join(directory, operands[0].text[1:-1]))
+        if path in self._includes:
+            chain = self._includes[self._includes.index(path) :] + [path]
+            raise RecursionError(f"Include cycle: {' -> '.join(chain)}.")
+
+        parsed = self.files.get(path, self.parse)
+        self.included[path] = parsed.mtime
+        self._includes.append(path)
+        try:
+            yield from self._expand(
+                entry.copy() if isinstance(entry, Statement) else entry
+                for entry in parsed.entries
+            )
+        finally:
+            self._includes.pop()
+
+    def _begin_definition(self, statement: Statement) -> Macro:
+        directive, *operands = statement.tokens
+        if statement.label is not None:
+            raise SyntaxError("'.MACRO' cannot work with label.")
+        if not operands:
+            raise SyntaxError(f"'.MACRO' requires a name at {directive.location}.")
+        for operand in operands:
+            if operand.kind != TokenKind.LABEL:
+                raise TypeError(
+                    f"Invalid macro name or parameter: {operand.text} at "
+                    f"{operand.location}."
+                )
+        name, *parameters = (operand.text for operand in operands)
+        defined = self.macros.get(name)
+        if defined is not None:
+            raise SyntaxError(
+                f"Macro {name} is already defined at line {defined.line}"
+                + (f" of {defined.source}." if defined.source is not None else ".")
+            )
+        return Macro(name, tuple(parameters), [], statement.line, statement.source)
+
+    def _end_definition(self, statement: Statement, definition: Macro) -> None:
+        if len(statement.tokens) != 1 or statement.label is not None:
+            raise SyntaxError("Directive '.ENDM' does not accept operands nor label.")
+        self.macros[definition.name] = definition
+
+    def _invoke(self, statement: Statement) -> Iterator[Entry]:
+        name, *operands = statement.tokens
+        macro = self.macros[name.text]
+        if macro.name in self._expanding:
+            raise RecursionError(
+                f"Macro {macro.name} expands itself at {name.location}."
+            )
+        if len(operands) != len(macro.parameters):
+            raise IndexError(
+                f"Invalid operands number of macro {macro.name} - expected: "
+                f"{len(macro.parameters)}, actual {len(operands)} at {name.location}."
+            )
+
+        arguments = dict(zip(macro.parameters, operands))
+        expanded = []
+        for template in macro.body:
+            statement_copy = template.copy()
+            statement_copy.tokens = [
+                bind(token, arguments) for token in template.tokens
+            ]
+            expanded.append(statement_copy)
+        if statement.label is not None:
+            if not expanded or expanded[0].label is not None:
+                raise SyntaxError(
+                    f"Label {statement.label} can't be placed at macro {macro.name} "
+                    f"at {name.location}, its first statement has to be unlabeled."
+                )
+            expanded[0].label = statement.label
+
+        self._expanding.append(macro.name)
+        try:
+            yield from self._expand(expanded)
+        finally:
+            self._expanding.pop()
@@ -0,0 +1,71 @@
+from typing import Iterator, Optional
+
+from lexer import Token
+
+
+class Statement:
+    """Tokenized assembly line that generates code or data.
+
+    Produced by the first pass, so the second pass encodes it without reading the
+    source again.
+
+    Attributes:
+        mnemonic: operation or directive code; None if the line has none.
+        tokens: instruction tokens without the label definition, mnemonic included.
+        line: number of the source line, counted from 1.
+        address: memory address of the first word the statement allocates.
+        label: symbolic name defined for the address, without the colon.
+        source: path of the included file the statement was read from, None for
+            the assembled source.
+    """
+
+    __slots__ = ("mnemonic", "tokens", "line", "address", "label", "source")
+
+    def __init__(
+        self,
+        mnemonic: Optional[str],
+        tokens: list[Token],
+        line: int,
+        address: int,
+        label: Optional[str] = None,
+        source: Optional[str] = None,
+    ):
+        self.mnemonic = mnemonic
+        self.tokens = tokens
+        self.line = line
+        self.address = address
+        self.label = label
+        self.source = source
+
+    def copy(self) -> "Statement":
+        """Statement sharing the tokens, so it can be located independently."""
+        return Statement(
+            self.mnemonic, self.tokens, self.line, self.address, self.label, self.source
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Statement({self.mnemonic!r}, line={self.line}, "
+            f"address={self.address:#06x}, label={self.label!r})"
+        )
+
+
+class Program:
+    """Ordered statements of a single assembly source."""
+
+    __slots__ = ("statements",)
+
+    def __init__(self) -> None:
+        self.statements: list[Statement] = []
+
+    def append(self, statement: Statement) -> None:
+        self.statements.append(statement)
+
+    def __iter__(self) -> Iterator[Statement]:
+        return iter(self.statements)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def __getitem__(self, index: int) -> Statement:
+        return self.statements[index]
@@ -0,0 +1,129 @@
+import json
+import struct
+import sys
+from array import array
+from typing import TYPE_CHECKING, Any
+
+from instruction_set import Fixup
+from lexer import Token, TokenKind
+from writers import iter_words
+
+if TYPE_CHECKING:
+    from assembler import Assembler
+
+MODULE_SUFFIX = ".rel"
+MAGIC = b"LC3R"
+# Module file: magic, length of the JSON header, JSON header with the origin and
+# symbols, big-endian words.
+HEADER_LENGTH = struct.Struct(">I")
+
+
+class ObjectModule:
+    """Relocatable object: words of a program with what's needed to link it.
+
+    Addresses are those the program was assembled at, from origin on. The linker
+    places the module elsewhere by adding the same offset to every one of them.
+
+    Attributes:
+        name: path of the module, names it in link errors.
+        origin: address of the first word.
+        words: the encoded program, gaps zero filled.
+        exports: every label of the program with its address.
+        imports: references to labels of other modules, patched by the linker.
+        relocations: addresses of words holding an address within the module.
+    """
+
+    __slots__ = ("name", "origin", "words", "exports", "imports", "relocations")
+
+    def __init__(
+        self,
+        name: str,
+        origin: int,
+        words: "array[int]",
+        exports: dict[str, int],
+        imports: list[Fixup],
+        relocations: list[int],
+    ):
+        self.name = name
+        self.origin = origin
+        self.words = words
+        self.exports = exports
+        self.imports = imports
+        self.relocations = relocations
+
+    @classmethod
+    def from_assembler(cls, assembler: "Assembler", name: str = "") -> "ObjectModule":
+        """Module of a program assembled with relocatable set."""
+        words = array("H")
+        for _, chunk in iter_words(
+            assembler.memory, assembler.origin, assembler.program_counter
+        ):
+            words.extend(chunk)
+        return cls(
+            name,
+            assembler.origin,
+            words,
+            assembler.labels_addresses,
+            list(assembler.imports),
+            list(assembler.relocations),
+        )
+
+    def to_bytes(self) -> bytes:
+        header: dict[str, Any] = {
+            "origin": self.origin,
+            "exports": self.exports,
+            "imports": [
+                [
+                    fixup.operand.text,
+                    fixup.address,
+                    fixup.width,
+                    fixup.operand.line,
+                    fixup.operand.column,
+                ]
+                for fixup in self.imports
+            ],
+            "relocations": self.relocations,
+        }
+        encoded_header = json.dumps(header, separators=(",", ":")).encode()
+        words = array("H", self.words)
+        if sys.byteorder != "big":
+            words.byteswap()
+        return (
+            MAGIC
+            + HEADER_LENGTH.pack(len(encoded_header))
+            + encoded_header
+            + words.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes, name: str = "") -> "ObjectModule":
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a relocatable object module: {name}")
+        (header_length,) = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        header_start = len(MAGIC) + HEADER_LENGTH.size
+        header_end = header_start + header_length
+        header = json.loads(data[header_start:header_end])
+        words = array("H")
+        words.frombytes(data[header_end:])
+        if sys.byteorder != "big":
+            words.byteswap()
+        # Imported labels are located in the module, the linker reports them so.
+        imports = [
+            Fixup(
+                address, Token(TokenKind.LABEL, label, line, column, None, name), width
+            )
+            for label, address, width, line, column in header["imports"]
+        ]
+        return cls(
+            name,
+            header["origin"],
+            words,
+            header["exports"],
+            imports,
+            header["relocations"],
+        )
+
+
+def load_module(path: str) -> ObjectModule:
+    with open(path, "rb") as file:
+        return ObjectModule.from_bytes(file.read(), path)
@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import sys
+import time
+from bisect import bisect_left
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Optional
+
+from assembler import Assembler
+from diagnostics import Diagnostic
+from pool import ASSEMBLERS
+from writers import OUTPUT_FORMATS
+
+# Requests and responses are single lines of JSON, a longer request is refused.
+MAX_REQUEST_BYTES = 1 << 22
+# Upper bounds of latency buckets in seconds, doubling from 0.25 ms to about 8 s.
+LATENCY_BOUNDS = tuple(0.00025 * 2**power for power in range(16))
+WARM_UP_SOURCE = [".ORIG x3000", "LOOP: ADD R0, R0, #1", "BRp LOOP", ".END"]
+
+
+class LatencyHistogram:
+    """Counts of request latencies in buckets of exponentially growing bounds."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BOUNDS):
+        self.bounds = bounds
+        # The last bucket counts latencies over the highest bound.
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket the quantile falls in, inf past the last."""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return float("inf")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * self.total / self.count if self.count else 0.0,
+            "p50_ms": 1000 * self.quantile(0.5),
+            "p90_ms": 1000 * self.quantile(0.9),
+            "p99_ms": 1000 * self.quantile(0.99),
+            "buckets": [
+                [1000 * bound, count] for bound, count in zip(self.bounds, self.counts)
+            ]
+            + [[None, self.counts[-1]]],
+        }
+
+
+def warm_up() -> None:
+    """Runs the assembler once in a new worker, so the first request isn't slower.
+
+    The assembler is left in the pool for the requests to reuse.
+    """
+    with ASSEMBLERS.borrow(collect_errors=True) as assembler:
+        assembler.encode_program(assembler.parse_program(WARM_UP_SOURCE))
+
+
+def assemble_source(
+    source: str,
+    name: str = "<request>",
+    output_format: str = "obj",
+    big_endian: bool = True,
+) -> dict[str, Any]:
+    """Assembles source text to a response, run by a worker of the pool.
+
+    name: path the source is known by, includes are looked up next to it.
+    """
+    with ASSEMBLERS.borrow(collect_errors=True) as assembler:
+        return assembled_response(
+            assembler, source.splitlines(), name, output_format, big_endian
+        )
+
+
+def assembled_response(
+    assembler: Assembler,
+    lines: list[str],
+    name: str,
+    output_format: str,
+    big_endian: bool,
+) -> dict[str, Any]:
+    try:
+        program = assembler.parse_program(lines, name)
+        assembler.encode_program(program)
+    except Exception as e:
+        return {"ok": False, "error": f"{e.__class__.__name__}: {e}"}
+
+    def source_line(diagnostic: Diagnostic) -> Optional[str]:
+        if diagnostic.filename is not None:
+            return assembler.source_line(diagnostic)
+        return lines[diagnostic.line - 1] if diagnostic.line <= len(lines) else None
+
+    if assembler.diagnostics:
+        return {
+            "ok": False,
+            "error": f"{len(assembler.diagnostics)} errors",
+            "diagnostics": [
+                {
+                    "line": diagnostic.line,
+                    "column": diagnostic.column,
+                    "severity": diagnostic.severity.value,
+                    "error": diagnostic.error,
+                    "message": diagnostic.message,
+                    "filename": diagnostic.filename,
+                    "text": diagnostic.format(name, source_line(diagnostic)),
+                }
+                for diagnostic in assembler.diagnostics
+            ],
+        }
+    data = b"".join(assembler.iter_bytes(big_endian, output_format))
+    return {
+        "ok": True,
+        "object": base64.b64encode(data).decode(),
+        "origin": assembler.origin,
+        "symbols": assembler.labels_addresses,
+        "diagnostics": [],
+    }
+
+
+class AssemblyServer:
+    """Assembles sources sent over a Unix socket by a pool of warm workers.
+
+    Every connection sends requests as lines of JSON and receives a line of JSON
+    for each, in order:
+        {"op": "assemble", "source": "...", "name": "file.asm", "format": "obj",
+         "big_endian": true} -> {"ok": true, "object": base64 bytes, "origin": int,
+                                 "symbols": {label: address}, "diagnostics": []}
+        {"op": "stats"} -> latency histogram of assemble requests and load
+        {"op": "ping"} -> {"ok": true}
+    An "id" field of a request is copied to its response.
+
+    A connection isn't read until its last response has been written, so a client
+    can't queue more than a request. At most max_jobs requests are assembled at
+    once, up to max_pending more wait for a worker and those beyond are refused
+    as busy straight away.
+
+    Attributes:
+        latency: seconds from reading to answering every assemble request.
+        active: count of requests being assembled.
+        pending: count of requests waiting for a worker.
+        refused: count of requests refused as busy.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        executor: Optional[Executor] = None,
+        max_jobs: Optional[int] = None,
+        max_pending: int = 64,
+    ):
+        self.path = path
+        workers = max_jobs or os.cpu_count() or 1
+        self.executor = executor or ProcessPoolExecutor(workers, initializer=warm_up)
+        self.max_jobs = workers
+        self.max_pending = max_pending
+        self.latency = LatencyHistogram()
+        self.active = 0
+        self.pending = 0
+        self.refused = 0
+        self._jobs = asyncio.Semaphore(workers)
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Writers of open connections by their handling task, closed on close.
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(
+            self.handle_connection, self.path, limit=MAX_REQUEST_BYTES
+        )
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Handlers read the end of their streams and finish instead of being cancelled.
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # over the limit, the stream can't be resumed
+                    response = {
+                        "ok": False,
+                        "error": f"Request exceeds {MAX_REQUEST_BYTES} bytes.",
+                    }
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                response = await self.respond(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    async def respond(self, line: bytes) -> dict[str, Any]:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request has to be a JSON object.")
+        except ValueError as e:
+            return {"ok": False, "error": f"Invalid request: {e}"}
+        response = await self.dispatch(request)
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        operation = request.get("op", "assemble")
+        if operation == "ping":
+            return {"ok": True}
+        if operation == "stats":
+            return {
+                "ok": True,
+                "latency": self.latency.as_dict(),
+                "active": self.active,
+                "pending": self.pending,
+                "refused": self.refused,
+            }
+        if operation != "assemble":
+            return {"ok": False, "error": f"Unknown operation: {operation}"}
+        source = request.get("source")
+        output_format = request.get("format", "obj")
+        if not isinstance(source, str):
+            return {"ok": False, "error": "Request requires a 'source' string."}
+        if output_format not in OUTPUT_FORMATS:
+            return {"ok": False, "error": f"Unknown format: {output_format}"}
+        return await self.assemble(
+            source,
+            str(request.get("name", "<request>")),
+            output_format,
+            bool(request.get("big_endian", True)),
+        )
+
+    async def assemble(
+        self, source: str, name: str, output_format: str, big_endian: bool
+    ) -> dict[str, Any]:
+        if self.pending >= self.max_pending and self._jobs.locked():
+            self.refused += 1
+            return {"ok": False, "error": "busy"}
+        started = time.perf_counter()
+        self.pending += 1
+        try:
+            await self._jobs.acquire()
+        finally:
+            self.pending -= 1
+        self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, assemble_source, source, name, output_format, big_endian
+            )
+        except Exception as e:  # worker process died, e.g. BrokenProcessPool
+            return {"ok": False, "error": f"{e.__class__.__name__}: {e}"}
+        finally:
+            self.active -= 1
+            self._jobs.release()
+            self.latency.record(time.perf_counter() - started)
+
+
+def request(path: str, message: dict[str, Any], timeout: float = 30.0) -> dict:
+    """Sends a single request to a server and waits for its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(message).encode() + b"\n")
+        with client.makefile("rb") as stream:
+            return json.loads(stream.readline())
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="server", description="Serve LC-3 assembly requests on a Unix socket."
+    )
+    parser.add_argument("socket", help="path of the Unix socket to listen on")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes count")
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=64,
+        help="requests waiting for a worker before others are refused",
+    )
+    args = parser.parse_args(argv)
+
+    async def serve() -> None:
+        server = AssemblyServer(args.socket, max_jobs=args.jobs)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
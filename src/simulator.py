@@ -0,0 +1,323 @@
+import argparse
+import io
+import sys
+import time
+from array import array
+from functools import lru_cache
+from typing import NamedTuple, Optional, Protocol, TextIO
+
+from memory import Memory
+from writers import read_object
+
+# Kinds of decoded instructions, the first field of every table entry. Operation
+# codes with separate register and immediate forms get a kind for each.
+(
+    BRANCH,
+    ADD,
+    ADD_IMMEDIATE,
+    LOAD,
+    STORE,
+    JUMP_TO_SUBROUTINE,
+    JUMP_TO_SUBROUTINE_BY_REGISTER,
+    AND,
+    AND_IMMEDIATE,
+    LOAD_REGISTER,
+    STORE_REGISTER,
+    NOT,
+    LOAD_INDIRECT,
+    STORE_INDIRECT,
+    JUMP,
+    LOAD_EFFECTIVE_ADDRESS,
+    TRAP,
+    NO_OPERATION,
+    ILLEGAL,
+) = range(19)
+
+# Condition codes, the value an instruction sets them to is a lookup by result.
+NEGATIVE, ZERO, POSITIVE = 0b100, 0b010, 0b001
+
+# Operation codes of a register and a PCoffset9 field.
+PC_RELATIVE_KINDS = {
+    0b0010: LOAD,
+    0b0011: STORE,
+    0b1010: LOAD_INDIRECT,
+    0b1011: STORE_INDIRECT,
+    0b1110: LOAD_EFFECTIVE_ADDRESS,
+}
+
+GETC, OUT, PUTS, IN, PUTSP, HALT = range(0x20, 0x26)
+IN_PROMPT = "Input a character> "
+
+
+class Decoded(NamedTuple):
+    """Instruction with fields extracted and offsets sign-extended to 16 bits.
+
+    Fields not used by the kind are 0. Offsets are kept modulo 2^16, so adding one
+    to an address only needs masking.
+    """
+
+    kind: int
+    a: int = 0
+    b: int = 0
+    c: int = 0
+
+
+def sign_extended(value: int, width: int) -> int:
+    """Field of given width as a 16-bit two's complement word."""
+    if value >> (width - 1):
+        value -= 1 << width
+    return value & 0xFFFF
+
+
+def decode(word: int) -> Decoded:
+    """Splits an instruction word into its kind and fields."""
+    operation = word >> 12
+    register = (word >> 9) & 0b111
+    base = (word >> 6) & 0b111
+    offset9 = sign_extended(word & 0x1FF, 9)
+    if operation == 0b0000:
+        if not register:
+            return Decoded(NO_OPERATION)
+        return Decoded(BRANCH, register, offset9)
+    if operation in (0b0001, 0b0101):
+        if word & 0b100000:
+            kind = ADD_IMMEDIATE if operation == 0b0001 else AND_IMMEDIATE
+            return Decoded(kind, register, base, sign_extended(word & 0b11111, 5))
+        return Decoded(
+            ADD if operation == 0b0001 else AND, register, base, word & 0b111
+        )
+    if operation == 0b0100:
+        if word & (1 << 11):
+            return Decoded(JUMP_TO_SUBROUTINE, sign_extended(word & 0x7FF, 11))
+        return Decoded(JUMP_TO_SUBROUTINE_BY_REGISTER, base)
+    if operation in (0b0110, 0b0111):
+        kind = LOAD_REGISTER if operation == 0b0110 else STORE_REGISTER
+        return Decoded(kind, register, base, sign_extended(word & 0b111111, 6))
+    if operation == 0b1001:
+        return Decoded(NOT, register, base)
+    if operation == 0b1100:
+        return Decoded(JUMP, base)
+    if operation == 0b1111:
+        return Decoded(TRAP, word & 0xFF)
+    # RTI and the reserved operation code are left illegal.
+    kind = PC_RELATIVE_KINDS.get(operation, ILLEGAL)
+    return Decoded(kind, register, offset9)
+
+
+@lru_cache(maxsize=None)
+def decode_table() -> tuple[Decoded, ...]:
+    """Every possible word decoded, built on first use and shared afterwards."""
+    return tuple(map(decode, range(Memory.SIZE)))
+
+
+@lru_cache(maxsize=None)
+def condition_table() -> bytes:
+    """Condition codes set by writing each word to a register."""
+    return bytes(
+        NEGATIVE if word & 0x8000 else POSITIVE if word else ZERO
+        for word in range(Memory.SIZE)
+    )
+
+
+class DecodeTable(Protocol):
+    """Decoded instructions looked up by their word."""
+
+    def __getitem__(self, word: int, /) -> Decoded: ...
+
+
+class DecodeOnFetch:
+    """Table decoding every word again as it's fetched, a baseline to compare to."""
+
+    def __getitem__(self, word: int) -> Decoded:
+        return decode(word)
+
+
+class Simulator:
+    """LC-3 machine running assembled programs.
+
+    Instructions are looked up by their word in a table decoded once per process,
+    so the fetch-dispatch loop does no bit manipulation of its own. Service
+    routines of TRAP x20-x25 are built in and read or write the given streams,
+    other vectors jump through the trap vector table in memory. Memory mapped
+    device registers aren't simulated.
+
+    Attributes:
+        memory: the whole address space, zero filled.
+        registers: R0-R7.
+        pc: address of the next instruction.
+        condition: NEGATIVE, ZERO or POSITIVE set by the last register write.
+        input: characters read by GETC and IN.
+        output: characters written by OUT, PUTS, IN, PUTSP and HALT.
+        halted: set by HALT, cleared by load.
+        executed: count of instructions run by the last run.
+        elapsed: wall time of the last run in seconds.
+    """
+
+    def __init__(
+        self,
+        input: Optional[TextIO] = None,
+        output: Optional[TextIO] = None,
+        table: Optional[DecodeTable] = None,
+    ):
+        self.memory = array("H", bytes(2 * Memory.SIZE))
+        self.registers = [0] * 8
+        self.pc = 0x3000
+        self.condition = ZERO
+        self.input = io.StringIO() if input is None else input
+        self.output = io.StringIO() if output is None else output
+        self.halted = False
+        self.executed = 0
+        self.elapsed = 0.0
+        self._table = table
+
+    @property
+    def instructions_per_second(self) -> float:
+        return self.executed / self.elapsed if self.elapsed else 0.0
+
+    def load(self, data: bytes, big_endian: bool = True) -> None:
+        """Loads an LC-3 object, e.g. Assembler.to_bytes, to be run from its origin."""
+        memory, start, stop = read_object(data, big_endian)
+        for address, words in memory.segments(start, stop):
+            self.memory[address : address + len(words)] = array("H", words)
+        self.pc = start
+        self.halted = False
+
+    def run(self, max_instructions: Optional[int] = None) -> int:
+        """Executes until HALT or the instructions limit, returns count executed."""
+        table = decode_table() if self._table is None else self._table
+        conditions = condition_table()
+        memory = self.memory
+        registers = self.registers
+        pc, condition = self.pc, self.condition
+        limit = Memory.SIZE**4 if max_instructions is None else max_instructions
+        executed = 0
+        started = time.perf_counter()
+        try:
+            while executed < limit:
+                kind, a, b, c = table[memory[pc]]
+                pc = (pc + 1) & 0xFFFF
+                executed += 1
+                if kind == ADD_IMMEDIATE:
+                    value = registers[a] = (registers[b] + c) & 0xFFFF
+                    condition = conditions[value]
+                elif kind == BRANCH:
+                    if a & condition:
+                        pc = (pc + b) & 0xFFFF
+                elif kind == ADD:
+                    value = registers[a] = (registers[b] + registers[c]) & 0xFFFF
+                    condition = conditions[value]
+                elif kind == LOAD_REGISTER:
+                    value = registers[a] = memory[(registers[b] + c) & 0xFFFF]
+                    condition = conditions[value]
+                elif kind == STORE_REGISTER:
+                    memory[(registers[b] + c) & 0xFFFF] = registers[a]
+                elif kind == LOAD:
+                    value = registers[a] = memory[(pc + b) & 0xFFFF]
+                    condition = conditions[value]
+                elif kind == STORE:
+                    memory[(pc + b) & 0xFFFF] = registers[a]
+                elif kind == AND_IMMEDIATE:
+                    value = registers[a] = registers[b] & c
+                    condition = conditions[value]
+                elif kind == AND:
+                    value = registers[a] = registers[b] & registers[c]
+                    condition = conditions[value]
+                elif kind == NOT:
+                    value = registers[a] = registers[b] ^ 0xFFFF
+                    condition = conditions[value]
+                elif kind == JUMP_TO_SUBROUTINE:
+                    registers[7], pc = pc, (pc + a) & 0xFFFF
+                elif kind == JUMP_TO_SUBROUTINE_BY_REGISTER:
+                    registers[7], pc = pc, registers[a]
+                elif kind == JUMP:
+                    pc = registers[a]
+                elif kind == LOAD_EFFECTIVE_ADDRESS:
+                    registers[a] = (pc + b) & 0xFFFF
+                elif kind == LOAD_INDIRECT:
+                    value = registers[a] = memory[memory[(pc + b) & 0xFFFF]]
+                    condition = conditions[value]
+                elif kind == STORE_INDIRECT:
+                    memory[memory[(pc + b) & 0xFFFF]] = registers[a]
+                elif kind == TRAP:
+                    registers[7] = pc
+                    self.pc = pc
+                    self.trap(a)
+                    pc = self.pc
+                    if self.halted:
+                        break
+                elif kind == ILLEGAL:
+                    raise ValueError(
+                        f"Illegal instruction {memory[(pc - 1) & 0xFFFF]:#06x} at "
+                        f"{(pc - 1) & 0xFFFF:#06x}."
+                    )
+        finally:
+            self.pc, self.condition = pc, condition
+            self.executed = executed
+            self.elapsed = time.perf_counter() - started
+        return executed
+
+    def trap(self, vector: int) -> None:
+        """Runs a built-in service routine, or jumps to the routine in memory."""
+        registers = self.registers
+        if vector == GETC:
+            registers[0] = self.read_character()
+        elif vector == OUT:
+            self.output.write(chr(registers[0] & 0xFF))
+        elif vector == PUTS:
+            address = registers[0]
+            end = self.memory.index(0, address)
+            self.output.write("".join(map(chr, self.memory[address:end])))
+        elif vector == IN:
+            self.output.write(IN_PROMPT)
+            registers[0] = self.read_character()
+            self.output.write(chr(registers[0]))
+        elif vector == PUTSP:
+            address = registers[0]
+            while word := self.memory[address]:
+                self.output.write(chr(word & 0xFF))
+                if word >> 8:
+                    self.output.write(chr(word >> 8))
+                address += 1
+        elif vector == HALT:
+            self.halted = True
+        else:
+            self.pc = self.memory[vector]
+
+    def read_character(self) -> int:
+        character = self.input.read(1)
+        if not character:
+            raise EOFError(f"Input is exhausted at {(self.pc - 1) & 0xFFFF:#06x}.")
+        return ord(character)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="simulator", description="Run an assembled LC-3 object file."
+    )
+    parser.add_argument("program", help="object file")
+    parser.add_argument(
+        "--little-endian", action="store_true", help="words are little-endian"
+    )
+    parser.add_argument(
+        "--max-instructions", type=int, help="stop after that many instructions"
+    )
+    args = parser.parse_args(argv)
+
+    simulator = Simulator(sys.stdin, sys.stdout)
+    try:
+        with open(args.program, "rb") as file:
+            simulator.load(file.read(), not args.little_endian)
+        simulator.run(args.max_instructions)
+    except Exception as e:
+        print(f"{e.__class__.__name__}: {e}", file=sys.stderr)
+        return 1
+    print(
+        f"\n{simulator.executed} instructions in {simulator.elapsed:.3f}s: "
+        f"{simulator.instructions_per_second:,.0f} instructions/s",
+        file=sys.stderr,
+    )
+    return 0 if simulator.halted else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import mmap
+from array import array
+from itertools import accumulate, islice
+from typing import Iterator, Optional
+
+LINE_ENDING = "\r\n"
+
+
+class SourceFile:
+    """Assembly source mapped to memory once, with offsets of its lines.
+
+    The offsets are found in a single scan when the file is opened, then any line
+    is a slice of the mapping decoded on access. Lines are numbered from 1 and
+    don't include line endings.
+
+    Attributes:
+        path: the mapped file.
+        data: content of the file, usable wherever bytes are, e.g. for hashing.
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self._mapping: Optional[mmap.mmap] = None
+        with open(path, "rb") as file:
+            try:
+                self._mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty files can't be mapped
+                pass
+        self.data: bytes | mmap.mmap = (
+            self._mapping if self._mapping is not None else b""
+        )
+        self._starts = index_lines(self._mapping)
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        data, encoding = self.data, self.encoding
+        for start, end in zip(self._starts, islice(self._starts, 1, None)):
+            yield data[start:end].decode(encoding).rstrip(LINE_ENDING)
+
+    def line(self, number: int) -> str:
+        """Text of the line with given number, counted from 1."""
+        if not 1 <= number <= len(self):
+            raise IndexError(f"Line {number} out of range 1-{len(self)}.")
+        start, end = self._starts[number - 1], self._starts[number]
+        return self.data[start:end].decode(self.encoding).rstrip(LINE_ENDING)
+
+    def close(self) -> None:
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+            self.data = b""
+            self._starts = array("Q", [0])
+
+    def __enter__(self) -> "SourceFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def index_lines(mapping: Optional[mmap.mmap]) -> "array[int]":
+    """Offsets of every line start followed by the end of data.
+
+    Lengths of lines read by the mapping are summed up, without Python code
+    running per line.
+    """
+    starts = array("Q", [0])
+    if mapping is not None:
+        mapping.seek(0)
+        starts.extend(accumulate(map(len, iter(mapping.readline, b""))))
+    return starts
@@ -0,0 +1,150 @@
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from encoding import Encoding, OpCode, PseudoOpCode
+from program import Statement
+
+if TYPE_CHECKING:
+    from assembler import Assembler
+
+PHASES = ("tokenize", "map_labels", "encode", "serialize")
+# Operations are reported with OpCode/PseudoOpCode attribute names, e.g. BITWISE_AND.
+MNEMONIC_NAMES = {
+    mnemonic: name
+    for code in (OpCode, PseudoOpCode)
+    for name, mnemonic in vars(code).items()
+    if not name.startswith("_")
+}
+# Branches are reported together, whatever flags they test.
+MNEMONIC_NAMES.update(
+    dict.fromkeys(Encoding.BRANCH_CONDITIONS, MNEMONIC_NAMES[OpCode.BRANCH])
+)
+
+
+class AssemblerStats:
+    """Cumulative timings of assembler phases and operations.
+
+    Attributes:
+        phases: seconds spent in each of PHASES.
+        operations: count of encoded statements and seconds spent encoding them
+            keyed by operation or directive name.
+        bytes_emitted: count of bytes serialized by to_bytes/iter_bytes/write.
+    """
+
+    def __init__(self) -> None:
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.operations: dict[str, list[float]] = {}
+        self.bytes_emitted = 0
+
+    def clear(self) -> None:
+        # Timers of an instrumented assembler hold the phases dict, it's kept.
+        for phase in self.phases:
+            self.phases[phase] = 0.0
+        self.operations.clear()
+        self.bytes_emitted = 0
+
+    def add_operation(self, name: str, seconds: float, count: int = 1) -> None:
+        entry = self.operations.get(name)
+        if entry is None:
+            self.operations[name] = [count, seconds]
+        else:
+            entry[0] += count
+            entry[1] += seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "phases": dict(self.phases),
+            "operations": {
+                name: {"count": int(count), "seconds": seconds}
+                for name, (count, seconds) in sorted(self.operations.items())
+            },
+            "bytes_emitted": self.bytes_emitted,
+        }
+
+    def update(self, other: dict[str, Any]) -> None:
+        """Merges statistics in the as_dict format, e.g. sent by another process."""
+        for phase, seconds in other["phases"].items():
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        for name, operation in other["operations"].items():
+            entry = self.operations.setdefault(name, [0, 0.0])
+            entry[0] += operation["count"]
+            entry[1] += operation["seconds"]
+        self.bytes_emitted += other["bytes_emitted"]
+
+    def report(self) -> str:
+        lines = [f"{'phase':<20}{'seconds':>12}"]
+        lines += [
+            f"{phase:<20}{seconds:>12.6f}" for phase, seconds in self.phases.items()
+        ]
+        lines.append("")
+        lines.append(f"{'operation':<20}{'count':>12}{'seconds':>12}{'us/op':>10}")
+        for name, (count, seconds) in sorted(
+            self.operations.items(), key=lambda item: -item[1][1]
+        ):
+            lines.append(
+                f"{name:<20}{int(count):>12}{seconds:>12.6f}"
+                f"{seconds / count * 1e6:>10.2f}"
+            )
+        lines.append("")
+        lines.append(f"bytes emitted: {self.bytes_emitted}")
+        return "\n".join(lines)
+
+
+def instrument(assembler: "Assembler") -> AssemblerStats:
+    """Wraps the assembler methods of every phase with timers.
+
+    Wrappers are set on the instance only, so assemblers created without
+    statistics run the plain class methods without any checks.
+    """
+    stats = AssemblerStats()
+    phases = stats.phases
+    parse_statement = assembler.parse_statement
+    locate_statement = assembler.locate_statement
+    encode_statement = assembler.encode_statement
+    iter_bytes = assembler.iter_bytes
+
+    def timed_parse_statement(line: str, line_number: int) -> Optional[Statement]:
+        started = perf_counter()
+        try:
+            return parse_statement(line, line_number)
+        finally:
+            phases["tokenize"] += perf_counter() - started
+
+    def timed_locate_statement(statement: Statement) -> None:
+        started = perf_counter()
+        try:
+            locate_statement(statement)
+        finally:
+            phases["map_labels"] += perf_counter() - started
+
+    def timed_encode_statement(statement: Statement) -> None:
+        started = perf_counter()
+        try:
+            encode_statement(statement)
+        finally:
+            elapsed = perf_counter() - started
+            phases["encode"] += elapsed
+            if statement.mnemonic is not None:
+                stats.add_operation(MNEMONIC_NAMES[statement.mnemonic], elapsed)
+
+    def timed_iter_bytes(
+        big_endian: bool = True, output_format: str = "obj"
+    ) -> Iterator[bytes | memoryview]:
+        chunks = iter_bytes(big_endian, output_format)
+        while True:
+            started = perf_counter()
+            chunk = next(chunks, None)
+            phases["serialize"] += perf_counter() - started
+            if chunk is None:
+                return
+            stats.bytes_emitted += len(chunk)
+            yield chunk
+
+    # Instance attributes take precedence over the class methods.
+    vars(assembler).update(
+        parse_statement=timed_parse_statement,
+        locate_statement=timed_locate_statement,
+        encode_statement=timed_encode_statement,
+        iter_bytes=timed_iter_bytes,
+    )
+    return stats
@@ -0,0 +1,125 @@
+from enum import Enum
+from typing import Iterable, Iterator, Optional, TextIO
+
+SYM_HEADER = (
+    "// Symbol table\n"
+    "// Scope level 0:\n"
+    "//\tSymbol Name       Page Address\n"
+    "//\t----------------  ------------\n"
+)
+SYM_ENTRY_PREFIX = "//\t"
+
+
+class SymbolKind(Enum):
+    CODE = "code"
+    DATA = "data"
+    # Read from a symbol file, what's at the address is unknown.
+    IMPORTED = "imported"
+
+
+class Symbol:
+    """Label with the address it stands for.
+
+    Attributes:
+        name: label without the colon.
+        address: memory address of the labeled statement.
+        kind: what the label is used for.
+        line: number of the defining source line, counted from 1; 0 if imported.
+    """
+
+    __slots__ = ("name", "address", "kind", "line")
+
+    def __init__(self, name: str, address: int, kind: SymbolKind, line: int = 0):
+        self.name = name
+        self.address = address
+        self.kind = kind
+        self.line = line
+
+    def __repr__(self) -> str:
+        return (
+            f"Symbol({self.name!r}, {self.address:#06x}, {self.kind.name}, "
+            f"line={self.line})"
+        )
+
+
+class SymbolTable:
+    """Labels of a program indexed both by name and by address.
+
+    Every definition and resolution is a single hash lookup. An address labeled
+    more than once is looked up as its first label.
+    """
+
+    def __init__(self) -> None:
+        self._by_name: dict[str, Symbol] = {}
+        self._by_address: dict[int, Symbol] = {}
+
+    def define(
+        self, name: str, address: int, kind: SymbolKind, line: int = 0
+    ) -> Symbol:
+        symbol = Symbol(name, address, kind, line)
+        defined = self._by_name.setdefault(name, symbol)
+        if defined is not symbol:
+            raise ValueError(
+                f"Label duplication: {name} at line {line}, "
+                f"first defined at line {defined.line}"
+            )
+        self._by_address.setdefault(address, symbol)
+        return symbol
+
+    def resolve(self, name: str) -> int:
+        """Address of the label, KeyError if it's not defined."""
+        return self._by_name[name].address
+
+    def get(self, name: str) -> Optional[Symbol]:
+        return self._by_name.get(name)
+
+    def at(self, address: int) -> Optional[Symbol]:
+        """First label defined for the address, None if it has no label."""
+        return self._by_address.get(address)
+
+    def addresses(self, kind: Optional[SymbolKind] = None) -> dict[str, int]:
+        """Names mapped to addresses, of given kind only if set."""
+        return {
+            name: symbol.address
+            for name, symbol in self._by_name.items()
+            if kind is None or symbol.kind == kind
+        }
+
+    def clear(self) -> None:
+        self._by_name.clear()
+        self._by_address.clear()
+
+    def __getitem__(self, name: str) -> Symbol:
+        return self._by_name[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __iter__(self) -> Iterator[Symbol]:
+        """Symbols in order of definition."""
+        return iter(self._by_name.values())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def write_sym(self, stream: TextIO) -> None:
+        """Writes the table in the .sym format of the LC-3 reference assembler."""
+        stream.write(SYM_HEADER)
+        stream.writelines(
+            f"{SYM_ENTRY_PREFIX}{symbol.name:<16}  {symbol.address:04X}\n"
+            for symbol in self
+        )
+
+    @classmethod
+    def read_sym(cls, lines: Iterable[str]) -> "SymbolTable":
+        """Loads symbols from lines in the .sym format, header lines are skipped."""
+        table = cls()
+        for line in lines:
+            if not line.startswith(SYM_ENTRY_PREFIX):
+                continue
+            fields = line[len(SYM_ENTRY_PREFIX) :].split()
+            if len(fields) != 2 or fields[0].startswith("-"):
+                continue  # column titles or their underline
+            name, address = fields
+            table.define(name, int(address, 16), SymbolKind.IMPORTED)
+        return table
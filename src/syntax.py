@@ -1,7 +1,8 @@
-import re
 from enum import Enum
 from typing import Literal
 
+from lexer import Token, TokenKind
+
 OperandsDirective = Literal[".STRINGZ", ".FILL", ".BLKW"]
 
 
@@ -10,15 +11,6 @@ class DirectiveArgCount(Enum):
     WITH_GOTO_LABEL = 3
 
 
-# ToDo[2]: works only for inline code
-def parse_instruction(line: str) -> list[str]:
-    line_without_comment = line.split(";")[0]
-    line_without_tabs = line_without_comment.replace("\t", "")
-
-    whitespace_split_exclude_double_quoted = r'\s+(?=(?:[^"]*"[^"]*")*[^"]*$)'
-    return re.split(whitespace_split_exclude_double_quoted, line_without_tabs)
-
-
 def cast_to_numeral(
     operand: str,
     allow_hexadecimal: bool = True,
@@ -48,31 +40,25 @@ def is_valid_goto_label(label: str) -> bool:
     return all(c.isalpha() or c.isdigit() or c == "_" for c in label)
 
 
-def is_numeral_base_prefixed(operand: str) -> bool:
-    return (
-        True
-        if operand.startswith("x") or operand.startswith("#") or operand.startswith("b")
-        else False
-    )
-
-
 def validate_directive_syntax(
-    instruction: list[str], directive_code: OperandsDirective
+    instruction: list[Token], directive_code: OperandsDirective
 ) -> DirectiveArgCount:
     if len(instruction) == DirectiveArgCount.WITHOUT_GOTO_LABEL.value:
-        if instruction[0] != directive_code:
+        if instruction[0].text != directive_code:
             raise SyntaxError(
                 f"'{directive_code}' has to be first argument in the instruction."
             )
         result = DirectiveArgCount.WITHOUT_GOTO_LABEL
     elif len(instruction) == DirectiveArgCount.WITH_GOTO_LABEL.value:
-        if instruction[1] != directive_code:
+        if instruction[1].text != directive_code:
             raise SyntaxError(
                 f"'{directive_code}' has to be second argument in the instruction."
             )
-        if not is_valid_goto_label(instruction[0]):
+        if instruction[0].kind != TokenKind.LABEL or not is_valid_goto_label(
+            instruction[0].text
+        ):
             raise TypeError(
-                f"Invalid label for {directive_code} directive: {instruction[0]}"
+                f"Invalid label for {directive_code} directive: {instruction[0].text}"
             )
         raise NotImplementedError("Processing label is not yet implemented.")
     else:
@@ -0,0 +1,160 @@
+import sys
+from array import array
+from typing import BinaryIO, Callable, Iterable, Iterator, NamedTuple
+
+from memory import Memory
+
+Chunks = Iterator[bytes | memoryview]
+# Words copied at once when they have to be converted, bounds the extra memory.
+CHUNK_WORDS = 1 << 12
+ZERO_WORDS = bytes(2 * CHUNK_WORDS)
+
+INTEL_HEX_RECORD_BYTES = 16
+INTEL_HEX_DATA, INTEL_HEX_END, INTEL_HEX_EXTENDED_LINEAR_ADDRESS = 0, 1, 4
+
+
+def iter_words(
+    memory: Memory, start: int, stop: int, fill_gaps: bool = True
+) -> Iterator[tuple[int, memoryview]]:
+    """Yields address and at most CHUNK_WORDS words of written memory in range.
+
+    fill_gaps: also yield zero words for unwritten addresses, so the chunks cover
+        the whole range.
+    """
+    address = start
+    for segment_start, words in memory.segments(start, stop):
+        if fill_gaps:
+            yield from iter_zeros(address, segment_start)
+        for offset in range(0, len(words), CHUNK_WORDS):
+            yield segment_start + offset, words[offset : offset + CHUNK_WORDS]
+        address = segment_start + len(words)
+    if fill_gaps:
+        yield from iter_zeros(address, stop)
+
+
+def iter_zeros(start: int, stop: int) -> Iterator[tuple[int, memoryview]]:
+    zeros = memoryview(ZERO_WORDS).cast("H")
+    for address in range(start, stop, CHUNK_WORDS):
+        yield address, zeros[: min(CHUNK_WORDS, stop - address)]
+
+
+def iter_object(
+    memory: Memory, start: int, stop: int, big_endian: bool = True
+) -> Chunks:
+    """LC-3 object: origin word followed by words of the range, gaps zero filled.
+
+    Words in native byte order are yielded as views of the memory without copying,
+    hence they're valid only until the memory is written again.
+    """
+    yield start.to_bytes(2, "big" if big_endian else "little")
+    swap = big_endian != (sys.byteorder == "big")
+    for _, words in iter_words(memory, start, stop):
+        if swap:
+            swapped = array("H", words)
+            swapped.byteswap()
+            yield memoryview(swapped).cast("B")
+        else:
+            yield words.cast("B")
+
+
+def iter_text(memory: Memory, start: int, stop: int, word_format: str) -> Chunks:
+    """Text dump: origin then every word of the range on its own line."""
+    yield f"{start:{word_format}}\n".encode()
+    for _, words in iter_words(memory, start, stop):
+        yield "".join([f"{word:{word_format}}\n" for word in words]).encode()
+
+
+def iter_hexadecimal(
+    memory: Memory, start: int, stop: int, big_endian: bool = True
+) -> Chunks:
+    return iter_text(memory, start, stop, "04X")
+
+
+def iter_binary(
+    memory: Memory, start: int, stop: int, big_endian: bool = True
+) -> Chunks:
+    return iter_text(memory, start, stop, "016b")
+
+
+def intel_hex_record(record_type: int, address: int, data: bytes = b"") -> str:
+    record = bytes((len(data), address >> 8, address & 0xFF, record_type)) + data
+    checksum = -sum(record) & 0xFF
+    return f":{record.hex().upper()}{checksum:02X}\n"
+
+
+def iter_intel_hex(
+    memory: Memory, start: int, stop: int, big_endian: bool = True
+) -> Chunks:
+    """Intel HEX records of written words only, every segment at its own address.
+
+    Word addresses are doubled to byte addresses, words are stored big-endian.
+    Addresses above 64 KiB are set by extended linear address records.
+    """
+    upper = 0
+    for address, words in iter_words(memory, start, stop, fill_gaps=False):
+        data = array("H", words)
+        if sys.byteorder != "big":
+            data.byteswap()
+        chunk = data.tobytes()
+        records = []
+        byte_address = 2 * address
+        offset = 0
+        while offset < len(chunk):
+            if byte_address >> 16 != upper:
+                upper = byte_address >> 16
+                records.append(
+                    intel_hex_record(
+                        INTEL_HEX_EXTENDED_LINEAR_ADDRESS, 0, upper.to_bytes(2, "big")
+                    )
+                )
+            # Records never cross a 64 KiB boundary.
+            size = min(
+                INTEL_HEX_RECORD_BYTES,
+                len(chunk) - offset,
+                0x10000 - (byte_address & 0xFFFF),
+            )
+            records.append(
+                intel_hex_record(
+                    INTEL_HEX_DATA,
+                    byte_address & 0xFFFF,
+                    chunk[offset : offset + size],
+                )
+            )
+            offset += size
+            byte_address += size
+        yield "".join(records).encode()
+    yield intel_hex_record(INTEL_HEX_END, 0).encode()
+
+
+def read_object(data: bytes, big_endian: bool = True) -> tuple[Memory, int, int]:
+    """Loads an LC-3 object, returns memory with its words and their range."""
+    start = int.from_bytes(data[:2], "big" if big_endian else "little")
+    words = array("H")
+    words.frombytes(data[2:])
+    if big_endian != (sys.byteorder == "big"):
+        words.byteswap()
+    memory = Memory()
+    memory.write_words(start, words)
+    return memory, start, start + len(words)
+
+
+class OutputFormat(NamedTuple):
+    suffix: str
+    chunks: Callable[[Memory, int, int, bool], Chunks]
+
+
+OUTPUT_FORMATS = {
+    "obj": OutputFormat(".obj", iter_object),
+    "hex": OutputFormat(".hex", iter_hexadecimal),
+    "bin": OutputFormat(".bin", iter_binary),
+    "ihex": OutputFormat(".ihx", iter_intel_hex),
+}
+
+
+def write_chunks(stream: BinaryIO, chunks: Iterable[bytes | memoryview]) -> int:
+    """Writes chunks as they're produced, returns count of bytes written."""
+    written = 0
+    for chunk in chunks:
+        stream.write(chunk)
+        written += len(chunk)
+    return written
@@ -0,0 +1,62 @@
+import pytest
+
+from batch import BatchOptions, assemble_batch, main
+
+VALID_SOURCE = ".ORIG x3000\nADD R0, R1, R2\n.END\n"
+INVALID_SOURCE = ".ORIG x3000\nADD R0, R1\n.END\n"
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = []
+    for index in range(4):
+        path = tmp_path / f"program{index}.asm"
+        path.write_text(INVALID_SOURCE if index == 2 else VALID_SOURCE)
+        paths.append(str(path))
+    return paths
+
+
+class TestAssembleBatch:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_bad_file_does_not_abort_batch(self, sources, tmp_path, workers):
+        output_dir = tmp_path / "out"
+
+        results = list(
+            assemble_batch(sources, BatchOptions(output_dir=str(output_dir)), workers)
+        )
+
+        assert sorted(result.source for result in results) == sorted(sources)
+        failed = [result for result in results if not result.ok]
+        assert [result.source for result in failed] == [sources[2]]
+        assert failed[0].error.startswith("IndexError")
+        assert sorted(path.name for path in output_dir.iterdir()) == [
+            "program0.obj",
+            "program1.obj",
+            "program3.obj",
+        ]
+        assert (output_dir / "program0.obj").read_bytes() == b"\x30\x00\x10\x42"
+
+    def test_cli_reports_failures_with_exit_code(self, sources, capsys):
+        exit_code = main([*sources, "-j", "1"])
+
+        assert exit_code == 1
+        stderr = capsys.readouterr().err
+        assert f"{sources[2]}: IndexError" in stderr
+        assert "4 files (1 failed, 0 cached)" in stderr
+
+    def test_cached_objects_are_reused(self, tmp_path):
+        sources = []
+        for index in range(3):
+            path = tmp_path / f"cached{index}.asm"
+            path.write_text(f".ORIG x3000\nADD R{index}, R1, R2\n.END\n")
+            sources.append(str(path))
+        cache_dir = str(tmp_path / "cache")
+
+        options = BatchOptions(cache_dir=cache_dir)
+
+        first = list(assemble_batch(sources, options, workers=1))
+        second = list(assemble_batch(sources, options, workers=1))
+
+        assert [result.cached for result in first] == [False] * 3
+        assert [result.cached for result in second] == [True] * 3
+        assert [result.words for result in second] == [2] * 3
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from cache import AssemblyCache, CachedAssembly, assemble_cached
+
+SOURCE = ".ORIG x3000\nADD R0, R1, R2\nDATA: .FILL x5\n.END\n"
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "program.asm"
+    path.write_text(SOURCE)
+    return str(path)
+
+
+class TestAssemblyCache:
+    def test_hit_returns_stored_object_and_symbols(self, source_file, tmp_path):
+        cache = AssemblyCache(str(tmp_path / "cache"))
+
+        first = assemble_cached(source_file, cache)
+        second = assemble_cached(source_file, cache)
+
+        assert (
+            first
+            == second
+            == CachedAssembly(b"\x30\x00\x10\x42\x00\x05", {"DATA": 0x3001})
+        )
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_key_depends_on_options(self):
+        source = SOURCE.encode()
+
+        assert AssemblyCache.key(source, big_endian=True) != AssemblyCache.key(
+            source, big_endian=False
+        )
+
+    def test_same_source_in_other_directory_includes_its_own_files(self, tmp_path):
+        cache = AssemblyCache(str(tmp_path / "cache"))
+        objects = []
+        for name, value in [("a", 1), ("b", 2)]:
+            directory = tmp_path / name
+            directory.mkdir()
+            (directory / "lib.asm").write_text(f"ADD R0, R0, #{value}\n")
+            path = directory / "program.asm"
+            path.write_text('.ORIG x3000\n.INCLUDE "lib.asm"\n.END\n')
+            objects.append(assemble_cached(str(path), cache).object_bytes)
+
+        assert objects == [b"\x30\x00\x10\x21", b"\x30\x00\x10\x22"]
+        assert cache.hits == 0
+
+    def test_directory_is_scanned_once_while_under_size_cap(self, tmp_path):
+        cache = AssemblyCache(str(tmp_path / "cache"))
+        scans = []
+        evict = cache.evict
+        cache.evict = lambda: scans.append(evict())
+
+        for key in "abcdefgh":
+            cache.put(key, CachedAssembly(bytes(40), {}))
+
+        assert len(scans) == 1
+
+    def test_least_recently_used_entry_is_evicted(self, tmp_path):
+        cache = AssemblyCache(str(tmp_path / "cache"), max_bytes=160)
+        entry = CachedAssembly(bytes(40), {})
+        for index, key in enumerate(["a", "b"]):
+            cache.put(key, entry)
+            os.utime(cache.directory / f"{key}.entry", (index, index))
+        assert cache.get("a") is not None  # refreshes 'a', leaving 'b' the oldest
+
+        cache.put("c", entry)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
@@ -0,0 +1,64 @@
+import pytest
+
+from assembler import Assembler
+
+np = pytest.importorskip("numpy")
+
+SOURCE = """.ORIG x3000
+ADD R0, R1, R2
+ADD R0, R1, #-16
+AND R3, R0, #15
+DATA: .FILL x1234
+NOT R2, R1
+JMP R2
+JSRR R7
+RET
+BLOCK: .BLKW #2
+LDR R2, R1, #-32
+STR R2, R1, x1F
+TEXT: .STRINGZ "Hi"
+LD R0, DATA
+BRnp BLOCK
+POINTER: .FILL TEXT
+.END
+"""
+
+
+def assemble(lines, columnar, collect_errors=False):
+    assembler = Assembler(collect_errors=collect_errors, columnar=columnar)
+    assembler.encode_program(assembler.parse_program(lines))
+    return assembler
+
+
+class TestColumnarEncoding:
+    def test_same_image_as_scalar_path(self):
+        lines = SOURCE.splitlines()
+
+        scalar, columnar = assemble(lines, False), assemble(lines, True)
+
+        assert columnar.to_bytes() == scalar.to_bytes()
+        assert columnar.program_counter == scalar.program_counter
+
+    @pytest.mark.parametrize(
+        "operation", ["ADD R0, R1, #16", "AND R0, R1, #-17", "LDR R0, R1, #32"]
+    )
+    def test_out_of_range_numeral_raises(self, operation):
+        with pytest.raises(ValueError, match="out of range"):
+            assemble([".ORIG x3000", "ADD R0, R0, R0", operation, ".END"], True)
+
+    def test_diagnostics_match_scalar_path(self):
+        lines = [
+            ".ORIG x3000",
+            "ADD R0, R1, #99",
+            "NOT R1, R2",
+            "AND R0, #1, R2",
+            "LOOP ADD R1, R1, #1",
+            ".END",
+            "ADD R0, R1, R2",
+        ]
+
+        scalar = assemble(lines, False, collect_errors=True)
+        columnar = assemble(lines, True, collect_errors=True)
+
+        assert columnar.diagnostics == scalar.diagnostics
+        assert [diagnostic.line for diagnostic in columnar.diagnostics] == [2, 4, 5, 7]
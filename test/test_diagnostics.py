@@ -0,0 +1,108 @@
+import pytest
+
+from assembler import Assembler
+from batch import main
+from diagnostics import Diagnostic, Severity
+
+SOURCE = """.ORIG x3000
+ADD R0, R1, R2
+ADD R0, #1, R2
+.STRINGZ "unterminated
+NOT R1
+.FILL R3
+AND R3, R0, #14
+.END
+"""
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "program.asm"
+    path.write_text(SOURCE)
+    return str(path)
+
+
+class TestCollectErrors:
+    def test_fail_fast_by_default(self, source_file):
+        with pytest.raises(SyntaxError, match="Unterminated string"):
+            Assembler().assemble(source_file)
+
+    def test_all_errors_are_reported(self, source_file):
+        assembler = Assembler(collect_errors=True)
+
+        assembler.assemble(source_file)
+
+        assert [
+            (diagnostic.line, diagnostic.column, diagnostic.error)
+            for diagnostic in assembler.diagnostics
+        ] == [
+            (3, 9, "TypeError"),
+            (4, 10, "SyntaxError"),
+            (5, 1, "IndexError"),
+            (6, 7, "SyntaxError"),
+        ]
+        assert all(d.severity == Severity.ERROR for d in assembler.diagnostics)
+
+    def test_encoding_recovers_at_next_line(self, source_file):
+        assembler = Assembler(collect_errors=True)
+
+        assembler.assemble(source_file)
+
+        # AND is located after 4 words: ADD, failed ADD, failed NOT, failed .FILL
+        assert assembler.memory[0x3004] == 0x562E
+
+    @pytest.mark.parametrize("one_pass", [False, True])
+    def test_statement_with_bad_label_keeps_its_words(self, tmp_path, one_pass):
+        path = tmp_path / "labels.asm"
+        path.write_text(
+            '.ORIG x3000\nA: ADD R0, R0, #1\nA: .STRINGZ "ab"\nB: ADD R0, R0, #3\n'
+            ".END\n"
+        )
+        assembler = Assembler(collect_errors=True, one_pass=one_pass)
+
+        assembler.assemble(str(path))
+
+        assert [diagnostic.line for diagnostic in assembler.diagnostics] == [3]
+        assert assembler.labels_addresses == {"A": 0x3000, "B": 0x3004}
+        assert assembler.index.on(4).address == 0x3004
+
+    def test_unknown_instruction_and_fill_out_of_range_are_reported(self):
+        lines = [".ORIG x3000", "ADDD R1, R1, R1", ".FILL #70000", "NOT R1, R1", ".END"]
+        assembler = Assembler(collect_errors=True)
+
+        assembler.encode_program(assembler.parse_program(lines))
+
+        assert [
+            (diagnostic.line, diagnostic.column, diagnostic.error)
+            for diagnostic in assembler.diagnostics
+        ] == [(2, 1, "SyntaxError"), (3, 7, "ValueError")]
+        assert "Unknown instruction 'ADDD'" in assembler.diagnostics[0].message
+        assert "out of range [-32768, 65535]" in assembler.diagnostics[1].message
+
+    @pytest.mark.parametrize("one_pass", [False, True])
+    def test_diagnostics_are_sorted_without_assemble(self, one_pass):
+        # The label is refused while locating, the NOT while encoding.
+        lines = [".ORIG x3000", "NOT R1, #2", "A: ADD R0, R0, #1", "A: RET", ".END"]
+        assembler = Assembler(collect_errors=True, one_pass=one_pass)
+
+        if one_pass:
+            assembler.assemble_one_pass(lines)
+        else:
+            assembler.encode_program(assembler.parse_program(lines))
+
+        assert [diagnostic.line for diagnostic in assembler.diagnostics] == [2, 4]
+
+    def test_cli_prints_every_diagnostic(self, source_file, capsys):
+        assert main([source_file, "-j", "1", "--all-errors"]) == 1
+
+        stderr = capsys.readouterr().err
+        assert f"{source_file}:3:9: error: TypeError: " in stderr
+        assert f"{source_file}:6:7: error: SyntaxError: " in stderr
+        assert "\n    ADD R0, #1, R2\n            ^\n" in stderr
+
+    def test_format_marks_column_keeping_tabs(self):
+        diagnostic = Diagnostic(Severity.ERROR, 2, 6, "Oops.", "TypeError")
+
+        assert diagnostic.format("a.asm", "\tADD #1") == (
+            "a.asm:2:6: error: TypeError: Oops.\n    \tADD #1\n    \t    ^"
+        )
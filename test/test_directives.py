@@ -93,7 +93,6 @@ class TestStringWithZero:
         expected = "Hello, World!".encode("utf-16-be") + b"\x00\x00"
         assert assembler.to_bytes().hex()[4:] == expected.hex()
 
-    @pytest.mark.skip(reason="Improve regex")
     @pytest.mark.parametrize("arg", ["#4000", 'Hello!"', '"Hello!', '"Hello!""'])
     def test_stringz_invalid_argument_raises(self, arg):
         assembler = Assembler()
@@ -0,0 +1,121 @@
+import pytest
+
+from assembler import Assembler
+from disassembler import Disassembler, decode_table, verify_roundtrip
+from symbols import SymbolKind, SymbolTable
+
+SOURCE = """.ORIG x3000
+START: AND R1, R1, #0
+LD R2, COUNT
+LOOP: ADD R1, R1, R2
+ADD R2, R2, #-1
+BRp LOOP
+ST R1, RESULT
+JSR DONE
+NOT R3, R1
+LEA R0, TEXT
+LDR R4, R0, #-2
+STR R4, R6, #31
+JSRR R5
+DONE: RET
+COUNT: .FILL #100
+POINTER: .FILL LOOP
+RESULT: .BLKW #2
+TEXT: .STRINGZ "hi"
+.END
+"""
+
+
+@pytest.fixture
+def program(tmp_path):
+    path = tmp_path / "program.asm"
+    path.write_text(SOURCE)
+    assembler = Assembler()
+    assembler.assemble(str(path))
+    return path, assembler
+
+
+class TestDisassembler:
+    @pytest.mark.parametrize(
+        "word, expected",
+        [
+            (0x1261, "ADD R1, R1, #1"),
+            (0x127F, "ADD R1, R1, #-1"),
+            (0x5042, "AND R0, R1, R2"),
+            (0x0BFD, "BRnp #-3"),
+            (0x0FFF, "BRnzp #-1"),
+            (0xC1C0, "RET"),
+            (0xC080, "JMP R2"),
+            (0x4080, "JSRR R2"),
+            (0x4FFF, "JSR #-1"),
+            (0x903F, "NOT R0, R0"),
+            (0xE5FF, "LEA R2, #-1"),
+            (0x0000, ".FILL x0000"),  # branch testing no flags
+            (0x1058, ".FILL x1058"),  # bits between registers set
+            (0xF025, ".FILL xF025"),
+        ],
+    )
+    def test_single_word(self, word, expected):
+        assert Disassembler().instruction(word, 0x3000) == expected
+
+    def test_offsets_to_labels_are_named(self):
+        symbols = SymbolTable()
+        symbols.define("LOOP", 0x2FFE, SymbolKind.CODE)
+
+        assert Disassembler(symbols).instruction(0x0BFD, 0x3000) == "BRnp LOOP"
+
+    def test_every_instruction_word_is_decoded(self):
+        table = decode_table()
+
+        assert len(table) == 1 << 16
+        assert table is decode_table()
+        assert table[0x3000].mnemonic == "ST"
+
+    def test_disassembled_program_assembles_to_same_image(self, program, tmp_path):
+        _, assembler = program
+        disassembled = tmp_path / "disassembled.asm"
+        lines = Disassembler(assembler.symbols).disassemble(assembler.to_bytes())
+        disassembled.write_text("\n".join(lines))
+
+        reassembled = Assembler()
+        reassembled.assemble(str(disassembled))
+
+        assert reassembled.to_bytes() == assembler.to_bytes()
+        assert "BRp LOOP" in disassembled.read_text()
+
+
+class TestVerifyRoundtrip:
+    def test_image_of_source_matches(self, program):
+        path, assembler = program
+
+        assert verify_roundtrip(str(path), assembler.to_bytes()) == []
+
+    @pytest.mark.parametrize(
+        "address, word, line, source, disassembled",
+        [
+            (0x3002, 0x1262, 4, "ADD R1, R1, R2", "ADD R1, R1, #2"),
+            (0x3004, 0x03FE, 6, "BRp LOOP", "BRp #-2"),
+            (0x3009, 0x6A3E, 11, "LDR R4, R0, #-2", "LDR R5, R0, #-2"),
+            (0x300E, 0x0000, 16, ".FILL LOOP", ".FILL x0000"),
+            (0x3012, 0x006A, 18, '.STRINGZ "hi"', ".FILL x006A"),
+        ],
+    )
+    def test_differing_words_are_reported(
+        self, program, address, word, line, source, disassembled
+    ):
+        path, assembler = program
+        assembler.memory[address] = word
+
+        mismatches = verify_roundtrip(str(path), assembler.to_bytes())
+
+        assert [tuple(mismatch) for mismatch in mismatches] == [
+            (address, line, source, disassembled)
+        ]
+
+    def test_aliases_match_words_decoded_otherwise(self, tmp_path):
+        path = tmp_path / "alias.asm"
+        path.write_text(".ORIG x3000\nJMP R7\nBR NEXT\nNEXT: BRnzp NEXT\n.END\n")
+        assembler = Assembler()
+        assembler.assemble(str(path))
+
+        assert verify_roundtrip(str(path), assembler.to_bytes()) == []
@@ -0,0 +1,157 @@
+import pytest
+
+from assembler import Assembler
+
+SOURCE = """.ORIG x3000
+LOOP: ADD R0, R0, #-1
+BRp LOOP
+LD R1, VALUE
+LEA R2, TEXT
+JSR DONE
+STI R1, POINTER
+BRnzp LOOP
+VALUE: .FILL x1234
+POINTER: .FILL VALUE
+TEXT: .STRINGZ "Hi"
+DONE: RET
+.END
+"""
+
+EXPECTED = [
+    0x3000,
+    0x103F,  # ADD R0, R0, #-1
+    0x03FE,  # BRp LOOP: -2
+    0x2204,  # LD R1, VALUE: +4
+    0xE405,  # LEA R2, TEXT: +5
+    0x4807,  # JSR DONE: +7
+    0xB202,  # STI R1, POINTER: +2
+    0x0FF9,  # BRnzp LOOP: -7
+    0x1234,
+    0x3007,  # POINTER: .FILL VALUE
+    ord("H"),
+    ord("i"),
+    0,
+    0xC1C0,
+]
+
+
+def assemble(tmp_path, source, **options):
+    path = tmp_path / "program.asm"
+    path.write_text(source)
+    assembler = Assembler(**options)
+    assembler.assemble(str(path))
+    return assembler
+
+
+def words(assembler):
+    data = assembler.to_bytes()
+    return [int.from_bytes(data[i : i + 2], "big") for i in range(0, len(data), 2)]
+
+
+@pytest.mark.parametrize("one_pass", [False, True])
+class TestLabelReferences:
+    def test_backward_and_forward_references(self, tmp_path, one_pass):
+        assembler = assemble(tmp_path, SOURCE, one_pass=one_pass)
+
+        assert words(assembler) == EXPECTED
+        assert assembler.fixups == {}
+
+    @pytest.mark.parametrize(
+        "operation, width, lowest, highest",
+        [("BRz", 9, -256, 255), ("JSR", 11, -1024, 1023)],
+    )
+    def test_offset_out_of_range_reports_referencing_line(
+        self, tmp_path, one_pass, operation, width, lowest, highest
+    ):
+        source = "\n".join(
+            [
+                ".ORIG x3000",
+                f"{operation} FAR",
+                f".BLKW #{highest + 1}",
+                "FAR: RET",
+                ".END",
+            ]
+        )
+
+        with pytest.raises(
+            ValueError,
+            match=rf"PCoffset{width} to FAR is {highest + 1}, out of range "
+            rf"\[{lowest}, {highest}\] at line 2, column {len(operation) + 2}",
+        ):
+            assemble(tmp_path, source, one_pass=one_pass)
+
+    def test_offset_at_range_limit(self, tmp_path, one_pass):
+        source = "\n".join(
+            [".ORIG x3000", "BACK: .BLKW #255", "BRz BACK", "BRz FAR", ".BLKW #255"]
+            + ["FAR: RET", ".END"]
+        )
+
+        assembler = assemble(tmp_path, source, one_pass=one_pass)
+
+        assert words(assembler)[256:258] == [0x0500, 0x04FF]
+
+    def test_undefined_label_raises(self, tmp_path, one_pass):
+        source = ".ORIG x3000\nLD R0, MISSING\n.END"
+
+        with pytest.raises(NameError, match="Undefined label MISSING at line 2"):
+            assemble(tmp_path, source, one_pass=one_pass)
+
+    def test_collected_errors_are_at_referencing_lines(self, tmp_path, one_pass):
+        source = "\n".join(
+            [
+                ".ORIG x3000",
+                "LD R0, MISSING",
+                "BR FAR",
+                "ADD R0, R0, #99",
+                ".BLKW #300",
+                "FAR: RET",
+                ".END",
+            ]
+        )
+
+        assembler = assemble(tmp_path, source, one_pass=one_pass, collect_errors=True)
+
+        assert [
+            (diagnostic.line, diagnostic.column, diagnostic.error)
+            for diagnostic in assembler.diagnostics
+        ] == [(2, 8, "NameError"), (3, 4, "ValueError"), (4, 13, "ValueError")]
+
+
+class TestOnePass:
+    def test_same_image_and_symbols_as_two_passes(self, tmp_path):
+        two_passes = assemble(tmp_path, SOURCE)
+        one_pass = assemble(tmp_path, SOURCE, one_pass=True)
+
+        assert one_pass.to_bytes() == two_passes.to_bytes()
+        assert one_pass.labels_addresses == two_passes.labels_addresses
+        assert one_pass.program_counter == two_passes.program_counter
+
+    def test_forward_reference_is_patched_when_label_is_defined(self):
+        assembler = Assembler(one_pass=True)
+
+        def lines():
+            yield ".ORIG x3000"
+            yield "BR NEXT"
+            yield "ADD R0, R0, #1"
+            assert assembler.memory[0x3000] == 0x0E00
+            assert [fixup.address for fixup in assembler.fixups["NEXT"]] == [0x3000]
+            yield "NEXT: RET"
+
+        assembler.assemble_one_pass(lines())
+
+        assert assembler.memory[0x3000] == 0x0E01
+        assert assembler.fixups == {}
+
+    def test_source_is_read_once(self, tmp_path, monkeypatch):
+        assembler = Assembler(one_pass=True)
+        monkeypatch.setattr(
+            assembler,
+            "map_symbolic_names",
+            lambda filepath: pytest.fail("source read by the first pass"),
+        )
+        path = tmp_path / "program.asm"
+        path.write_text(SOURCE)
+
+        assembler.assemble(str(path))
+
+        assert words(assembler) == EXPECTED
@@ -0,0 +1,117 @@
+import random
+from itertools import count
+
+import pytest
+
+from assembler import Assembler
+from incremental import IncrementalAssembler
+
+BODY = [
+    "ADD R0, R1, R2",
+    "AND R3, R0, #14",
+    "NOT R2, R1",
+    "LDR R2, R1, #5",
+    "STR R2, R1, #5",
+    "JMP R2",
+    "DATA: .FILL x1234",
+    "BUFFER: .BLKW #3",
+    'TEXT: .STRINGZ "Hi!"',
+    "",
+    "; comment",
+]
+# Refer to labels defined by render, before and after the body.
+REFERENCES = [
+    "BRz START",
+    "LD R1, START",
+    "LEA R2, FINISH",
+    "JSR FINISH",
+    "STI R3, FINISH",
+    "POINTER: .FILL START",
+]
+
+
+def full_rebuild(source, tmp_path):
+    path = tmp_path / "program.asm"
+    path.write_text(source)
+    assembler = Assembler()
+    assembler.assemble(str(path))
+    return assembler.to_bytes()
+
+
+def unique_labels(lines, numbers):
+    """Appends a number to every label, labels can't be defined twice."""
+    labeled = []
+    for line in lines:
+        label, colon, rest = line.partition(":")
+        labeled.append(f"{label}_{next(numbers)}:{rest}" if colon else line)
+    return labeled
+
+
+def render(body):
+    return "\n".join(
+        [".ORIG x3000", "START: AND R0, R0, #0", *body, "FINISH: RET", ".END"]
+    )
+
+
+class TestIncrementalAssembler:
+    def test_single_changed_line_is_reencoded(self):
+        statements = [line for line in BODY if line and not line.startswith(";")]
+        body = unique_labels(statements * 20, count())
+        incremental = IncrementalAssembler()
+        incremental.assemble(render(body))
+
+        body[25] = "ADD R7, R7, #1"
+        incremental.assemble(render(body))
+
+        # .ORIG and .END are encoded on every run
+        assert incremental.reencoded == 3
+        # all but the changed line, START and FINISH lines included
+        assert incremental.reused == len(body) + 1
+
+    def test_branches_moved_with_their_labels_are_reused(self):
+        block = [f"BRnzp LOOP_{index}" for index in range(50)] + [
+            f"LOOP_{index}: ADD R0, R0, #1" for index in range(50)
+        ]
+        incremental = IncrementalAssembler()
+        incremental.assemble(render(["BRz START", *block]))
+
+        incremental.assemble(render(["ADD R1, R1, #1", "BRz START", *block]))
+
+        # .ORIG, .END, the new line and the branch back to the unmoved START
+        assert incremental.reencoded == 4
+        assert incremental.reused == len(block) + 2
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_random_edits_match_full_rebuild(self, tmp_path, seed):
+        random.seed(seed)
+        numbers = count()
+        lines = BODY + REFERENCES
+        body = unique_labels(random.choices(lines, k=60), numbers)
+        incremental = IncrementalAssembler()
+
+        for _ in range(20):
+            position = random.randrange(len(body))
+            edit = random.choice(["insert", "delete", "replace"])
+            if edit == "insert":
+                body.insert(position, unique_labels([random.choice(lines)], numbers)[0])
+            elif edit == "delete":
+                del body[position]
+            else:
+                body[position] = unique_labels([random.choice(lines)], numbers)[0]
+            source = render(body)
+
+            assembler = incremental.assemble(source)
+
+            assert assembler.to_bytes() == full_rebuild(source, tmp_path)
+
+    def test_failed_run_falls_back_to_full_rebuild(self, tmp_path):
+        incremental = IncrementalAssembler()
+        incremental.assemble(render(BODY))
+        with pytest.raises(IndexError):
+            incremental.assemble(render([*BODY, "ADD R0"]))
+
+        source = render(BODY[::-1])
+        assembler = incremental.assemble(source)
+
+        assert incremental.reused == 0
+        assert assembler.to_bytes() == full_rebuild(source, tmp_path)
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from lc3asm import main
+
+SOURCE = """.ORIG x3000
+START: ADD R0, R0, #1
+BR START
+.END
+"""
+SRC = Path(__file__).resolve().parent.parent / "src"
+# Microseconds the assembler may spend importing on top of interpreter startup, it
+# takes about half of it. Subsystems loaded eagerly are caught by LAZY_MODULES.
+IMPORT_BUDGET_US = 150_000
+# Subsystems a plain assembly doesn't use.
+LAZY_MODULES = {"numpy", "columnar", "asyncio", "linker", "simulator", "server"}
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "program.asm"
+    path.write_text(SOURCE)
+    return path
+
+
+def imported_modules(*arguments: str) -> dict[str, int]:
+    """Self import time in microseconds of every module a Python run loads."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(SRC), "PYTHONDONTWRITEBYTECODE": "1"},
+        check=True,
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(self_time)
+    return modules
+
+
+class TestCommandLine:
+    def test_writes_object_next_to_source(self, source):
+        assert main([str(source)]) == 0
+
+        assert source.with_suffix(".obj").read_bytes() == b"\x30\x00\x10\x21\x0f\xfe"
+
+    def test_output_options(self, source, tmp_path):
+        output = tmp_path / "out.hex"
+
+        assert main([str(source), "-o", str(output), "-f", "hex", "--sym"]) == 0
+
+        assert output.read_text() == "3000\n1021\n0FFE\n"
+        assert "START" in output.with_suffix(".sym").read_text()
+
+    def test_many_sources_go_to_output_directory(self, source, tmp_path):
+        other = tmp_path / "other.asm"
+        other.write_text(SOURCE)
+        output = tmp_path / "build"
+
+        assert (
+            main([str(source), str(other), "-o", str(output), "--little-endian"]) == 0
+        )
+
+        assert (output / "other.obj").read_bytes() == b"\x00\x30\x21\x10\xfe\x0f"
+
+    def test_listing_next_to_output(self, source):
+        assert main([str(source), "--listing"]) == 0
+
+        listing = source.with_suffix(".lst").read_text().splitlines()
+        assert listing[-2:] == [
+            "  3001  0FFE      3  BR START",
+            "                  4  .END",
+        ]
+
+    def test_errors_are_reported(self, tmp_path, capsys):
+        path = tmp_path / "broken.asm"
+        path.write_text(".ORIG x3000\nNOT R1, #2\nADD R0\n.END\n")
+
+        assert main([str(path), "--all-errors"]) == 1
+
+        stderr = capsys.readouterr().err
+        assert f"{path}:2:9: error: TypeError" in stderr
+        assert f"{path}:3:" in stderr
+        assert not path.with_suffix(".obj").exists()
+
+
+def test_cold_start_fits_import_budget(source, tmp_path):
+    startup = imported_modules("-c", "pass")
+    runs = [
+        imported_modules(str(SRC / "lc3asm.py"), str(source), "-o", str(tmp_path / "a"))
+        for _ in range(3)
+    ]
+
+    assert not LAZY_MODULES & runs[0].keys()
+    assert "assembler" in runs[0]
+    spent = min(
+        sum(time for name, time in modules.items() if name not in startup)
+        for modules in runs
+    )
+    assert spent < IMPORT_BUDGET_US
@@ -0,0 +1,73 @@
+import pytest
+
+from lexer import Token, TokenKind, classification_cache_info, classify, tokenize
+
+
+class TestTokenize:
+    def test_operation_with_positions(self):
+        tokens = tokenize("LOOP: ADD R0, R1, #-5 ; decrement", line_number=7)
+
+        assert tokens == [
+            Token(TokenKind.LABEL, "LOOP:", 7, 1),
+            Token(TokenKind.MNEMONIC, "ADD", 7, 7),
+            Token(TokenKind.REGISTER, "R0", 7, 11),
+            Token(TokenKind.COMMA, ",", 7, 13),
+            Token(TokenKind.REGISTER, "R1", 7, 15),
+            Token(TokenKind.COMMA, ",", 7, 17),
+            Token(TokenKind.NUMERAL, "#-5", 7, 19),
+        ]
+
+    @pytest.mark.parametrize("line", ["", "   \t\n", "; only comment"])
+    def test_blank_line_has_no_tokens(self, line):
+        assert tokenize(line) == []
+
+    def test_string_keeps_whitespace_and_separators(self):
+        tokens = tokenize('.STRINGZ "Hello;, World!"')
+
+        assert [token.kind for token in tokens] == [
+            TokenKind.MNEMONIC,
+            TokenKind.STRING,
+        ]
+        assert tokens[1].text == '"Hello;, World!"'
+
+    @pytest.mark.parametrize(
+        "word, kind",
+        [
+            ("x3000", TokenKind.NUMERAL),
+            ("b0101", TokenKind.NUMERAL),
+            ("#12", TokenKind.NUMERAL),
+            ("xyz", TokenKind.LABEL),
+            ("b2", TokenKind.LABEL),
+            ("155", TokenKind.LABEL),
+            ("R7", TokenKind.REGISTER),
+            (".FILL", TokenKind.MNEMONIC),
+        ],
+    )
+    def test_word_classification(self, word, kind):
+        assert tokenize(word)[0].kind == kind
+
+    def test_unterminated_string_reports_column(self):
+        with pytest.raises(SyntaxError, match="column 10"):
+            tokenize('.STRINGZ "Hello')
+
+    @pytest.mark.parametrize(
+        "word, value",
+        [("x-1F", -31), ("b0101", 5), ("#12", 12), ("#x1", None), ("R7", 7)],
+    )
+    def test_operand_values_are_parsed_once(self, word, value):
+        assert tokenize(word)[0].value == value
+
+    def test_repeated_words_share_interned_text(self):
+        first, second = tokenize("ADD R1, R1, #1"), tokenize("AND R1, R1, #1")
+
+        assert first[1].text is second[3].text
+        assert first[5].text is second[5].text
+
+    def test_classification_cache_info(self):
+        classify.cache_clear()
+        tokenize("ADD R0, R0, #1")
+        tokenize("ADD R0, R0, #1")
+
+        info = classification_cache_info()
+        assert (info["hits"], info["misses"], info["size"]) == (5, 3, 3)
+        assert info["hit_rate"] == 5 / 8
@@ -0,0 +1,142 @@
+import pytest
+
+from assembler import Assembler
+from batch import main as batch_main
+from linker import link
+from linker import main as link_main
+from relocatable import ObjectModule, load_module
+
+MAIN = """.ORIG x3000
+START: LEA R0, MESSAGE
+JSR PRINT
+LD R1, POINTER
+BR START
+POINTER: .FILL MESSAGE
+MESSAGE: .STRINGZ "hi"
+.END
+"""
+
+LIBRARY = """.ORIG x4000
+PRINT: LDR R2, R0, #0
+ST R2, BUFFER
+LD R3, TABLE
+RET
+TABLE: .FILL BUFFER
+BUFFER: .BLKW #1
+.END
+"""
+
+
+def module(source, tmp_path, name):
+    path = tmp_path / name
+    path.write_text(source)
+    assembler = Assembler(relocatable=True)
+    assembler.assemble(str(path))
+    return ObjectModule.from_assembler(assembler, str(path))
+
+
+def combined(tmp_path):
+    """Both sources in a single program, as the linker should place them."""
+    path = tmp_path / "combined.asm"
+    body = MAIN.splitlines()[1:-1] + LIBRARY.splitlines()[1:-1]
+    path.write_text("\n".join([".ORIG x3000", *body, ".END"]))
+    assembler = Assembler()
+    assembler.assemble(str(path))
+    return assembler
+
+
+class TestObjectModule:
+    def test_records_exports_imports_and_relocations(self, tmp_path):
+        main = module(MAIN, tmp_path, "main.asm")
+
+        assert main.origin == 0x3000
+        assert main.exports == {"START": 0x3000, "POINTER": 0x3004, "MESSAGE": 0x3005}
+        assert [(fixup.operand.text, fixup.address) for fixup in main.imports] == [
+            ("PRINT", 0x3001)
+        ]
+        assert main.relocations == [0x3004]
+
+    def test_bytes_round_trip(self, tmp_path):
+        main = module(MAIN, tmp_path, "main.asm")
+
+        loaded = ObjectModule.from_bytes(main.to_bytes(), "main.rel")
+
+        assert (loaded.origin, loaded.words, loaded.exports, loaded.relocations) == (
+            main.origin,
+            main.words,
+            main.exports,
+            main.relocations,
+        )
+        assert loaded.imports[0].operand.location == "line 3, column 5 of main.rel"
+
+    def test_rejects_other_files(self):
+        with pytest.raises(ValueError, match="Not a relocatable object module"):
+            ObjectModule.from_bytes(b"\x30\x00", "main.obj")
+
+
+class TestLink:
+    def test_same_image_as_combined_source(self, tmp_path):
+        modules = [
+            module(MAIN, tmp_path, "main.asm"),
+            module(LIBRARY, tmp_path, "lib.asm"),
+        ]
+
+        program = link(modules)
+
+        assert program.to_bytes() == combined(tmp_path).to_bytes()
+        assert program.symbols["PRINT"] == 0x3008
+        assert program.symbols["BUFFER"] == 0x300D
+
+    def test_modules_are_placed_at_origin(self, tmp_path):
+        main = module(MAIN, tmp_path, "main.asm")
+        stub = module(".ORIG x3000\nPRINT: RET\n.END\n", tmp_path, "stub.asm")
+
+        program = link([main, stub], origin=0x5000)
+
+        assert program.words[4] == 0x5005  # POINTER: .FILL MESSAGE
+        # PC-relative words within the module don't change.
+        assert program.words[2:4] == main.words[2:4]
+        assert program.symbols["PRINT"] == 0x5008
+
+    def test_undefined_import_raises(self, tmp_path):
+        with pytest.raises(NameError, match="Undefined label PRINT at line 3"):
+            link([module(MAIN, tmp_path, "main.asm")])
+
+    def test_import_exported_twice_is_ambiguous(self, tmp_path):
+        modules = [
+            module(MAIN, tmp_path, "main.asm"),
+            module(LIBRARY, tmp_path, "lib.asm"),
+            module(LIBRARY, tmp_path, "copy.asm"),
+        ]
+
+        with pytest.raises(NameError, match="PRINT .* is ambiguous"):
+            link(modules)
+
+    def test_import_out_of_range_raises(self, tmp_path):
+        far = module(".ORIG x3000\nBR FAR\n.END\n", tmp_path, "near.asm")
+        padding = module(".ORIG x3000\n.BLKW #300\n.END\n", tmp_path, "padding.asm")
+        target = module(".ORIG x3000\nFAR: RET\n.END\n", tmp_path, "far.asm")
+
+        with pytest.raises(ValueError, match="PCoffset9 to FAR is 300"):
+            link([far, padding, target])
+
+    def test_program_must_fit_memory(self, tmp_path):
+        with pytest.raises(ValueError, match="doesn't fit memory"):
+            link([module(MAIN, tmp_path, "main.asm")], origin=0xFFFE)
+
+
+def test_cli_links_modules_of_batch(tmp_path):
+    for name, source in (("main.asm", MAIN), ("lib.asm", LIBRARY)):
+        (tmp_path / name).write_text(source)
+    sources = [str(tmp_path / "main.asm"), str(tmp_path / "lib.asm")]
+    output = tmp_path / "program.obj"
+
+    assert batch_main([*sources, "-j", "1", "--relocatable"]) == 0
+    modules = [str(tmp_path / "main.rel"), str(tmp_path / "lib.rel")]
+    assert (
+        link_main([*modules, "-o", str(output), "--sym", str(tmp_path / "p.sym")]) == 0
+    )
+
+    assert output.read_bytes() == combined(tmp_path).to_bytes()
+    assert "PRINT" in (tmp_path / "p.sym").read_text()
+    assert load_module(modules[1]).exports["PRINT"] == 0x4000
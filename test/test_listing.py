@@ -0,0 +1,111 @@
+import io
+
+import pytest
+
+from assembler import Assembler
+from listing import NO_ROW, SourceLocation, write_listing
+
+SOURCE = """; counts down
+.ORIG x3000
+START:  ADD R0, R0, #-1
+        BRp START
+MSG:    .STRINGZ "ok"
+
+        .END
+"""
+LIBRARY = """.MACRO PUSH REGISTER
+ADD R6, R6, #-1
+STR REGISTER, R6, #0
+.ENDM
+"""
+
+
+@pytest.fixture
+def assembler(tmp_path):
+    path = tmp_path / "program.asm"
+    path.write_text(SOURCE)
+    assembler = Assembler()
+    assembler.assemble(str(path))
+    return assembler
+
+
+class TestSourceIndex:
+    def test_address_maps_to_source_location(self, assembler):
+        index = assembler.index
+
+        assert index.at(0x3000) == SourceLocation(0x3000, 1, 3, 9, "START", None)
+        assert index.at(0x3001).line == 4
+        assert index.at(0x3004) == index.at(0x3002) == index[3]
+        assert index.at(0x3005) is None and index.at(0x2FFF) is None
+
+    def test_line_maps_to_address(self, assembler):
+        index = assembler.index
+
+        assert index.on(4).address == 0x3001
+        assert index.on(2) == SourceLocation(0x3000, 0, 2, 1, None, None)
+        assert index.row_on(1) == index.row_on(6) == index.row_on(99) == NO_ROW
+
+    def test_included_statements_keep_their_file(self, tmp_path):
+        (tmp_path / "stack.asm").write_text(LIBRARY)
+        path = tmp_path / "program.asm"
+        path.write_text('.ORIG x3000\n.INCLUDE "stack.asm"\nPUSH R1\n.END\n')
+        assembler = Assembler()
+        assembler.assemble(str(path))
+        library = str(tmp_path / "stack.asm")
+
+        assert assembler.index.at(0x3001)[2:] == (3, 1, None, library)
+        assert assembler.index.on(2, library).address == 0x3000
+        assert assembler.index.on(3) is None
+
+    def test_statement_past_memory_end_is_reported(self):
+        lines = [".ORIG xFFFE"] + ["ADD R0, R0, #1"] * 3 + [".END"]
+        assembler = Assembler(collect_errors=True)
+
+        assembler.parse_program(lines)
+
+        assert [
+            (diagnostic.line, diagnostic.error, diagnostic.message)
+            for diagnostic in assembler.diagnostics
+        ] == [
+            (4, "IndexError", "Memory address out of range: 65536 at line 4, column 1.")
+        ]
+        assert assembler.index.at(0xFFFF).line == 3
+        assert assembler.index.on(5).address == 0x10000
+
+    @pytest.mark.parametrize(
+        "lines, error",
+        [([".ORIG x3000", ".BLKW #-2"], ValueError), ([".ORIG x10000"], IndexError)],
+    )
+    def test_allocation_outside_memory_raises(self, lines, error):
+        with pytest.raises(error):
+            Assembler().parse_program(lines + [".END"])
+
+    def test_reset_clears_index(self, assembler):
+        assembler.reset()
+
+        assert len(assembler.index) == 0 and assembler.index.at(0x3000) is None
+
+    @pytest.mark.parametrize("options", [{"one_pass": True}, {"columnar": True}])
+    def test_index_is_same_in_every_mode(self, assembler, options):
+        other = Assembler(**options)
+        other.assemble(str(assembler.source.path))
+
+        assert list(other.index) == list(assembler.index)
+
+
+def test_listing_shows_every_line_and_word(assembler):
+    stream = io.StringIO()
+
+    write_listing(assembler, stream)
+
+    assert stream.getvalue().splitlines()[2:] == [
+        "                  1  ; counts down",
+        "                  2  .ORIG x3000",
+        "  3000  103F      3  START:  ADD R0, R0, #-1",
+        "  3001  03FE      4          BRp START",
+        '  3002  006F      5  MSG:    .STRINGZ "ok"',
+        "  3003  006B",
+        "  3004  0000",
+        "                  6  ",
+        "                  7          .END",
+    ]
@@ -0,0 +1,60 @@
+import io
+import json
+import logging
+
+import pytest
+
+import logger
+from assembler import Assembler
+
+
+@pytest.fixture
+def diagnostics():
+    stream = io.StringIO()
+    logger.configure(stream=stream)
+    yield stream
+    logger.configure()
+
+
+class TestLogger:
+    def test_handler_is_attached_once(self, diagnostics):
+        for _ in range(50):
+            Assembler()
+
+        handlers = logging.getLogger(logger.DIAGNOSTICS_LOGGER).handlers
+        assert len([h for h in handlers if isinstance(h, logging.StreamHandler)]) == 1
+
+    def test_message_is_written_once(self, diagnostics):
+        assemblers = [Assembler() for _ in range(10)]
+
+        with pytest.raises(SyntaxError):
+            assemblers[-1].read_assembly(".FILL R1")
+
+        assert diagnostics.getvalue().count("Invalid '.FILL' operand") == 1
+
+    def test_debug_message_is_not_formatted_when_disabled(self):
+        class Formatted:
+            count = 0
+
+            def __str__(self):
+                Formatted.count += 1
+                return "formatted"
+
+        assembler = Assembler(verbose=False)
+        assembler._logger.debug("%s", Formatted())
+
+        assert Formatted.count == 0
+
+    def test_structured_output(self):
+        stream = io.StringIO()
+        logger.configure(structured=True, stream=stream)
+        try:
+            with pytest.raises(SyntaxError):
+                Assembler().read_assembly(".BLKW R1")
+        finally:
+            logger.configure()
+
+        entry = json.loads(stream.getvalue().splitlines()[-1])
+        assert entry["level"] == "ERROR"
+        assert entry["logger"] == "lc3.Assembler"
+        assert entry["message"].startswith("Invalid '.BLKW' operand")
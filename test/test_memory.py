@@ -0,0 +1,76 @@
+import random
+from array import array
+
+import pytest
+
+from assembler import Assembler
+from memory import Memory
+
+
+class TestMemory:
+    def test_unwritten_address_reads_zero(self):
+        assert Memory()[0x3000] == 0
+
+    def test_sequential_writes_take_single_segment(self):
+        memory = Memory()
+        for offset in range(10):
+            memory[0x3000 + offset] = offset
+
+        segments = list(memory.segments())
+
+        assert len(segments) == 1
+        assert segments[0][0] == 0x3000
+        assert segments[0][1].tolist() == list(range(10))
+
+    def test_adjacent_segments_are_merged(self):
+        memory = Memory()
+        memory.write_words(0x3005, array("H", [5, 6]))
+        memory.write_words(0x3000, array("H", [0, 1, 2, 3, 4, 55, 66, 7]))
+
+        assert [(start, words.tolist()) for start, words in memory.segments()] == [
+            (0x3000, [0, 1, 2, 3, 4, 55, 66, 7])
+        ]
+
+    def test_segments_are_clipped_to_bounds(self):
+        memory = Memory()
+        memory.write_words(0x3000, array("H", range(8)))
+        memory.write_words(0x4000, array("H", range(8)))
+
+        segments = list(memory.segments(0x3004, 0x4002))
+
+        assert [(start, words.tolist()) for start, words in segments] == [
+            (0x3004, [4, 5, 6, 7]),
+            (0x4000, [0, 1]),
+        ]
+
+    def test_random_writes_match_flat_memory(self):
+        random.seed(0)
+        memory = Memory()
+        flat = array("H", bytes(2 * Memory.SIZE))
+        for _ in range(2000):
+            address = random.randrange(0x3000, 0x3100)
+            words = array("H", (random.randrange(1 << 16) for _ in range(5)))
+            memory.write_words(address, words)
+            flat[address : address + len(words)] = words
+            memory[address - 3] = 7
+            flat[address - 3] = 7
+
+        assert all(memory[address] == flat[address] for address in range(0x3200))
+
+    @pytest.mark.parametrize("address", [-1, Memory.SIZE])
+    def test_out_of_range_write_raises(self, address):
+        with pytest.raises(IndexError):
+            Memory()[address] = 1
+
+
+class TestToBytes:
+    @pytest.mark.parametrize(
+        "big_endian, expected",
+        [(True, b"\x30\x00\x10\x42\x00\x00"), (False, b"\x00\x30\x42\x10\x00\x00")],
+    )
+    def test_byte_order(self, big_endian, expected):
+        assembler = Assembler()
+        assembler.read_assembly("ADD R0, R1, R2")
+        assembler.read_assembly(".BLKW #1")
+
+        assert assembler.to_bytes(big_endian) == expected
@@ -12,12 +12,23 @@ from assembler import Assembler
         ("ADD R0, R1, x5", b"\x10\x65"),
         ("AND R3, R0, R2", b"\x56\x02"),
         ("AND R3, R0, #14", b"\x56\x2E"),
+        ("ADD R0, R1, #-1", b"\x10\x7F"),
         ("JMP R2", b"\xC0\x80"),
         ("RET", b"\xC1\xC0"),
-        ("JSRR R2", b"\x20\x80"),
+        ("JSRR R2", b"\x40\x80"),
         ("LDR R2, R1, #5", b"\x64\x45"),
+        ("LDR R2, R1, #-32", b"\x64\x60"),
         ("NOT R2, R1", b"\x94\x7F"),
         ("STR R2, R1, #5", b"\x74\x45"),
+        ("BR x5", b"\x0E\x05"),
+        ("BRz #-1", b"\x05\xFF"),
+        ("BRnp #255", b"\x0A\xFF"),
+        ("JSR #-1024", b"\x4C\x00"),
+        ("LD R0, #2", b"\x20\x02"),
+        ("LDI R2, x1", b"\xA4\x01"),
+        ("LEA R1, #-3", b"\xE3\xFD"),
+        ("ST R3, #0", b"\x36\x00"),
+        ("STI R4, #-256", b"\xB9\x00"),
     ],
 )
 class TestOperations:
@@ -31,9 +42,6 @@ class TestOperations:
         # THEN
         assert assembler.to_bytes().hex()[4:] == binary_encoding.hex()
 
-    # ToDo[1]: Dedicated test for data & code labels mapping as
-    #  well as reading assembly later on
-    @pytest.mark.skip()
     def test_label_is_mapped_to_address_and_instruction_is_processed(
         self, instruction, binary_encoding
     ):
@@ -76,6 +84,10 @@ class TestOperationsExceptions:
             "LDR R2, R1, R4",
             "LDR R2, x4, R4",
             "LDR x4, R2, R4",
+            "BR R1",
+            "JSR R7",
+            "LD #1, DATA",
+            "LEA R1, R2",
         ],
     )
     def test_invalid_operands_type_raises(self, instruction):
@@ -100,9 +112,29 @@ class TestOperationsExceptions:
             "STR R1",
             "STR R1, R2, #4, R4",
             "STR",
+            "BRz",
+            "JSR",
+            "LD R0",
+            "ST R0, DATA, #1",
         ],
     )
     def test_invalid_number_of_operands_raises(self, instruction):
         assembler = Assembler()
         with pytest.raises(IndexError):
             assembler.read_assembly(instruction)
+
+    @pytest.mark.parametrize(
+        "instruction",
+        [
+            "ADD R0, R1, #16",
+            "AND R0, R1, #-17",
+            "LDR R0, R1, #32",
+            "STR R0, R1, x-21",
+            "BRn #256",
+            "JSR #1024",
+        ],
+    )
+    def test_out_of_range_numeral_raises(self, instruction):
+        assembler = Assembler()
+        with pytest.raises(ValueError, match="out of range"):
+            assembler.read_assembly(instruction)
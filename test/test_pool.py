@@ -0,0 +1,104 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from assembler import Assembler
+from pool import AssemblerPool
+
+FIRST_SOURCE = """.ORIG x3000
+FIRST: ADD R0, R0, #1
+BR FIRST
+FORWARD: .FILL x1234
+.END
+"""
+SECOND_SOURCE = """.ORIG x4000
+LD R1, DATA
+DATA: .FILL x0042
+.END
+"""
+BROKEN_SOURCE = ".ORIG x3000\nNOT R1, #2\n.END\n"
+
+
+def assemble(assembler, source, path):
+    path.write_text(source)
+    assembler.assemble(str(path))
+    return assembler.to_bytes()
+
+
+class TestReset:
+    def test_reset_assembler_matches_new_one(self, tmp_path):
+        assembler = Assembler(stats=True, collect_errors=True, one_pass=True)
+        assemble(assembler, FIRST_SOURCE, tmp_path / "first.asm")
+        assemble(assembler, BROKEN_SOURCE, tmp_path / "broken.asm")
+        assembler.reset()
+
+        data = assemble(assembler, SECOND_SOURCE, tmp_path / "second.asm")
+
+        fresh = Assembler(stats=True, collect_errors=True, one_pass=True)
+        assert data == assemble(fresh, SECOND_SOURCE, tmp_path / "second.asm")
+        assert assembler.labels_addresses == {"DATA": 0x4001}
+        assert assembler.diagnostics == []
+        assert assembler.memory[0x3000] == 0
+        assert assembler.stats.operations.keys() == fresh.stats.operations.keys()
+        assert assembler.stats.bytes_emitted == fresh.stats.bytes_emitted
+
+    def test_reset_clears_statistics_in_place(self, tmp_path):
+        assembler = Assembler(stats=True)
+        phases = assembler.stats.phases
+        assemble(assembler, FIRST_SOURCE, tmp_path / "first.asm")
+
+        assembler.reset()
+
+        assert assembler.stats.phases is phases
+        assert not any(phases.values()) and assembler.stats.bytes_emitted == 0
+        assemble(assembler, FIRST_SOURCE, tmp_path / "first.asm")
+        assert any(phases.values())
+
+
+class TestAssemblerPool:
+    def test_assemblers_are_reused_by_options(self, tmp_path):
+        pool = AssemblerPool()
+        with pool.borrow(collect_errors=True) as first:
+            assemble(first, FIRST_SOURCE, tmp_path / "first.asm")
+        with pool.borrow(collect_errors=True) as second:
+            assert second.labels_addresses == {}
+        with pool.borrow(one_pass=True) as other:
+            pass
+
+        assert second is first and other is not first
+        assert (pool.created, pool.reused) == (2, 1)
+
+    def test_nested_borrows_get_distinct_assemblers(self):
+        pool = AssemblerPool(max_idle=1)
+        with pool.borrow() as outer, pool.borrow() as inner:
+            assert outer is not inner
+
+        with pool.borrow() as again:
+            assert again is inner
+        assert pool.created == 2
+
+    def test_assembler_is_reset_after_failure(self, tmp_path):
+        pool = AssemblerPool()
+        try:
+            with pool.borrow() as assembler:
+                assemble(assembler, BROKEN_SOURCE, tmp_path / "broken.asm")
+        except TypeError:
+            pass
+
+        with pool.borrow() as reused:
+            assert reused is assembler and reused.source is None
+
+    def test_threads_never_share_an_assembler(self, tmp_path):
+        pool = AssemblerPool(max_idle=1)
+        borrowed = []
+
+        def borrow(_):
+            with pool.borrow() as assembler:
+                assert assembler not in borrowed
+                borrowed.append(assembler)
+                time.sleep(0.001)
+                borrowed.remove(assembler)
+
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(borrow, range(200)))
+
+        assert pool.created + pool.reused == 200
@@ -0,0 +1,188 @@
+import os
+
+import pytest
+
+from assembler import Assembler
+from batch import main
+from cache import AssemblyCache, assemble_cached
+from preprocessor import ParsedFileCache
+
+LIBRARY = """; shared routines
+.MACRO PUSH REGISTER
+ADD R6, R6, #-1
+STR REGISTER, R6, #0
+.ENDM
+.MACRO POP REGISTER
+LDR REGISTER, R6, #0
+ADD R6, R6, #1
+.ENDM
+"""
+
+PROGRAM = """.ORIG x3000
+.INCLUDE "lib/stack.asm"
+START: PUSH R1
+POP R2
+BR START
+.END
+"""
+
+INLINED = """.ORIG x3000
+START: ADD R6, R6, #-1
+STR R1, R6, #0
+LDR R2, R6, #0
+ADD R6, R6, #1
+BR START
+.END
+"""
+
+
+@pytest.fixture
+def files():
+    return ParsedFileCache()
+
+
+@pytest.fixture
+def program(tmp_path):
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "stack.asm").write_text(LIBRARY)
+    path = tmp_path / "program.asm"
+    path.write_text(PROGRAM)
+    return path
+
+
+def assemble(path, files, **options):
+    assembler = Assembler(files=files, **options)
+    assembler.assemble(str(path))
+    return assembler
+
+
+class TestInclude:
+    @pytest.mark.parametrize("one_pass", [False, True])
+    def test_same_image_as_inlined_source(self, program, tmp_path, files, one_pass):
+        inlined = tmp_path / "inlined.asm"
+        inlined.write_text(INLINED)
+
+        assembler = assemble(program, files, one_pass=one_pass)
+
+        assert assembler.to_bytes() == assemble(inlined, files).to_bytes()
+        assert assembler.labels_addresses == {"START": 0x3000}
+
+    def test_file_is_parsed_once_for_every_assembler(self, program, files):
+        first, second = assemble(program, files), assemble(program, files)
+
+        assert (files.misses, files.hits) == (1, 1)
+        assert first.to_bytes() == second.to_bytes()
+
+    def test_modified_file_is_parsed_again(self, program, tmp_path, files):
+        assemble(program, files)
+        library = tmp_path / "lib" / "stack.asm"
+        library.write_text(LIBRARY.replace("#-1", "#-2"))
+        mtime = library.stat().st_mtime_ns + 1_000_000
+        os.utime(library, ns=(mtime, mtime))
+
+        assembler = assemble(program, files)
+
+        assert files.misses == 2
+        assert assembler.memory[0x3000] == 0x1DBE  # ADD R6, R6, #-2
+
+    def test_nested_include_is_relative_to_including_file(self, tmp_path, files):
+        (tmp_path / "lib").mkdir()
+        (tmp_path / "lib" / "all.asm").write_text('.INCLUDE "data.asm"\n')
+        (tmp_path / "lib" / "data.asm").write_text("DATA: .FILL x1234\n")
+        path = tmp_path / "program.asm"
+        path.write_text('.ORIG x3000\n.INCLUDE "lib/all.asm"\n.END\n')
+
+        assembler = assemble(path, files)
+
+        assert assembler.memory[0x3000] == 0x1234
+        assert set(assembler.included) == {
+            os.path.realpath(tmp_path / "lib" / name)
+            for name in ("all.asm", "data.asm")
+        }
+
+    def test_cycle_is_detected(self, tmp_path, files):
+        (tmp_path / "a.asm").write_text('.INCLUDE "b.asm"\n')
+        (tmp_path / "b.asm").write_text('.INCLUDE "a.asm"\n')
+        path = tmp_path / "program.asm"
+        path.write_text('.ORIG x3000\n.INCLUDE "a.asm"\n.END\n')
+
+        with pytest.raises(RecursionError, match="Include cycle: .*a.asm -> .*b.asm"):
+            assemble(path, files)
+
+    @pytest.mark.parametrize("columnar", [False, True])
+    def test_diagnostics_point_to_included_file(self, tmp_path, files, columnar):
+        library = tmp_path / "broken.asm"
+        library.write_text("ADD R0, R0, R0\nNOT R1, #2\n")
+        path = tmp_path / "program.asm"
+        path.write_text('.ORIG x3000\n.INCLUDE "broken.asm"\nADD R0, #1, R2\n.END\n')
+
+        assembler = assemble(path, files, collect_errors=True, columnar=columnar)
+
+        assert [
+            (diagnostic.filename, diagnostic.line, diagnostic.column)
+            for diagnostic in assembler.diagnostics
+        ] == [(None, 3, 9), (os.path.realpath(library), 2, 9)]
+        assert assembler.source_line(assembler.diagnostics[1]) == "NOT R1, #2"
+
+    def test_cli_names_included_file(self, tmp_path, capsys):
+        (tmp_path / "broken.asm").write_text("NOT R1, #2\n")
+        path = tmp_path / "program.asm"
+        path.write_text('.ORIG x3000\n.INCLUDE "broken.asm"\n.END\n')
+
+        assert main([str(path), "-j", "1", "--all-errors"]) == 1
+
+        stderr = capsys.readouterr().err
+        library = os.path.realpath(tmp_path / "broken.asm")
+        assert f"{library}:1:9: error: TypeError: " in stderr
+        assert "\n    NOT R1, #2\n            ^\n" in stderr
+
+    def test_cached_object_is_stale_once_included_file_changes(self, program, tmp_path):
+        cache = AssemblyCache(str(tmp_path / "cache"))
+        first = assemble_cached(str(program), cache)
+        library = tmp_path / "lib" / "stack.asm"
+        library.write_text(LIBRARY.replace("#-1", "#-2"))
+        mtime = library.stat().st_mtime_ns + 1_000_000
+        os.utime(library, ns=(mtime, mtime))
+
+        second = assemble_cached(str(program), cache)
+
+        assert cache.hits == 0
+        assert second.object_bytes != first.object_bytes
+
+
+class TestMacro:
+    def test_parameters_are_replaced_by_operands(self, files, tmp_path):
+        path = tmp_path / "program.asm"
+        path.write_text(
+            ".ORIG x3000\n"
+            ".MACRO MOVE TO, FROM\n"
+            "ADD TO, FROM, #0\n"
+            ".ENDM\n"
+            "MOVE R1, R2\n"
+            "MOVE R3, R4\n"
+            ".END\n"
+        )
+
+        assembler = assemble(path, files)
+
+        assert [assembler.memory[0x3000], assembler.memory[0x3001]] == [0x12A0, 0x1720]
+
+    @pytest.mark.parametrize(
+        "lines, error, message",
+        [
+            ([".MACRO M", "ADD R0, R0, R0"], SyntaxError, "isn't finished"),
+            ([".ENDM"], SyntaxError, "without '.MACRO'"),
+            ([".MACRO M", ".MACRO N", ".ENDM"], SyntaxError, "before another"),
+            ([".MACRO M A", ".ENDM", "M R1, R2"], IndexError, "expected: 1, actual 2"),
+            ([".MACRO M", "M", ".ENDM", "M"], RecursionError, "expands itself"),
+            ([".MACRO M", ".ENDM", ".MACRO M", ".ENDM"], SyntaxError, "already"),
+            ([".MACRO ADD", ".ENDM"], TypeError, "Invalid macro name"),
+            ([".INCLUDE missing.asm"], SyntaxError, "between double quotes"),
+        ],
+    )
+    def test_malformed_macro_raises(self, files, tmp_path, lines, error, message):
+        path = tmp_path / "program.asm"
+        path.write_text("\n".join([".ORIG x3000", *lines, ".END"]))
+
+        with pytest.raises(error, match=message):
+            assemble(path, files)
@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+import assembler as assembler_module
+from assembler import Assembler
+
+SOURCE = """.ORIG x3000
+ADD R0, R1, R2
+TEXT: .STRINGZ "Hi"
+DATA: .BLKW #3
+AND R3, R0, #14 ; comment
+
+.END
+"""
+
+
+class TestProgram:
+    def test_assemble_matches_line_by_line_reading(self, tmp_path):
+        # GIVEN
+        source_file = tmp_path / "program.asm"
+        source_file.write_text(SOURCE)
+        expected = Assembler()
+        for line in SOURCE.strip().splitlines():
+            if line:
+                expected.read_assembly(line)
+
+        # WHEN
+        assembler = Assembler()
+        assembler.assemble(str(source_file))
+
+        # THEN
+        assert assembler.to_bytes() == expected.to_bytes()
+
+    def test_first_pass_assigns_addresses(self, tmp_path):
+        # GIVEN
+        source_file = tmp_path / "program.asm"
+        source_file.write_text(SOURCE)
+
+        # WHEN
+        program = Assembler().map_symbolic_names(str(source_file))
+
+        # THEN
+        assert [(s.mnemonic, s.line, s.address) for s in program] == [
+            (".ORIG", 1, 0x3000),
+            ("ADD", 2, 0x3000),
+            (".STRINGZ", 3, 0x3001),
+            (".BLKW", 4, 0x3004),
+            ("AND", 5, 0x3007),
+            (".END", 7, 0x3008),
+        ]
+        assert program[2].label == "TEXT"
+
+    def test_source_is_tokenized_once(self, tmp_path):
+        source_file = tmp_path / "program.asm"
+        source_file.write_text(SOURCE)
+        lines_count = len(SOURCE.splitlines())
+
+        with patch.object(
+            assembler_module, "tokenize", wraps=assembler_module.tokenize
+        ) as tokenize:
+            Assembler().assemble(str(source_file))
+
+        assert tokenize.call_count == lines_count
@@ -0,0 +1,161 @@
+import asyncio
+import base64
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import server
+from assembler import Assembler
+from server import AssemblyServer, LatencyHistogram, request
+
+SOURCE = """.ORIG x3000
+START: ADD R0, R0, #1
+BR START
+.END
+"""
+
+
+def serve(tmp_path, scenario, **options):
+    """Runs the scenario against a server with a thread pool, returns its result."""
+
+    async def run():
+        options.setdefault("executor", ThreadPoolExecutor(2))
+        options.setdefault("max_jobs", 2)
+        assembly_server = AssemblyServer(str(tmp_path / "lc3.sock"), **options)
+        await assembly_server.start()
+        try:
+            return await scenario(assembly_server)
+        finally:
+            await assembly_server.close()
+
+    return asyncio.run(run())
+
+
+async def exchange(assembly_server, *messages):
+    """Sends messages over one connection, returns their responses."""
+    reader, writer = await asyncio.open_unix_connection(assembly_server.path)
+    responses = []
+    for message in messages:
+        data = message if isinstance(message, bytes) else json.dumps(message).encode()
+        writer.write(data + b"\n")
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+class TestLatencyHistogram:
+    def test_quantiles_are_bucket_bounds(self):
+        histogram = LatencyHistogram((0.001, 0.01, 0.1))
+        for seconds in [0.0005] * 8 + [0.05, 5.0]:
+            histogram.record(seconds)
+
+        report = histogram.as_dict()
+
+        assert report["count"] == 10
+        assert report["p50_ms"] == 1.0
+        assert report["p90_ms"] == 100.0
+        assert report["p99_ms"] == float("inf")
+        assert report["buckets"] == [[1.0, 8], [10.0, 0], [100.0, 1], [None, 1]]
+
+
+class TestAssemblyServer:
+    def test_assembles_source_to_object_and_symbols(self, tmp_path):
+        async def scenario(assembly_server):
+            return await exchange(
+                assembly_server, {"id": 7, "source": SOURCE}, {"op": "stats"}
+            )
+
+        response, stats = serve(tmp_path, scenario)
+
+        expected = Assembler()
+        expected.encode_program(expected.parse_program(SOURCE.splitlines()))
+        assert response["ok"] and response["id"] == 7
+        assert base64.b64decode(response["object"]) == expected.to_bytes()
+        assert response["symbols"] == {"START": 0x3000}
+        assert stats["latency"]["count"] == 1
+        assert (stats["active"], stats["pending"], stats["refused"]) == (0, 0, 0)
+
+    def test_reports_diagnostics(self, tmp_path):
+        async def scenario(assembly_server):
+            source = ".ORIG x3000\nNOT R1, #2\nADD R0, R0\n.END\n"
+            return await exchange(assembly_server, {"source": source, "name": "a.asm"})
+
+        (response,) = serve(tmp_path, scenario)
+
+        assert not response["ok"]
+        assert [
+            (diagnostic["line"], diagnostic["error"])
+            for diagnostic in response["diagnostics"]
+        ] == [(2, "TypeError"), (3, "IndexError")]
+        assert response["diagnostics"][0]["text"].startswith("a.asm:2:9: error:")
+
+    @pytest.mark.parametrize(
+        "message, error",
+        [
+            (b"not json", "Invalid request"),
+            ([1, 2], "JSON object"),
+            ({"op": "shutdown"}, "Unknown operation"),
+            ({"source": 12}, "'source' string"),
+            ({"source": SOURCE, "format": "elf"}, "Unknown format"),
+        ],
+    )
+    def test_malformed_request_is_answered(self, tmp_path, message, error):
+        async def scenario(assembly_server):
+            return await exchange(assembly_server, message, {"op": "ping"})
+
+        response, ping = serve(tmp_path, scenario)
+
+        assert not response["ok"] and error in response["error"]
+        assert ping == {"ok": True}
+
+    def test_oversized_request_closes_connection(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(server, "MAX_REQUEST_BYTES", 1024)
+
+        async def scenario(assembly_server):
+            return await exchange(assembly_server, {"source": "x" * 2048})
+
+        (response,) = serve(tmp_path, scenario)
+
+        assert "exceeds 1024 bytes" in response["error"]
+
+    def test_requests_over_pending_limit_are_refused(self, tmp_path, monkeypatch):
+        release = threading.Event()
+
+        def blocked(*args):
+            release.wait(5)
+            return {"ok": True}
+
+        monkeypatch.setattr(server, "assemble_source", blocked)
+
+        async def scenario(assembly_server):
+            running = asyncio.ensure_future(exchange(assembly_server, {"source": ""}))
+            waiting = asyncio.ensure_future(exchange(assembly_server, {"source": ""}))
+            while assembly_server.pending < 1:
+                await asyncio.sleep(0.01)
+            (refused,) = await exchange(assembly_server, {"source": ""})
+            release.set()
+            return refused, await running, await waiting, assembly_server.refused
+
+        refused, first, second, count = serve(
+            tmp_path, scenario, max_jobs=1, max_pending=1
+        )
+
+        assert refused == {"ok": False, "error": "busy"}
+        assert first == second == [{"ok": True}]
+        assert count == 1
+
+
+def test_process_pool_serves_blocking_client(tmp_path):
+    async def scenario(assembly_server):
+        return await asyncio.to_thread(
+            request, assembly_server.path, {"source": SOURCE, "format": "hex"}
+        )
+
+    response = serve(tmp_path, scenario, executor=None, max_jobs=1)
+
+    assert response["ok"]
+    assert base64.b64decode(response["object"]).startswith(b"3000\n1021\n")
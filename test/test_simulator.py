@@ -0,0 +1,129 @@
+import io
+
+import pytest
+
+from assembler import Assembler
+from simulator import (
+    ADD_IMMEDIATE,
+    BRANCH,
+    IN_PROMPT,
+    NEGATIVE,
+    POSITIVE,
+    DecodeOnFetch,
+    Decoded,
+    Simulator,
+    decode,
+    decode_table,
+)
+
+HALT = ".FILL xF025"
+
+
+def run(body, input="", table=None, max_instructions=None):
+    assembler = Assembler()
+    lines = [".ORIG x3000", *body.strip().splitlines(), ".END"]
+    assembler.encode_program(assembler.parse_program(lines))
+    simulator = Simulator(io.StringIO(input), table=table)
+    simulator.load(assembler.to_bytes())
+    simulator.run(max_instructions)
+    return simulator
+
+
+SUM = f"""
+AND R1, R1, #0
+LD R2, COUNT
+LOOP: ADD R1, R1, R2
+ADD R2, R2, #-1
+BRp LOOP
+ST R1, RESULT
+{HALT}
+COUNT: .FILL #100
+RESULT: .BLKW #1
+"""
+
+
+class TestDecode:
+    @pytest.mark.parametrize(
+        "word, decoded",
+        [
+            (0x1261, Decoded(ADD_IMMEDIATE, 1, 1, 1)),  # ADD R1, R1, #1
+            (0x127F, Decoded(ADD_IMMEDIATE, 1, 1, 0xFFFF)),  # ADD R1, R1, #-1
+            (0x03FD, Decoded(BRANCH, 0b001, 0xFFFD)),  # BRp #-3
+        ],
+    )
+    def test_fields_are_sign_extended(self, word, decoded):
+        assert decode(word) == decoded
+
+    def test_table_is_built_once(self):
+        assert decode_table() is decode_table()
+        assert decode_table()[0x1261] == decode(0x1261)
+
+
+class TestSimulator:
+    @pytest.mark.parametrize("table", [None, DecodeOnFetch()])
+    def test_loop_runs_to_halt(self, table):
+        simulator = run(SUM, table=table)
+
+        assert simulator.halted
+        assert simulator.memory[0x3008] == 5050
+        assert simulator.executed == 2 + 3 * 100 + 2
+        assert simulator.instructions_per_second > 0
+
+    def test_subroutine_and_indirect_memory(self):
+        simulator = run(
+            f"""
+            JSR DOUBLE
+            LDI R3, POINTER
+            NOT R4, R3
+            {HALT}
+            DOUBLE: ADD R0, R0, #3
+            ADD R0, R0, R0
+            STI R0, POINTER
+            RET
+            POINTER: .FILL DATA
+            DATA: .BLKW #1
+            """
+        )
+
+        assert simulator.registers[:5] == [6, 0, 0, 6, 0xFFF9]
+        assert simulator.memory[0x3009] == 6
+        assert simulator.registers[7] == 0x3004  # set by TRAP
+        assert simulator.condition == NEGATIVE
+
+    def test_trap_input_and_output(self):
+        simulator = run(
+            f"""
+            .FILL xF020
+            .FILL xF021
+            .FILL xF023
+            LEA R0, TEXT
+            .FILL xF022
+            LEA R0, PACKED
+            .FILL xF024
+            {HALT}
+            TEXT: .STRINGZ "ok"
+            PACKED: .FILL x6968
+            .FILL #0
+            """,
+            input="ab",
+        )
+
+        assert simulator.output.getvalue() == f"a{IN_PROMPT}bokhi"
+        assert simulator.registers[0] == 0x300B
+
+    def test_exhausted_input_raises(self):
+        with pytest.raises(EOFError, match="exhausted at 0x3000"):
+            run(".FILL xF020")
+
+    def test_instructions_limit_stops_endless_loop(self):
+        simulator = run("LOOP: BRnzp LOOP", max_instructions=1000)
+
+        assert not simulator.halted
+        assert (simulator.executed, simulator.pc) == (1000, 0x3000)
+
+    def test_illegal_instruction_raises(self):
+        with pytest.raises(ValueError, match="Illegal instruction 0xd000 at 0x3001"):
+            run("ADD R0, R0, #1\n.FILL xD000")
+
+    def test_condition_follows_last_write(self):
+        assert run(f"ADD R0, R0, #1\n{HALT}").condition == POSITIVE
@@ -0,0 +1,48 @@
+import pytest
+
+from assembler import Assembler
+from source import SourceFile
+
+
+@pytest.fixture
+def write_source(tmp_path):
+    def write(content: bytes) -> str:
+        path = tmp_path / "program.asm"
+        path.write_bytes(content)
+        return str(path)
+
+    return write
+
+
+class TestSourceFile:
+    @pytest.mark.parametrize(
+        "content, lines",
+        [
+            (b".ORIG x3000\nNOT R1, R2\n.END\n", [".ORIG x3000", "NOT R1, R2", ".END"]),
+            (b".ORIG x3000\r\n\r\n.END", [".ORIG x3000", "", ".END"]),
+            (b"\n\n", ["", ""]),
+            (b"", []),
+        ],
+    )
+    def test_lines_without_endings(self, write_source, content, lines):
+        with SourceFile(write_source(content)) as source:
+            assert list(source) == lines
+            assert len(source) == len(lines)
+            assert [source.line(n) for n in range(1, len(lines) + 1)] == lines
+
+    @pytest.mark.parametrize("number", [0, 3])
+    def test_line_out_of_range_raises(self, write_source, number):
+        with SourceFile(write_source(b"RET\nRET\n")) as source:
+            with pytest.raises(IndexError):
+                source.line(number)
+
+    def test_utf8_is_decoded(self, write_source):
+        with SourceFile(write_source('.STRINGZ "żółw"\n'.encode())) as source:
+            assert source.line(1) == '.STRINGZ "żółw"'
+
+    def test_assembler_keeps_source_for_reports(self, write_source):
+        assembler = Assembler()
+
+        assembler.assemble(write_source(b".ORIG x3000\nNOT R1, R2\n.END\n"))
+
+        assert assembler.source.line(2) == "NOT R1, R2"
@@ -0,0 +1,49 @@
+import pytest
+
+from assembler import Assembler
+from stats import PHASES
+
+SOURCE = """.ORIG x3000
+ADD R0, R1, R2
+ADD R0, R1, #1
+DATA: .FILL x5
+.END
+"""
+
+
+class TestStats:
+    def test_disabled_by_default(self):
+        assembler = Assembler()
+
+        assert assembler.stats is None
+        assert "encode_statement" not in vars(assembler)
+
+    @pytest.mark.parametrize("columnar", [False, True])
+    def test_operations_phases_and_bytes_are_counted(self, tmp_path, columnar):
+        source_file = tmp_path / "program.asm"
+        source_file.write_text(SOURCE)
+        assembler = Assembler(stats=True, columnar=columnar)
+
+        assembler.assemble(str(source_file))
+        assembler.to_bytes()
+
+        stats = assembler.stats.as_dict()
+        assert {
+            name: operation["count"] for name, operation in stats["operations"].items()
+        } == {"ADD": 2, "FILL": 1, "ORIG": 1, "END": 1}
+        assert set(stats["phases"]) == set(PHASES)
+        assert all(seconds > 0 for seconds in stats["phases"].values())
+        assert stats["bytes_emitted"] == 8
+
+    def test_update_merges_statistics(self):
+        first, second = Assembler(stats=True), Assembler(stats=True)
+        first.read_assembly("ADD R0, R1, R2")
+        second.read_assembly("NOT R0, R1")
+        second.read_assembly("ADD R0, R1, R2")
+
+        first.stats.update(second.stats.as_dict())
+
+        operations = first.stats.as_dict()["operations"]
+        assert operations["ADD"]["count"] == 2
+        assert operations["BITWISE_NOT"]["count"] == 1
+        assert "BITWISE_NOT" in first.stats.report()
@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from assembler import Assembler
+from symbols import SymbolKind, SymbolTable
+
+SOURCE = """.ORIG x3000
+START: ADD R0, R0, #1
+DATA: .FILL x00FF
+BLOCK: .BLKW #2
+.END
+"""
+
+
+class TestSymbolTable:
+    def test_define_and_resolve(self):
+        table = SymbolTable()
+
+        table.define("LOOP", 0x3002, SymbolKind.CODE, line=3)
+
+        assert table.resolve("LOOP") == 0x3002
+        assert table["LOOP"].line == 3
+        assert "LOOP" in table and len(table) == 1
+        with pytest.raises(KeyError):
+            table.resolve("MISSING")
+
+    def test_duplicate_names_both_lines(self):
+        table = SymbolTable()
+        table.define("LOOP", 0x3002, SymbolKind.CODE, line=3)
+
+        with pytest.raises(ValueError, match="LOOP at line 7.*first defined at line 3"):
+            table.define("LOOP", 0x3005, SymbolKind.CODE, line=7)
+        assert table.resolve("LOOP") == 0x3002
+
+    def test_reverse_lookup_returns_first_label(self):
+        table = SymbolTable()
+        table.define("FIRST", 0x3000, SymbolKind.DATA)
+        table.define("SECOND", 0x3000, SymbolKind.DATA)
+
+        assert table.at(0x3000).name == "FIRST"
+        assert table.at(0x3001) is None
+
+    def test_addresses_by_kind(self):
+        table = SymbolTable()
+        table.define("CODE", 0x3000, SymbolKind.CODE)
+        table.define("DATA", 0x3001, SymbolKind.DATA)
+
+        assert table.addresses() == {"CODE": 0x3000, "DATA": 0x3001}
+        assert table.addresses(SymbolKind.DATA) == {"DATA": 0x3001}
+
+    def test_sym_round_trip(self):
+        table = SymbolTable()
+        table.define("START", 0x3000, SymbolKind.CODE)
+        table.define("A_VERY_LONG_LABEL", 0x30FF, SymbolKind.DATA)
+        stream = io.StringIO()
+
+        table.write_sym(stream)
+        loaded = SymbolTable.read_sym(stream.getvalue().splitlines())
+
+        assert stream.getvalue().startswith("// Symbol table\n")
+        assert loaded.addresses() == table.addresses()
+        assert {symbol.kind for symbol in loaded} == {SymbolKind.IMPORTED}
+
+
+class TestAssemblerSymbols:
+    def test_labels_are_recorded_with_kind_and_line(self):
+        assembler = Assembler()
+
+        assembler.parse_program(SOURCE.splitlines())
+
+        assert assembler.code_labels_addresses == {"START": 0x3000}
+        assert assembler.data_labels_addresses == {"DATA": 0x3001, "BLOCK": 0x3002}
+        assert assembler.symbols["DATA"].line == 3
+        assert assembler.symbols.at(0x3002).name == "BLOCK"
+
+    def test_duplicate_label_raises(self):
+        lines = [".ORIG x3000", "LOOP: ADD R0, R0, #1", "LOOP: .FILL #0", ".END"]
+
+        with pytest.raises(ValueError, match="LOOP at line 3.*first defined at line 2"):
+            Assembler().parse_program(lines)
@@ -0,0 +1,110 @@
+import io
+from array import array
+
+import pytest
+
+from assembler import Assembler
+from batch import BatchOptions, assemble_file
+from memory import Memory
+from writers import (
+    CHUNK_WORDS,
+    intel_hex_record,
+    iter_intel_hex,
+    iter_object,
+    read_object,
+)
+
+SOURCE = """.ORIG x3000
+ADD R0, R1, #-1
+DATA: .FILL x00FF
+.END
+"""
+
+
+@pytest.fixture
+def assembler():
+    assembler = Assembler()
+    assembler.encode_program(assembler.parse_program(SOURCE.splitlines()))
+    return assembler
+
+
+def two_segments():
+    memory = Memory()
+    memory.write_words(0x3000, array("H", [0x1234, 0x5678]))
+    memory.write_words(0x3004, array("H", [0xABCD]))
+    return memory
+
+
+class TestWriters:
+    @pytest.mark.parametrize(
+        "output_format, expected",
+        [
+            ("obj", b"\x30\x00\x10\x7f\x00\xff"),
+            ("hex", b"3000\n107F\n00FF\n"),
+            ("bin", b"0011000000000000\n0001000001111111\n0000000011111111\n"),
+            (
+                "ihex",
+                b":04600000107F00FF0E\n:00000001FF\n",
+            ),
+        ],
+    )
+    def test_formats(self, assembler, output_format, expected):
+        stream = io.BytesIO()
+
+        written = assembler.write(stream, output_format=output_format)
+
+        assert stream.getvalue() == expected
+        assert written == len(expected)
+
+    def test_intel_hex_record_checksum(self):
+        assert intel_hex_record(0, 0x30, b"\x02\x33\x7a") == ":0300300002337A1E\n"
+
+    def test_object_fills_gaps_between_segments(self):
+        data = b"".join(iter_object(two_segments(), 0x3000, 0x3005))
+
+        assert data.hex() == "3000" + "1234" + "5678" + "0000" * 2 + "abcd"
+
+    def test_intel_hex_keeps_segments_apart(self):
+        records = b"".join(iter_intel_hex(two_segments(), 0x3000, 0x3005)).split()
+
+        assert [record[3:7] for record in records] == [b"6000", b"6008", b"0000"]
+
+    def test_extended_linear_address_above_64_kib(self):
+        memory = Memory()
+        memory.write_words(0x7FFF, array("H", [1, 2]))
+
+        records = b"".join(iter_intel_hex(memory, 0x7FFF, 0x8001)).split()
+
+        assert records == [
+            b":02FFFE00000100",
+            b":020000040001F9",
+            b":020000000002FC",
+            b":00000001FF",
+        ]
+
+    def test_large_image_is_streamed_in_bounded_chunks(self):
+        memory = Memory()
+        memory.reserve(0, Memory.SIZE)
+
+        chunks = list(iter_object(memory, 0, Memory.SIZE, big_endian=False))
+
+        assert max(len(chunk) for chunk in chunks) == 2 * CHUNK_WORDS
+        assert sum(len(chunk) for chunk in chunks) == 2 + 2 * Memory.SIZE
+
+    @pytest.mark.parametrize("big_endian", [True, False])
+    def test_read_object_round_trip(self, assembler, big_endian):
+        data = assembler.to_bytes(big_endian)
+
+        memory, start, stop = read_object(data, big_endian)
+
+        assert b"".join(iter_object(memory, start, stop, big_endian)) == data
+
+    def test_batch_output_format(self, tmp_path):
+        source = tmp_path / "program.asm"
+        source.write_text(SOURCE)
+
+        result = assemble_file(str(source), BatchOptions(output_format="hex"))
+
+        assert result.ok
+        assert result.output == str(tmp_path / "program.hex")
+        assert (tmp_path / "program.hex").read_text() == "3000\n107F\n00FF\n"